@@ -19,30 +19,13 @@
 import json
 from pathlib import Path
 
-from jupyter_server.utils import url_path_join
-
-from .dependency_management import YamlSpecHandler, DependencyManagementBaseHandler
-from .dependency_management import (
-    DependenciesFilesHandler,
-    PipenvHandler,
-    PythonVersionHandler,
-    RootPathHandler,
-    DependenciesStoredHandler,
-    DependenciesNotebookNameHandler,
-)
-from .dependency_management import ThothConfigHandler, ThothAdviseHandler, ThothInvectioHandler
-from .dependency_management import JupyterKernelHandler, DependencyInstalledHandler, DependencyInstallHandler
-
-from .dependency_management import HorusMagics
-
 HERE = Path(__file__).parent.resolve()
 
 __version__ = "0.16.2"
 __author__ = "Francesco Murdaca <francesco.murdaca91@gmail.com>"
 
-
-with (HERE / "labextension" / "package.json").open() as fid:
-    data = json.load(fid)
+# Server handlers and magic commands are imported when the extensions are loaded,
+# so that horus CLI does not import jupyter server.
 
 
 # In order to actually use these magics, you must register them with a
@@ -56,12 +39,17 @@ def load_ipython_extension(ipython):  # type: ignore
     can be loaded via `%load_ext module.path` or be configured to be
     autoloaded by IPython at startup time.
     """
+    from .dependency_management import HorusMagics
+
     # You can register the class itself without instantiating it.  IPython will
     # call the default constructor on it.
     ipython.register_magics(HorusMagics)
 
 
 def _jupyter_labextension_paths():  # type: ignore
+    with (HERE / "labextension" / "package.json").open() as fid:
+        data = json.load(fid)
+
     return [{"src": "labextension", "dest": data["name"]}]
 
 
@@ -87,6 +75,20 @@ def _load_jupyter_server_extension(lab_app):  # type: ignore
         JupyterLab application instance
 
     """
+    from jupyter_server.utils import url_path_join
+
+    from .dependency_management import YamlSpecHandler, DependencyManagementBaseHandler, TaskEventsHandler
+    from .dependency_management import (
+        DependenciesFilesHandler,
+        PipenvHandler,
+        PythonVersionHandler,
+        RootPathHandler,
+        DependenciesStoredHandler,
+        DependenciesNotebookNameHandler,
+    )
+    from .dependency_management import ThothConfigHandler, ThothAdviseHandler, ThothInvectioHandler
+    from .dependency_management import JupyterKernelHandler, DependencyInstalledHandler, DependencyInstallHandler
+
     web_app = lab_app.web_app
     host_pattern = ".*$"
 
@@ -121,10 +123,21 @@ def _load_jupyter_server_extension(lab_app):  # type: ignore
             ),  # type: ignore
             DependencyManagementBaseHandler,
         ),  # GET / DELETE
+        (
+            url_path_join(
+                base_url, r"/jupyterlab_requirements/jupyterlab_requirements/tasks/%s/events" % r"(?P<index>\d+)"
+            ),  # type: ignore
+            TaskEventsHandler,
+        ),  # GET (server-sent events)
     ]
 
     web_app.add_handlers(host_pattern, custom_handlers)
 
+    # Environments are created in advance for new kernels, if the pool is enabled.
+    from .dependency_management.environments import environments_pool
+
+    environments_pool.start()
+
     lab_app.log.info(f"Registered JupyterLab extension at URL {url_path}")
 
 
@@ -17,41 +17,42 @@
 
 """A CLI for jupyterlab-requirements: Horus."""
 
+import glob
 import logging
 import json
 import sys
 import subprocess
-import yaml  # type: ignore
 import click
+import signal
 import typing
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Optional
 from pathlib import Path
 
-from thoth.python import Pipfile, PipfileLock
-from thamos.config import _Configuration
-from thamos.discover import discover_python_version
-from thamos.cli import _parse_labels
-
 from jupyterlab_requirements import __version__
-
-from jupyterlab_requirements.dependency_management import create_pipfile_from_packages
-from jupyterlab_requirements.dependency_management import gather_libraries
-from jupyterlab_requirements.dependency_management import get_packages
-from jupyterlab_requirements.dependency_management import get_notebook_content
-from jupyterlab_requirements.dependency_management import horus_check_metadata_content
-from jupyterlab_requirements.dependency_management import horus_delete_kernel
-from jupyterlab_requirements.dependency_management import horus_extract_command
-from jupyterlab_requirements.dependency_management import horus_lock_command
-from jupyterlab_requirements.dependency_management import horus_log_command
-from jupyterlab_requirements.dependency_management import horus_requirements_command
-from jupyterlab_requirements.dependency_management import horus_set_kernel_command
-from jupyterlab_requirements.dependency_management import horus_show_command
-from jupyterlab_requirements.dependency_management import horus_list_kernels
-from jupyterlab_requirements.dependency_management import load_files
-from jupyterlab_requirements.dependency_management import print_report
-from jupyterlab_requirements.dependency_management import save_notebook_content
-from jupyterlab_requirements.dependency_management import verify_gathered_libraries
+from jupyterlab_requirements.daemon import HorusDaemon
+from jupyterlab_requirements.daemon import SOCKET_PATH
+from jupyterlab_requirements.daemon import run_in_daemon
+
+from jupyterlab_requirements.dependency_management.lib import create_pipfile_from_packages
+from jupyterlab_requirements.dependency_management.lib import gather_libraries
+from jupyterlab_requirements.dependency_management.lib import get_packages
+from jupyterlab_requirements.dependency_management.lib import get_notebook_metadata
+from jupyterlab_requirements.dependency_management.lib import horus_check_metadata_content
+from jupyterlab_requirements.dependency_management.lib import horus_clean_store
+from jupyterlab_requirements.dependency_management.lib import horus_delete_kernel
+from jupyterlab_requirements.dependency_management.lib import horus_extract_command
+from jupyterlab_requirements.dependency_management.lib import horus_lock_command
+from jupyterlab_requirements.dependency_management.lib import horus_log_command
+from jupyterlab_requirements.dependency_management.lib import horus_requirements_command
+from jupyterlab_requirements.dependency_management.lib import horus_set_kernel_command
+from jupyterlab_requirements.dependency_management.lib import horus_show_command
+from jupyterlab_requirements.dependency_management.lib import horus_list_kernels
+from jupyterlab_requirements.dependency_management.lib import load_files
+from jupyterlab_requirements.dependency_management.lib import print_report
+from jupyterlab_requirements.dependency_management.lib import save_notebook_metadata
+from jupyterlab_requirements.dependency_management.lib import verify_gathered_libraries
 
 
 _LOGGER = logging.getLogger("thoth.jupyterlab_requirements.cli")
@@ -298,8 +299,10 @@ def save(
         horus save [YOUR_NOTEBOOK].ipynb  --pipfile-lock
         horus save [YOUR_NOTEBOOK].ipynb  --thoth-config
     """
-    notebook = get_notebook_content(notebook_path=path)
-    notebook_metadata = dict(notebook.get("metadata"))
+    from thamos.config import _Configuration
+    from thoth.python import Pipfile, PipfileLock
+
+    notebook_metadata = dict(get_notebook_metadata(notebook_path=path))
 
     language = notebook_metadata["language_info"]["name"]
 
@@ -372,9 +375,7 @@ def save(
 
     notebook_metadata["dependency_resolution_engine"] = resolution_engine
 
-    notebook["metadata"] = notebook_metadata
-
-    save_notebook_content(notebook_path=path, notebook=notebook)
+    save_notebook_metadata(notebook_path=path, notebook_metadata=notebook_metadata)
     ctx.exit(0)
 
 
@@ -409,6 +410,8 @@ def discover(
 
         horus discover [YOUR_NOTEBOOK].ipynb --force
     """
+    from thamos.discover import discover_python_version
+
     gathered_libraries = gather_libraries(notebook_path=path)
     verified_libraries = verify_gathered_libraries(gathered_libraries=gathered_libraries)
     packages = [package["package_name"] for package in verified_libraries]
@@ -461,8 +464,9 @@ def check(ctx: click.Context, path: str, output_format: str) -> None:
 
         horus check [YOUR_NOTEBOOK].ipynb --output-format yaml
     """
-    notebook = get_notebook_content(notebook_path=path)
-    notebook_metadata = notebook.get("metadata")
+    import yaml  # type: ignore
+
+    notebook_metadata = get_notebook_metadata(notebook_path=path)
 
     result = horus_check_metadata_content(notebook_metadata=notebook_metadata)
 
@@ -482,6 +486,161 @@ def check(ctx: click.Context, path: str, output_format: str) -> None:
     sys.exit(1 if any(item.get("type") == "ERROR" for item in result) else 0)
 
 
+def _find_notebooks(paths: typing.Iterable[str]) -> typing.List[str]:
+    """Find notebooks in the given paths, which can be notebooks, directories (searched recursively) or globs."""
+    notebooks: typing.Dict[str, None] = {}
+
+    for path in paths:
+        found: typing.Iterable[str]
+
+        if Path(path).is_dir():
+            found = (p.as_posix() for p in Path(path).rglob("*.ipynb") if ".ipynb_checkpoints" not in p.parts)
+        elif glob.has_magic(path):
+            found = (p for p in glob.glob(path, recursive=True) if ".ipynb_checkpoints" not in Path(p).parts)
+        else:
+            found = [path]
+
+        for notebook_path in sorted(found):
+            if notebook_path.endswith(".ipynb"):
+                notebooks.setdefault(notebook_path, None)
+
+    return list(notebooks)
+
+
+def _get_batch_store_path(store_files_path: str, notebook_path: str) -> Path:
+    """Get directory where files extracted from a notebook are stored in batch mode, one for each notebook."""
+    notebook = Path(notebook_path)
+    parts = [part for part in notebook.with_suffix("").parts if part not in (notebook.anchor, "..", ".")]
+
+    return Path(store_files_path).joinpath(*parts)
+
+
+def _run_batch_command(
+    command: str, notebook_path: str, options: typing.Dict[str, typing.Any]
+) -> typing.Dict[str, typing.Any]:
+    """Run horus command on a notebook in a batch worker, errors are reported instead of raised."""
+    record: typing.Dict[str, typing.Any] = {"path": notebook_path, "command": command, "error": None}
+
+    try:
+        if command == "check":
+            result = horus_check_metadata_content(notebook_metadata=get_notebook_metadata(notebook_path=notebook_path))
+            record["result"] = result
+
+            if any(item.get("type") == "ERROR" for item in result):
+                record["error"] = "Notebook is not reproducible, check results for details."
+
+        elif command == "discover":
+            gathered_libraries = gather_libraries(notebook_path=notebook_path)
+            verified_libraries = verify_gathered_libraries(gathered_libraries=gathered_libraries)
+            record["result"] = {
+                "gathered_libraries": gathered_libraries,
+                "packages": [package["package_name"] for package in verified_libraries],
+            }
+
+        elif command == "extract":
+            store_path = _get_batch_store_path(options["store_files_path"], notebook_path)
+            store_path.mkdir(parents=True, exist_ok=True)
+
+            record["result"] = horus_extract_command(
+                notebook_path=notebook_path,
+                store_files_path=str(store_path),
+                use_overlay=options["use_overlay"],
+                force=options["force"],
+            )
+            record["result"]["store_files_path"] = store_path.as_posix()
+
+    except Exception as e:
+        record["error"] = f"{e.__class__.__name__}: {e}"
+
+    return record
+
+
+@cli.command("batch")
+@click.pass_context
+@click.argument("command", type=click.Choice(["check", "discover", "extract"]))
+@click.argument("paths", nargs=-1, required=True)
+@click.option(
+    "--workers",
+    "-w",
+    type=int,
+    default=None,
+    help="Number of processes used to run commands (default number of CPUs).",
+)
+@click.option(
+    "--output-format",
+    "-o",
+    type=click.Choice(["json", "ndjson"]),
+    default="json",
+    help="Specify output format for the report, ndjson prints results as soon as notebooks are processed.",
+)
+@click.option(
+    "--store-files-path",
+    is_flag=False,
+    default=".",
+    help="Custom path used to store files extracted, in a directory for each notebook.",
+)
+@click.option(
+    "--use-overlay",
+    is_flag=True,
+    help="Extract Pipfile and Pipfile.lock in overlay with kernel name.",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Force actions for extraction.",
+)
+def batch(
+    ctx: click.Context,
+    command: str,
+    paths: typing.Tuple[str, ...],
+    workers: Optional[int],
+    output_format: str,
+    store_files_path: str,
+    use_overlay: bool = False,
+    force: bool = False,
+) -> None:
+    """Run check, discover or extract on all notebooks in directories or globs, in parallel.
+
+    A single report with results for each notebook is printed, the command fails if any notebook failed.
+
+    Examples:
+        horus batch check notebooks/
+
+        horus batch discover 'notebooks/**/*.ipynb' --output-format ndjson
+
+        horus batch extract notebooks/ --store-files-path requirements/
+    """
+    notebooks = _find_notebooks(paths)
+    options = {"store_files_path": store_files_path, "use_overlay": use_overlay, "force": force}
+
+    records = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_batch_command, command, notebook_path, options) for notebook_path in notebooks]
+
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+
+            if output_format == "ndjson":
+                sys.stdout.write(json.dumps(record) + "\n")
+                sys.stdout.flush()
+
+    failed = sum(1 for record in records if record["error"])
+
+    if output_format == "json":
+        report = {
+            "command": command,
+            "notebooks": sorted(records, key=lambda r: r["path"]),
+            "total": len(records),
+            "failed": failed,
+        }
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    ctx.exit(1 if failed else 0)
+
+
 @cli.command("set-kernel")
 @click.pass_context
 @click.argument("path")
@@ -496,7 +655,14 @@ def check(ctx: click.Context, path: str, output_format: str) -> None:
     is_flag=True,
     help="Delete kernel if exists and recreate it.",
 )
-def set_kernel(ctx: click.Context, path: str, kernel_name: Optional[str], force: bool = False) -> None:
+@click.option(
+    "--skip-compile",
+    is_flag=True,
+    help="Do not compile bytecode of installed packages, modules are compiled when imported first.",
+)
+def set_kernel(
+    ctx: click.Context, path: str, kernel_name: Optional[str], force: bool = False, skip_compile: bool = False
+) -> None:
     """Create kernel using dependencies in notebook metadata.
 
     Create kernel for your notebook.
@@ -504,7 +670,9 @@ def set_kernel(ctx: click.Context, path: str, kernel_name: Optional[str], force:
     Examples:
         horus set-kernel [YOUR_NOTEBOOK].ipynb
     """
-    results = horus_set_kernel_command(path=path, kernel_name=kernel_name, force=force)
+    results = horus_set_kernel_command(
+        path=path, kernel_name=kernel_name, force=force, compile_bytecode=not skip_compile
+    )
 
     if results["kernel_name"] == "python3":
         click.echo("python3 kernel name, cannot be overwritten, assigning default jupyterlab-requirements")
@@ -571,9 +739,9 @@ def delete_kernel(ctx: click.Context, kernel_name: str) -> None:
         click.echo(f"kernel {kernel_name} is the default Jupyter kernel, it cannot be deleted.")
         ctx.exit(1)
 
-    command_output = horus_delete_kernel(kernel_name=kernel_name)
+    is_deleted = horus_delete_kernel(kernel_name=kernel_name)
 
-    if command_output.returncode == 0:
+    if is_deleted:
         click.echo(f"{kernel_name} kernel successfully deleted")
     else:
         click.echo(f"{kernel_name} kernel could not be deleted.")
@@ -582,11 +750,26 @@ def delete_kernel(ctx: click.Context, kernel_name: str) -> None:
     ctx.exit(0)
 
 
+@cli.command("clean-store")
+@click.pass_context
+def clean_store(ctx: click.Context) -> None:
+    """Remove packages shared by kernels which are not used by any kernel.
+
+    Examples:
+        horus clean-store
+    """
+    removed = horus_clean_store()
+
+    click.echo(f"{len(removed)} packages removed from the package store.")
+
+    ctx.exit(0)
+
+
 @cli.command("check-kernel")
 @click.pass_context
 @click.argument("kernel-name")
 def check_kernel(ctx: click.Context, kernel_name: str) -> None:
-    """Check packages in Jupyter kernel (pip list output).
+    """Check packages in Jupyter kernel (same as pip list output).
 
     Examples:
         horus check-kernel
@@ -757,6 +940,11 @@ def requirements(
     show_default=True,
     help="Labels used to label the request.",
 )
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Do not reuse lock results stored in the local cache for the same Pipfile and runtime environment.",
+)
 def lock(
     ctx: click.Context,
     path: str,
@@ -770,12 +958,15 @@ def lock(
     os_version: Optional[str] = None,
     python_version: Optional[str] = None,
     labels: Optional[str] = None,
+    no_cache: bool = False,
 ) -> None:
     """Lock requirements in notebook metadata.
 
     Examples:
       horus lock [YOUR_NOTEBOOK].ipynb
     """
+    from thamos.cli import _parse_labels
+
     resolution_engine = "thoth"
 
     if pipenv:
@@ -795,6 +986,7 @@ def lock(
         os_version=os_version,
         python_version=python_version,
         labels=_parse_labels(labels),
+        use_cache=not no_cache,
     )
 
     if results["kernel_name"] == "python3":
@@ -847,4 +1039,56 @@ def log(
     ctx.exit(1)
 
 
-__name__ == "__main__" and cli()
+@cli.command("serve")
+@click.pass_context
+@click.option(
+    "--socket-path",
+    is_flag=False,
+    default=str(SOCKET_PATH),
+    help="UNIX socket the daemon listens on.",
+)
+def serve(ctx: click.Context, socket_path: str) -> None:
+    """Run horus daemon, which keeps libraries and caches loaded for the following commands.
+
+    While the daemon is running, horus commands run in it, commands which install packages or
+    run other tools (e.g. set-kernel, lock) always run in the horus process.
+
+    Examples:
+        horus serve &
+
+        horus check [YOUR_NOTEBOOK].ipynb
+    """
+    try:
+        daemon = HorusDaemon(socket_path=Path(socket_path))
+    except RuntimeError as e:
+        click.echo(e, err=True)
+        ctx.exit(1)
+
+    daemon.preload()
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    click.echo(f"Horus daemon listening on {socket_path}", err=True)
+
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+
+
+def main() -> None:
+    """Run horus command, in the daemon if it is running (see `horus serve`)."""
+    response = run_in_daemon(sys.argv[1:])
+
+    if response is None:
+        cli()
+        return
+
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    sys.exit(response["exit_code"])
+
+
+if __name__ == "__main__":
+    main()
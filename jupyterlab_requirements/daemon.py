@@ -0,0 +1,303 @@
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Horus daemon, running commands in a long-running process that keeps libraries and caches warm."""
+
+import io
+import os
+import json
+import socket
+import logging
+import contextlib
+import socketserver
+import typing
+
+from pathlib import Path
+
+from jupyterlab_requirements import __version__
+
+_LOGGER = logging.getLogger("jupyterlab_requirements.daemon")
+
+SOCKET_PATH = Path(
+    os.getenv("JUPYTERLAB_REQUIREMENTS_DAEMON_SOCKET", Path.home().joinpath(".local/share/thoth/horus.sock"))
+)
+
+# Set to 0 to always run commands in the horus process, even if the daemon is running.
+_DAEMON_ENABLED = bool(int(os.getenv("JUPYTERLAB_REQUIREMENTS_DAEMON", 1)))
+
+# Commands which only print through click/rich, others (e.g. set-kernel) run subprocesses writing to the terminal.
+DAEMON_COMMANDS = frozenset(
+    ("batch", "check", "check-kernel", "discover", "extract", "list-kernels", "requirements", "save", "show")
+)
+
+# Modules imported when the daemon starts, instead of on the first command.
+_PRELOADED_MODULES = ("jupyterlab_requirements.dependency_management.lib", "thamos.lib", "thoth.python", "invectio")
+
+# Client environment variables configuring horus, thamos and Thoth, sent to the daemon with each command.
+_FORWARDED_ENVIRONMENT_PREFIXES = ("JUPYTERLAB_REQUIREMENTS_", "THOTH_", "THAMOS_")
+
+# Forwarded variables read while a command runs, the daemon sets them as the client did. Other variables
+# are read when modules are imported, commands run in the horus process if the client sets them differently.
+_COMMAND_ENVIRONMENT = frozenset(
+    (
+        "JUPYTERLAB_REQUIREMENTS_NO_EMOJI",
+        "THOTH_JUPYTERLAB_REQUIREMENTS_DEBUG",
+        "THAMOS_DISABLE_CUDA",
+        "THAMOS_DISABLE_LAST_ANALYSIS_ID_FILE",
+        "THAMOS_NO_EMOJI",
+        "THAMOS_NO_PROGRESSBAR",
+        "THAMOS_REQUIREMENTS_FORMAT",
+    )
+)
+
+# Level of log records written to the command output, as Python does when no logging is configured.
+_COMMAND_LOG_LEVEL = logging.WARNING
+
+
+def _get_command_name(args: typing.List[str]) -> typing.Optional[str]:
+    """Get horus subcommand name from command line arguments, skipping global options."""
+    for arg in args:
+        if not arg.startswith("-"):
+            return arg
+
+    return None
+
+
+def _get_forwarded_environment() -> typing.Dict[str, str]:
+    """Get environment variables of this process which are forwarded to the daemon."""
+    return {
+        name: value
+        for name, value in os.environ.items()
+        # Daemon settings only matter to the client.
+        if name.startswith(_FORWARDED_ENVIRONMENT_PREFIXES) and not name.startswith("JUPYTERLAB_REQUIREMENTS_DAEMON")
+    }
+
+
+def _get_environment_mismatch(
+    environment: typing.Dict[str, str], daemon_environment: typing.Dict[str, str]
+) -> typing.List[str]:
+    """Get client variables which differ from the daemon ones and cannot be set when a command runs."""
+    return sorted(
+        name
+        for name in set(environment).union(daemon_environment)
+        if name not in _COMMAND_ENVIRONMENT and environment.get(name) != daemon_environment.get(name)
+    )
+
+
+@contextlib.contextmanager
+def _client_environment(environment: typing.Dict[str, str]) -> typing.Iterator[None]:
+    """Replace forwarded environment variables with the client ones, restoring them on exit."""
+    previous_environment = _get_forwarded_environment()
+
+    for name in previous_environment:
+        del os.environ[name]
+    os.environ.update(environment)
+
+    try:
+        yield
+    finally:
+        for name in _get_forwarded_environment():
+            del os.environ[name]
+        os.environ.update(previous_environment)
+
+
+def _read_message(connection: socket.socket) -> typing.Dict[str, typing.Any]:
+    """Read a JSON message, the peer shuts down writing when the message is complete."""
+    chunks = []
+
+    while True:
+        chunk = connection.recv(65536)
+        if not chunk:
+            break
+
+        chunks.append(chunk)
+
+    message: typing.Dict[str, typing.Any] = json.loads(b"".join(chunks))
+    return message
+
+
+def run_command(
+    args: typing.List[str], cwd: str, environment: typing.Optional[typing.Dict[str, str]] = None
+) -> typing.Dict[str, typing.Any]:
+    """Run horus command in this process from cwd and the client environment, capturing its output and exit code."""
+    import click
+
+    from jupyterlab_requirements.cli import cli
+    from jupyterlab_requirements.cli import _LOGGER as _CLI_LOGGER
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    previous_cwd = os.getcwd()
+    # Verbose mode changes the level of horus logger, it must not leak into the following commands.
+    previous_cli_log_level = _CLI_LOGGER.level
+
+    log_handler = logging.StreamHandler(stderr)
+    log_handler.setLevel(_COMMAND_LOG_LEVEL)
+    root_logger = logging.getLogger()
+
+    try:
+        os.chdir(cwd)
+        root_logger.addHandler(log_handler)
+
+        with contextlib.ExitStack() as stack:
+            if environment is not None:
+                stack.enter_context(_client_environment(environment))
+
+            stack.enter_context(contextlib.redirect_stdout(stdout))
+            stack.enter_context(contextlib.redirect_stderr(stderr))
+
+            try:
+                # Without standalone mode, click returns the code given to ctx.exit instead of exiting.
+                exit_code = cli.main(args=args, prog_name="horus", standalone_mode=False) or 0
+            except click.exceptions.Exit as e:
+                exit_code = e.exit_code
+            except click.ClickException as e:
+                e.show()
+                exit_code = e.exit_code
+            except click.Abort:
+                stderr.write("Aborted!\n")
+                exit_code = 1
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception as e:
+                _LOGGER.exception("Command %r failed", args)
+                stderr.write(f"{e.__class__.__name__}: {e}\n")
+                exit_code = 1
+    finally:
+        root_logger.removeHandler(log_handler)
+        _CLI_LOGGER.setLevel(previous_cli_log_level)
+        os.chdir(previous_cwd)
+
+    return {"exit_code": exit_code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """Handle a horus command sent by a client."""
+
+    def handle(self) -> None:
+        """Run the command and send back its output."""
+        try:
+            request = _read_message(self.request)
+        except ValueError as e:
+            _LOGGER.warning("Invalid request: %r", e)
+            return
+
+        environment = request.get("environment", {})
+        mismatch = _get_environment_mismatch(environment, self.server.environment)  # type: ignore
+
+        if request.get("version") != __version__:
+            response = {"error": f"Daemon runs horus version {__version__}"}
+        elif _get_command_name(request.get("args", [])) not in DAEMON_COMMANDS:
+            response = {"error": "Command is not run by the daemon"}
+        elif mismatch:
+            response = {"error": f"Daemon runs with different environment variables: {', '.join(mismatch)}"}
+        else:
+            _LOGGER.info("Running horus %s", " ".join(request["args"]))
+            response = run_command(request["args"], cwd=request["cwd"], environment=environment)
+
+        self.request.sendall(json.dumps(response).encode("utf-8"))
+
+
+class HorusDaemon(socketserver.UnixStreamServer):
+    """Server running horus commands sent over a UNIX socket, one at a time.
+
+    Commands change working directory, environment and redirect standard output while running,
+    therefore they are not run concurrently. Caches kept in memory (import names, installed packages,
+    analysed cells) are shared by all commands.
+    """
+
+    def __init__(self, socket_path: Path = SOCKET_PATH) -> None:
+        """Init."""
+        self.socket_path = socket_path
+        # Variables read on import, clients configured differently run commands in their process.
+        self.environment = _get_forwarded_environment()
+
+        if is_running(socket_path):
+            raise RuntimeError(f"Horus daemon is already running on {socket_path}")
+
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        # Stale socket left by a daemon which was not stopped cleanly.
+        with contextlib.suppress(FileNotFoundError):
+            socket_path.unlink()
+
+        # Only the user running the daemon can connect to it.
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(str(socket_path), _RequestHandler)
+        finally:
+            os.umask(previous_umask)
+
+    def preload(self) -> None:
+        """Import libraries used by commands, so that the first command does not pay for it."""
+        import importlib
+
+        for module in _PRELOADED_MODULES:
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                _LOGGER.warning("Module %r could not be preloaded: %r", module, e)
+
+    def server_close(self) -> None:
+        """Close the server and remove its socket."""
+        super().server_close()
+
+        with contextlib.suppress(FileNotFoundError):
+            self.socket_path.unlink()
+
+
+def _send_request(
+    request: typing.Dict[str, typing.Any], socket_path: Path, timeout: typing.Optional[float] = None
+) -> typing.Dict[str, typing.Any]:
+    """Send request to the daemon and wait for its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(str(socket_path))
+        connection.sendall(json.dumps(request).encode("utf-8"))
+        connection.shutdown(socket.SHUT_WR)
+
+        return _read_message(connection)
+
+
+def is_running(socket_path: Path = SOCKET_PATH) -> bool:
+    """Check if a daemon is accepting connections on the socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(str(socket_path))
+        except OSError:
+            return False
+
+    return True
+
+
+def run_in_daemon(
+    args: typing.List[str], socket_path: Path = SOCKET_PATH
+) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """Run horus command in the daemon, None if it cannot be run there and must run in this process."""
+    if not _DAEMON_ENABLED or _get_command_name(args) not in DAEMON_COMMANDS:
+        return None
+
+    request = {"version": __version__, "args": args, "cwd": os.getcwd(), "environment": _get_forwarded_environment()}
+
+    try:
+        response = _send_request(request, socket_path=socket_path)
+    except (OSError, ValueError) as e:
+        _LOGGER.debug("Horus daemon not available on %s: %r", socket_path, e)
+        return None
+
+    if "error" in response:
+        _LOGGER.debug("Horus daemon did not run the command: %s", response["error"])
+        return None
+
+    return response
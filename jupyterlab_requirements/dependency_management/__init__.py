@@ -16,41 +16,61 @@
 
 """Dependency Management APIs for jupyter server."""
 
-from .api import YamlSpecHandler
-from .base import DependencyManagementBaseHandler
-from .dependencies_files_handler import DependenciesFilesHandler
-from .dependencies_files_handler import DependenciesNotebookNameHandler
-from .dependencies_stored_handler import DependenciesStoredHandler
-from .discover_handler import DependencyInstalledHandler
-from .discover_handler import PythonVersionHandler
-from .discover_handler import RootPathHandler
-from .kernel_handler import JupyterKernelHandler
-from .install_handler import DependencyInstallHandler
-from .pipenv import PipenvHandler
-from .thoth import ThothAdviseHandler
-from .thoth_config_handler import ThothConfigHandler
-from .thoth_invectio import ThothInvectioHandler
+import importlib
+import typing
 
-from .lib import _EMOJI
-from .lib import create_pipfile_from_packages
-from .lib import gather_libraries
-from .lib import get_packages
-from .lib import get_notebook_content
-from .lib import horus_check_metadata_content
-from .lib import horus_delete_kernel
-from .lib import horus_extract_command
-from .lib import horus_lock_command
-from .lib import horus_log_command
-from .lib import horus_requirements_command
-from .lib import horus_set_kernel_command
-from .lib import horus_show_command
-from .lib import horus_list_kernels
-from .lib import load_files
-from .lib import print_report
-from .lib import save_notebook_content
-from .lib import verify_gathered_libraries
+# Attributes are imported from their module on first access, so that importing a module of the package
+# (e.g. lib in horus CLI) does not import server handlers and their dependencies.
+_ATTRIBUTES_MODULES = {
+    "YamlSpecHandler": ".api",
+    "DependencyManagementBaseHandler": ".base",
+    "DependenciesFilesHandler": ".dependencies_files_handler",
+    "DependenciesNotebookNameHandler": ".dependencies_files_handler",
+    "DependenciesStoredHandler": ".dependencies_stored_handler",
+    "DependencyInstalledHandler": ".discover_handler",
+    "PythonVersionHandler": ".discover_handler",
+    "RootPathHandler": ".discover_handler",
+    "JupyterKernelHandler": ".kernel_handler",
+    "TaskEventsHandler": ".base",
+    "DependencyInstallHandler": ".install_handler",
+    "PipenvHandler": ".pipenv",
+    "ThothAdviseHandler": ".thoth",
+    "ThothConfigHandler": ".thoth_config_handler",
+    "ThothInvectioHandler": ".thoth_invectio",
+    "_EMOJI": ".lib",
+    "create_pipfile_from_packages": ".lib",
+    "gather_libraries": ".lib",
+    "get_packages": ".lib",
+    "get_notebook_content": ".lib",
+    "get_notebook_metadata": ".lib",
+    "horus_check_metadata_content": ".lib",
+    "horus_delete_kernel": ".lib",
+    "horus_extract_command": ".lib",
+    "horus_lock_command": ".lib",
+    "horus_log_command": ".lib",
+    "horus_requirements_command": ".lib",
+    "horus_set_kernel_command": ".lib",
+    "horus_show_command": ".lib",
+    "horus_list_kernels": ".lib",
+    "load_files": ".lib",
+    "print_report": ".lib",
+    "save_notebook_content": ".lib",
+    "save_notebook_metadata": ".lib",
+    "verify_gathered_libraries": ".lib",
+    "HorusMagics": ".magic_commands",
+}
+
+
+def __getattr__(name: str) -> typing.Any:
+    """Import attribute from its module on first access."""
+    if name not in _ATTRIBUTES_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_ATTRIBUTES_MODULES[name], __name__), name)
+    globals()[name] = value
+
+    return value
 
-from .magic_commands import HorusMagics
 
 __all__ = [
     "DependencyManagementBaseHandler",
@@ -63,6 +83,7 @@ __all__ = [
     "PipenvHandler",
     "PythonVersionHandler",
     "RootPathHandler",
+    "TaskEventsHandler",
     "ThothAdviseHandler",
     "ThothConfigHandler",
     "ThothInvectioHandler",
@@ -71,6 +92,7 @@ __all__ = [
     "get_packages",
     "gather_libraries",
     "get_notebook_content",
+    "get_notebook_metadata",
     "horus_check_metadata_content",
     "horus_delete_kernel",
     "horus_extract_command",
@@ -83,6 +105,7 @@ __all__ = [
     "load_files",
     "print_report",
     "save_notebook_content",
+    "save_notebook_metadata",
     "verify_gathered_libraries",
     "HorusMagics",
     "_EMOJI",
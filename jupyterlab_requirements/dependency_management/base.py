@@ -16,6 +16,7 @@
 
 """Base class for async tasks for jupyterlab requirements."""
 
+import os
 import sys
 import asyncio
 import traceback
@@ -23,34 +24,94 @@ import logging
 import tornado
 import json
 
+from tornado.iostream import StreamClosedError
+
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 from tornado import web
-from typing import Any, Dict, Callable
+from typing import Any, Dict, Callable, Optional
 
 from jupyter_server.base.handlers import APIHandler
 
+from .progress import TaskProgress
+from .progress import recording
+from .progress import run_recording
+
 NAMESPACE = r"jupyterlab_requirements"
 
 _LOGGER = logging.getLogger("jupyterlab_requirements.base")
 
+# Maximum number of blocking jobs (lock, install) run at the same time by the server.
+_MAX_WORKERS = int(os.getenv("JUPYTERLAB_REQUIREMENTS_MAX_WORKERS", 2))
+# Pool used to run blocking jobs: "thread" or "process".
+_EXECUTOR_TYPE = os.getenv("JUPYTERLAB_REQUIREMENTS_EXECUTOR", "thread")
+# Seconds between comments sent on idle events streams, so that proxies do not close them.
+_EVENTS_KEEPALIVE = float(os.getenv("JUPYTERLAB_REQUIREMENTS_EVENTS_KEEPALIVE", 15))
+
 
 class AsyncTasks:
-    """Handle long asynchronous task for dependencies management."""
+    """Handle long asynchronous task for dependencies management.
+
+    Coroutine functions are awaited on the event loop, any other callable is considered blocking
+    and it is dispatched to a bounded executor so that the Jupyter server keeps serving requests.
+    Progress reported by tasks is recorded for each task, except for tasks run in a process pool
+    which only record when they start and finish.
+    """
 
     task_index = 0
 
-    def __init__(self) -> None:
+    def __init__(self, max_workers: int = _MAX_WORKERS, executor_type: str = _EXECUTOR_TYPE) -> None:
         """Init."""
         self.tasks: Dict[int, asyncio.Task] = dict()  # type: ignore
+        self.progress: Dict[int, TaskProgress] = dict()
+        self._executor: Optional[Executor] = None
+
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Executor type {executor_type!r} is not supported, use 'thread' or 'process'.")
+
+        self.max_workers = max(1, max_workers)
+        self.executor_type = executor_type
+
+    @property
+    def executor(self) -> Executor:
+        """Get executor used for blocking tasks, create it on first use."""
+        if self._executor is None:
+            _LOGGER.debug(f"Creating {self.executor_type} pool with {self.max_workers} workers.")
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="jupyterlab_requirements"
+                )
+
+        return self._executor
 
     def create_task(self, task: Callable, task_inputs) -> int:  # type: ignore
-        """Add an asynchronous task into the queue."""
+        """Add an asynchronous task into the queue.
+
+        When running in a process pool, blocking tasks and their inputs must be picklable.
+        """
         AsyncTasks.task_index += 1
         task_index = AsyncTasks.task_index
 
+        progress = TaskProgress()
+
         async def _run_task(task_index, task, task_inputs) -> Any:  # type: ignore
+            error = True
             try:
                 _LOGGER.debug(f"Task to be executed {task_index}.")
-                result = await task(task_inputs)
+                progress.add("phase", phase="started", percentage=0)
+                if asyncio.iscoroutinefunction(task):
+                    with recording(progress):
+                        result = await task(task_inputs)
+                elif self.executor_type == "thread":
+                    loop = asyncio.get_event_loop()
+                    result = await loop.run_in_executor(self.executor, run_recording, progress, task, task_inputs)
+                else:
+                    loop = asyncio.get_event_loop()
+                    result = await loop.run_in_executor(self.executor, task, task_inputs)
+                error = isinstance(result, dict) and bool(result.get("error"))
             except asyncio.CancelledError:
                 raise
             except Exception as e:
@@ -64,9 +125,12 @@ class AsyncTasks:
                 _LOGGER.error(f"Error for task index {task_index}: {result}")
             else:
                 _LOGGER.debug(f"Task index {task_index} run.")
+            finally:
+                progress.finish(error=error)
 
             return result
 
+        self.progress[task_index] = progress
         self.tasks[task_index] = asyncio.ensure_future(_run_task(task_index, task, task_inputs))
 
         return task_index
@@ -78,12 +142,24 @@ class AsyncTasks:
 
         if self.tasks[task_index].done():
             task = self.tasks.pop(task_index)
+            self.progress.pop(task_index, None)
             return task.result()
         else:
             return None
 
+    def get_progress(self, task_index: int) -> TaskProgress:
+        """Get the task `idx` progress, kept until its result is taken."""
+        if task_index not in self.progress:
+            raise ValueError(f"Task index {task_index} does not exists.")
+
+        return self.progress[task_index]
+
     def delete_task(self, task_index: int) -> None:
-        """Delete the task using task_index."""
+        """Delete the task using task_index.
+
+        A blocking task which is already running in the executor cannot be interrupted,
+        its result is discarded once it finishes.
+        """
         _LOGGER.debug(f"Cancel task index {task_index}.")
         if task_index not in self.tasks:
             raise ValueError(f"Task index {task_index} does not exists.")
@@ -95,6 +171,9 @@ class AsyncTasks:
         for task in filter(lambda t: not t.cancelled(), self.tasks.values()):
             task.cancel()
 
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
 
 class DependencyManagementBaseHandler(APIHandler):
     """Bsse Handler for dependency management."""
@@ -136,3 +215,67 @@ class DependencyManagementBaseHandler(APIHandler):
         self.set_status(202)
         self.set_header("Location", "/{}/tasks/{}".format(NAMESPACE, task_index))
         self.finish("{}")  # type: ignore
+
+
+class TaskEventsHandler(DependencyManagementBaseHandler):
+    """Handler streaming progress of long running tasks as server-sent events."""
+
+    @web.authenticated
+    async def get(self, index: int):  # type: ignore
+        """`GET /tasks/<id>/events` Streams the task `index` progress events until it finishes.
+
+        Each event is sent with its id and type (`phase`, `log`, `done`), data is the event JSON.
+        Clients reconnecting with `Last-Event-ID` header receive only the events following it.
+        The task result is then returned by `GET /tasks/<id>`.
+
+        Args:
+            index (int): Task index
+
+        Raises:
+            404 if task `index` does not exist
+
+        """
+        try:
+            progress = self._tasks.get_progress(int(index))
+        except ValueError as err:
+            raise tornado.web.HTTPError(404, reason=str(err))
+
+        last_event_id = self.request.headers.get("Last-Event-ID", "")
+        start = int(last_event_id) + 1 if last_event_id.isdigit() else 0
+
+        self.set_header("Content-Type", "text/event-stream")
+        self.set_header("Cache-Control", "no-cache")
+
+        loop = asyncio.get_event_loop()
+        changed = asyncio.Event()
+
+        def _notify() -> None:
+            loop.call_soon_threadsafe(changed.set)
+
+        progress.subscribe(_notify)
+
+        try:
+            while True:
+                changed.clear()
+                events = progress.get_events(start)
+
+                for event in events:
+                    self.write(f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n")
+
+                start += len(events)
+                await self.flush()
+
+                if events and events[-1]["type"] == "done":
+                    break
+
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=_EVENTS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    self.write(": keepalive\n\n")
+        except StreamClosedError:
+            _LOGGER.debug(f"Events stream of task index {index} closed by the client.")
+            return
+        finally:
+            progress.unsubscribe(_notify)
+
+        self.finish()
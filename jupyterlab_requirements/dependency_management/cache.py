@@ -0,0 +1,220 @@
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""On disk caches for jupyterlab-requirements."""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+import typing
+
+from pathlib import Path
+
+_LOGGER = logging.getLogger("jupyterlab_requirements.cache")
+
+CACHE_PATH = Path.home().joinpath(".local/share/thoth/cache")
+
+# Maximum size of the lock results cache in MB.
+_LOCK_CACHE_SIZE = int(os.getenv("JUPYTERLAB_REQUIREMENTS_LOCK_CACHE_SIZE", 100))
+
+# Seconds packages identified for an import name are reused (default one day).
+_IMPORT_NAMES_TTL = float(os.getenv("JUPYTERLAB_REQUIREMENTS_IMPORT_NAMES_TTL", 24 * 60 * 60))
+
+_IMPORT_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_.]*$")
+
+
+def _write_json_atomic(path: Path, content: typing.Any) -> None:
+    """Write JSON content to path, replacing it atomically so that concurrent readers never see partial files."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    file_descriptor, temp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(file_descriptor, "w") as temp_file:
+            json.dump(content, temp_file)
+
+        os.replace(temp_path, path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+
+
+class LockCache:
+    """Content-addressed cache of lock results, with size-bounded LRU eviction.
+
+    Entries are keyed by Pipfile hash, runtime environment, resolution engine and any other input of the
+    resolution (e.g. labels), therefore identical requests for different notebooks share the same result.
+    """
+
+    def __init__(
+        self,
+        cache_path: Path = CACHE_PATH.joinpath("locks"),
+        max_size: int = _LOCK_CACHE_SIZE * 1024 * 1024,
+    ) -> None:
+        """Init."""
+        self.cache_path = cache_path
+        self.max_size = max_size
+
+    @staticmethod
+    def compute_key(
+        pipfile_hash: str,
+        runtime_environment: typing.Dict[str, typing.Any],
+        resolution_engine: str,
+        resolution_inputs: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    ) -> str:
+        """Compute cache key for a lock request."""
+        key_content = json.dumps(
+            {
+                "pipfile_hash": pipfile_hash,
+                "runtime_environment": runtime_environment,
+                "resolution_engine": resolution_engine,
+                "resolution_inputs": resolution_inputs or {},
+            },
+            sort_keys=True,
+        )
+
+        return hashlib.sha256(key_content.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """Get lock results stored for the given key, if any."""
+        entry_path = self.cache_path.joinpath(f"{key}.json")
+
+        try:
+            with open(entry_path) as entry_file:
+                result: typing.Dict[str, typing.Any] = json.load(entry_file)
+        except FileNotFoundError:
+            _LOGGER.debug("Lock cache miss for key %r", key)
+            return None
+        except Exception as e:
+            _LOGGER.warning("Lock cache entry %r could not be read: %r", entry_path.as_posix(), e)
+            return None
+
+        # Access time is tracked with mtime, which is used for LRU eviction.
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        _LOGGER.debug("Lock cache hit for key %r", key)
+        return result
+
+    def set(self, key: str, value: typing.Dict[str, typing.Any]) -> None:
+        """Store lock results for the given key and evict least recently used entries if needed."""
+        try:
+            _write_json_atomic(self.cache_path.joinpath(f"{key}.json"), value)
+        except Exception as e:
+            _LOGGER.warning("Lock results could not be stored in cache: %r", e)
+            return
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until cache size is within the limit."""
+        entries = []
+        for entry_path in self.cache_path.glob("*.json"):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+        total_size = sum(size for _, size, _ in entries)
+
+        for _, size, entry_path in sorted(entries, key=lambda e: e[0]):
+            if total_size <= self.max_size:
+                break
+
+            _LOGGER.debug("Evicting lock cache entry %r", entry_path.name)
+            try:
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass
+
+            total_size -= size
+
+
+class ImportNamesCache:
+    """Packages providing an import name, stored on disk with a TTL and kept in memory.
+
+    Entries are shared by all the notebooks (and users sharing the same home) on the server.
+    """
+
+    def __init__(self, cache_path: Path = CACHE_PATH.joinpath("import_names"), ttl: float = _IMPORT_NAMES_TTL) -> None:
+        """Init."""
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._entries: typing.Dict[str, typing.Tuple[float, typing.List[typing.Dict[str, str]]]] = {}
+        self._lock = threading.Lock()
+
+    def _get_entry_path(self, import_name: str) -> typing.Optional[Path]:
+        """Get path of the entry for the import name, None if it cannot be used as file name."""
+        if not _IMPORT_NAME_RE.match(import_name):
+            return None
+
+        return self.cache_path.joinpath(f"{import_name}.json")
+
+    def get(self, import_name: str) -> typing.Optional[typing.List[typing.Dict[str, str]]]:
+        """Get packages stored for the import name, if any and not expired."""
+        with self._lock:
+            entry = self._entries.get(import_name)
+
+        entry_path = self._get_entry_path(import_name)
+
+        if entry is None and entry_path is not None:
+            try:
+                with open(entry_path) as entry_file:
+                    content = json.load(entry_file)
+
+                entry = (content["timestamp"], content["packages"])
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                _LOGGER.warning("Import name cache entry %r could not be read: %r", entry_path.as_posix(), e)
+
+        if entry is None or time.time() - entry[0] > self.ttl:
+            _LOGGER.debug("Import name cache miss for %r", import_name)
+            return None
+
+        with self._lock:
+            self._entries[import_name] = entry
+
+        _LOGGER.debug("Import name cache hit for %r", import_name)
+        return list(entry[1])
+
+    def set(self, import_name: str, packages: typing.List[typing.Dict[str, str]]) -> None:
+        """Store packages identified for the import name."""
+        entry = (time.time(), list(packages))
+
+        with self._lock:
+            self._entries[import_name] = entry
+
+        entry_path = self._get_entry_path(import_name)
+        if entry_path is None:
+            return
+
+        try:
+            _write_json_atomic(entry_path, {"timestamp": entry[0], "packages": entry[1]})
+        except Exception as e:
+            _LOGGER.warning("Packages for import name %r could not be stored in cache: %r", import_name, e)
+
+
+# Shared by all the handlers and commands running in the same process.
+import_names_cache = ImportNamesCache()
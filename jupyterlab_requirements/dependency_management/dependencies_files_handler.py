@@ -17,7 +17,6 @@
 """Requirements API for jupyterlab requirements."""
 
 import json
-import os
 import logging
 import subprocess
 
@@ -37,7 +36,6 @@ class DependenciesFilesHandler(APIHandler):
     @web.authenticated
     def post(self):  # type: ignore
         """Store requirements file to disk."""
-        initial_path = Path.cwd()
         input_data = self.get_json_body()  # type: ignore
 
         # Path of the repo where we need to store
@@ -58,8 +56,6 @@ class DependenciesFilesHandler(APIHandler):
 
         env_path.mkdir(parents=True, exist_ok=True)
 
-        os.chdir(env_path)
-
         requirements_format = "pipenv"
 
         project = Project.from_strings(requirements, requirements_lock)
@@ -70,8 +66,6 @@ class DependenciesFilesHandler(APIHandler):
         if requirements_format == "pipenv":
             _LOGGER.debug("Writing to Pipfile/Pipfile.lock in %r", env_path)
             project.to_files(pipfile_path=pipfile_path, pipfile_lock_path=pipfile_lock_path)
-
-        os.chdir(initial_path)
         self.finish(json.dumps({"message": f"Successfully stored requirements at {env_path}!"}))  # type: ignore
 
 
@@ -28,6 +28,7 @@ from jupyter_server.base.handlers import APIHandler
 from tornado import web
 
 from .lib import get_packages
+from .site_packages import packages_cache
 
 _LOGGER = logging.getLogger("jupyterlab_requirements.discover_handler")
 
@@ -46,6 +47,11 @@ class DependencyInstalledHandler(APIHandler):
 
         self.finish(json.dumps(packages))  # type: ignore
 
+    @web.authenticated
+    def get(self):  # type: ignore
+        """Get hit/miss counters of installed packages cache."""
+        self.finish(json.dumps(packages_cache.stats()))  # type: ignore
+
 
 class PythonVersionHandler(APIHandler):
     """Dependency management handler to discover Python version present."""
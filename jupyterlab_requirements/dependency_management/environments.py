@@ -0,0 +1,495 @@
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Kernel virtual environments created cloning a prepared base environment."""
+
+import os
+import sys
+import json
+import errno
+import fcntl
+import shutil
+import hashlib
+import logging
+import platform
+import threading
+import subprocess
+import time
+import uuid
+import typing
+
+from pathlib import Path
+
+from .cache import _write_json_atomic
+from .import_index import _normalize
+
+_LOGGER = logging.getLogger("jupyterlab_requirements.environments")
+
+# Set to 0 to create each kernel environment with virtualenv and install tooling in it.
+_CLONE_BASE_ENVIRONMENT = bool(int(os.getenv("JUPYTERLAB_REQUIREMENTS_CLONE_BASE_ENVIRONMENT", 1)))
+
+# Tooling needed in every kernel environment.
+BASE_PACKAGES = ("micropipenv", "ipykernel", "jupyterlab-requirements")
+
+# Base environments depend on the interpreter virtualenv uses to create kernels environments.
+_INTERPRETER_ID = "{}-{}".format(
+    sys.implementation.cache_tag, hashlib.sha256(os.path.realpath(sys.executable).encode("utf-8")).hexdigest()[:8]
+)
+
+BASE_ENVIRONMENTS_PATH = Path(
+    os.getenv("JUPYTERLAB_REQUIREMENTS_BASE_ENVIRONMENTS_PATH", Path.home().joinpath(".local/share/thoth/base"))
+)
+
+# Written when the base environment is complete, with the tooling versions installed.
+_BASE_MARKER = ".jupyterlab-requirements-base.json"
+
+# Number of environments kept ready by the server extension for new kernels (0 disables the pool).
+_POOL_SIZE = int(os.getenv("JUPYTERLAB_REQUIREMENTS_POOL_SIZE", 0))
+
+# Seconds between the creation of two environments of the pool.
+_POOL_REFILL_INTERVAL = float(os.getenv("JUPYTERLAB_REQUIREMENTS_POOL_REFILL_INTERVAL", 30))
+
+POOL_PATH = Path(os.getenv("JUPYTERLAB_REQUIREMENTS_POOL_PATH", Path.home().joinpath(".local/share/thoth/pool")))
+
+# Stored in environments of the pool, with the path they were created at.
+_POOL_MARKER = ".jupyterlab-requirements-pool.json"
+
+# Stored in kernel environments, describes the Pipfile.lock installed.
+_STATE_FILE = ".jupyterlab-requirements-state.json"
+
+# Linux ioctl cloning a file sharing its blocks (copy on write), e.g. on btrfs or xfs.
+_FICLONE = 0x40049409
+
+# Errors raised when the file system (or the kernel) does not support a clone method.
+_UNSUPPORTED_ERRNOS = (errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV, errno.EPERM)
+
+
+def _reflink(source: str, destination: str) -> None:
+    """Clone file sharing its content on disk, raise OSError if the file system does not support it."""
+    with open(source, "rb") as source_file, open(destination, "wb") as destination_file:
+        try:
+            fcntl.ioctl(destination_file.fileno(), _FICLONE, source_file.fileno())
+        except OSError:
+            destination_file.close()
+            os.unlink(destination)
+            raise
+
+    shutil.copystat(source, destination)
+
+
+class _FileCloner:
+    """Clone files with reflinks, hardlinks or copies, using the first method the file system supports."""
+
+    _METHODS = ("reflink", "hardlink", "copy")
+
+    def __init__(self) -> None:
+        """Init."""
+        self.methods = list(self._METHODS)
+        self.counts = {method: 0 for method in self._METHODS}
+
+    def clone(self, source: str, destination: str) -> None:
+        """Clone source file to destination."""
+        while True:
+            method = self.methods[0]
+
+            try:
+                if method == "reflink":
+                    _reflink(source, destination)
+                elif method == "hardlink":
+                    os.link(source, destination)
+                else:
+                    shutil.copy2(source, destination)
+            except OSError as e:
+                if method == "copy" or e.errno not in _UNSUPPORTED_ERRNOS:
+                    raise
+
+                _LOGGER.debug("Files cannot be cloned with %s: %r", method, e)
+                self.methods.pop(0)
+                continue
+
+            self.counts[method] += 1
+            return
+
+
+def _rewrite_prefix(source: str, destination: str, base_prefix: bytes, env_prefix: bytes) -> bool:
+    """Copy file replacing base environment path with the new environment path, False if it does not contain it."""
+    with open(source, "rb") as source_file:
+        content = source_file.read()
+
+    if base_prefix not in content:
+        return False
+
+    with open(destination, "wb") as destination_file:
+        destination_file.write(content.replace(base_prefix, env_prefix))
+
+    shutil.copymode(source, destination)
+    return True
+
+
+def clone_environment(base_path: Path, env_path: Path) -> typing.Dict[str, int]:
+    """Clone virtual environment at base_path to env_path, files already present in env_path are kept.
+
+    Packages are shared with the base environment (reflinks or hardlinks, copies if links are not supported),
+    scripts and configuration referring to the base environment path (e.g. activate scripts, console scripts
+    shebangs) are rewritten for the new environment. Return the number of files cloned with each method.
+    """
+    base_prefix = os.fsencode(os.path.abspath(base_path))
+    env_prefix = os.fsencode(os.path.abspath(env_path))
+
+    cloner = _FileCloner()
+    rewritten = 0
+
+    env_path.mkdir(parents=True, exist_ok=True)
+
+    for root, directories, files in os.walk(base_path):
+        relative_root = os.path.relpath(root, base_path)
+        target_root = os.path.normpath(os.path.join(env_path, relative_root))
+        # Scripts and configuration files refer to the environment with absolute paths.
+        rewrite = relative_root in ("bin", "Scripts", ".")
+
+        for name in directories + files:
+            source = os.path.join(root, name)
+            destination = os.path.join(target_root, name)
+
+            if name == _BASE_MARKER or os.path.lexists(destination):
+                continue
+
+            if os.path.islink(source):
+                link = os.fsencode(os.readlink(source))
+                if link.startswith(base_prefix):
+                    link = env_prefix + link[len(base_prefix) :]
+
+                os.symlink(os.fsdecode(link), destination)
+
+            elif name in directories:
+                os.mkdir(destination)
+                shutil.copymode(source, destination)
+
+            elif rewrite and _rewrite_prefix(source, destination, base_prefix, env_prefix):
+                rewritten += 1
+
+            else:
+                cloner.clone(source, destination)
+
+        # Symlinks to directories (e.g. lib64 -> lib) are created as they are, their content is not walked.
+        directories[:] = [d for d in directories if not os.path.islink(os.path.join(root, d))]
+
+    return dict(cloner.counts, rewritten=rewritten)
+
+
+def _get_base_path() -> Path:
+    """Get path of the base environment for the interpreter used to create kernels."""
+    return BASE_ENVIRONMENTS_PATH.joinpath(_INTERPRETER_ID)
+
+
+def prepare_base_environment(base_path: typing.Optional[Path] = None, force: bool = False) -> Path:
+    """Create base environment with tooling needed in kernels, if it does not exist yet.
+
+    Concurrent calls (also from different processes) wait for the environment to be created once.
+    """
+    from virtualenv import cli_run
+
+    base_path = base_path or _get_base_path()
+    base_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(base_path.parent.joinpath(f"{base_path.name}.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        if base_path.joinpath(_BASE_MARKER).exists() and not force:
+            return base_path
+
+        # Incomplete environment left by a failed attempt.
+        shutil.rmtree(base_path, ignore_errors=True)
+
+        _LOGGER.info("Creating base environment for kernels at %s", base_path)
+
+        try:
+            cli_run([str(base_path)])
+            subprocess.run(
+                [str(base_path.joinpath("bin", "python")), "-m", "pip", "install", "--quiet", *BASE_PACKAGES],
+                check=True,
+                capture_output=True,
+            )
+        except Exception:
+            shutil.rmtree(base_path, ignore_errors=True)
+            raise
+
+        with open(base_path.joinpath(_BASE_MARKER), "w") as marker_file:
+            json.dump({"python": sys.executable, "packages": list(BASE_PACKAGES)}, marker_file)
+
+    return base_path
+
+
+def _relocate_environment(env_path: Path, previous_path: str) -> None:
+    """Update scripts and configuration of an environment moved from previous_path to env_path."""
+    previous_prefix = os.fsencode(previous_path)
+    env_prefix = os.fsencode(os.path.abspath(env_path))
+
+    for directory in (env_path, env_path.joinpath("bin")):
+        for entry in os.scandir(directory):
+            if entry.is_symlink():
+                link = os.fsencode(os.readlink(entry.path))
+                if link.startswith(previous_prefix):
+                    os.unlink(entry.path)
+                    os.symlink(os.fsdecode(env_prefix + link[len(previous_prefix) :]), entry.path)
+
+            elif entry.is_file():
+                # Files are replaced, they can be hardlinks shared with the base environment.
+                temp_path = f"{entry.path}.relocate"
+                if _rewrite_prefix(entry.path, temp_path, previous_prefix, env_prefix):
+                    os.replace(temp_path, entry.path)
+
+
+class EnvironmentsPool:
+    """Environments created in advance from the base environment, claimed by new kernels.
+
+    Environments are created in a hidden directory and renamed when ready, claiming renames them
+    again, so an environment is claimed once also by concurrent processes. The pool is refilled
+    in background by the server extension, creating one environment every `refill_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        pool_path: Path = POOL_PATH,
+        size: int = _POOL_SIZE,
+        refill_interval: float = _POOL_REFILL_INTERVAL,
+        base_path: typing.Optional[Path] = None,
+    ) -> None:
+        """Init."""
+        self.pool_path = pool_path.joinpath(_INTERPRETER_ID)
+        self.base_path = base_path
+        self.size = size
+        self.refill_interval = refill_interval
+        self._stop = threading.Event()
+        self._refill = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    def get_ready(self) -> typing.List[str]:
+        """Get names of environments ready to be claimed."""
+        try:
+            return sorted(name for name in os.listdir(self.pool_path) if not name.startswith("."))
+        except FileNotFoundError:
+            return []
+
+    def claim(self, env_path: Path) -> bool:
+        """Move an environment of the pool to env_path, False if no environment is ready."""
+        for name in self.get_ready():
+            claimed_path = self.pool_path.joinpath(f".claimed-{name}")
+
+            try:
+                os.rename(self.pool_path.joinpath(name), claimed_path)
+            except FileNotFoundError:
+                # Claimed by another process.
+                continue
+
+            with open(claimed_path.joinpath(_POOL_MARKER)) as marker_file:
+                created_path = json.load(marker_file)["path"]
+
+            claimed_path.joinpath(_POOL_MARKER).unlink()
+            env_path.mkdir(parents=True, exist_ok=True)
+
+            for entry in os.scandir(claimed_path):
+                os.rename(entry.path, env_path.joinpath(entry.name))
+
+            claimed_path.rmdir()
+            _relocate_environment(env_path, previous_path=created_path)
+
+            _LOGGER.info("Environment at %s claimed from the pool", env_path)
+            self._refill.set()
+
+            return True
+
+        return False
+
+    def _remove_stale(self, max_age: float = 3600) -> None:
+        """Remove environments left by processes interrupted while creating or claiming them."""
+        for entry in os.scandir(self.pool_path):
+            if entry.name.startswith((".new-", ".claimed-")) and time.time() - entry.stat().st_mtime > max_age:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def add(self) -> str:
+        """Create a new environment in the pool, return its name."""
+        base_path = prepare_base_environment(self.base_path)
+
+        name = uuid.uuid4().hex
+        new_path = self.pool_path.joinpath(f".new-{name}")
+        clone_environment(base_path, new_path)
+
+        with open(new_path.joinpath(_POOL_MARKER), "w") as marker_file:
+            json.dump({"path": os.path.abspath(new_path)}, marker_file)
+
+        os.rename(new_path, self.pool_path.joinpath(name))
+        _LOGGER.debug("Environment %s added to the pool", name)
+
+        return name
+
+    def _maintain(self) -> None:
+        """Keep pool filled until stopped."""
+        while not self._stop.is_set():
+            self._refill.clear()
+
+            try:
+                self.pool_path.mkdir(parents=True, exist_ok=True)
+                self._remove_stale()
+
+                if len(self.get_ready()) < self.size:
+                    self.add()
+                    self._stop.wait(self.refill_interval)
+                    continue
+            except Exception as e:
+                _LOGGER.warning("Environment could not be added to the pool: %r", e)
+                self._stop.wait(self.refill_interval)
+                continue
+
+            # Pool is full, wait for an environment to be claimed (also checked periodically for other processes).
+            self._refill.wait(self.refill_interval)
+
+    def start(self) -> None:
+        """Start filling the pool in background, if enabled."""
+        if self.size <= 0 or (self._thread and self._thread.is_alive()):
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._maintain, name="jupyterlab_requirements_pool", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop filling the pool."""
+        self._stop.set()
+        self._refill.set()
+
+        if self._thread:
+            self._thread.join()
+
+
+def create_environment(env_path: Path) -> None:
+    """Create virtual environment for a kernel, with tooling already installed.
+
+    Environments are claimed from the pool if one is ready, otherwise cloned from the base environment.
+    Environments which exist already and environments which cannot be cloned are created with virtualenv.
+    """
+    from virtualenv import cli_run
+
+    if _CLONE_BASE_ENVIRONMENT and not env_path.joinpath("pyvenv.cfg").exists():
+        try:
+            if environments_pool.claim(env_path):
+                return
+
+            base_path = prepare_base_environment()
+            counts = clone_environment(base_path, env_path)
+            _LOGGER.info("Environment at %s cloned from %s: %r", env_path, base_path, counts)
+            return
+        except Exception as e:
+            _LOGGER.warning("Base environment could not be cloned, creating environment with virtualenv: %r", e)
+
+            # Remove the partially cloned environment, keeping files (e.g. Pipfile) stored before.
+            for name in ("bin", "lib", "lib64", "include", "share", "pyvenv.cfg"):
+                path = env_path.joinpath(name)
+                if path.is_symlink() or path.is_file():
+                    path.unlink()
+                elif path.exists():
+                    shutil.rmtree(path, ignore_errors=True)
+
+    cli_run([str(env_path)])
+
+
+def _get_python_version(env_path: Path) -> typing.Optional[str]:
+    """Get version of the interpreter of the virtual environment, reading its pyvenv.cfg."""
+    try:
+        with open(env_path.joinpath("pyvenv.cfg")) as config_file:
+            for line in config_file:
+                key, separator, value = line.partition("=")
+                if separator and key.strip() == "version":
+                    return value.strip()
+    except OSError:
+        pass
+
+    return None
+
+
+def _get_locked_entries(pipfile_lock: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+    """Get all packages locked (normalized name -> entry), as installed with --dev."""
+    entries: typing.Dict[str, typing.Any] = {}
+
+    for section in ("default", "develop"):
+        for name, entry in pipfile_lock.get(section, {}).items():
+            entries.setdefault(_normalize(name), entry)
+
+    return entries
+
+
+def compute_fingerprint(pipfile_lock: typing.Dict[str, typing.Any], python_version: str) -> str:
+    """Compute fingerprint of an environment with Pipfile.lock installed using the given Python version."""
+    content = json.dumps({"pipfile_lock": pipfile_lock, "python_version": python_version}, sort_keys=True)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def save_environment_state(env_path: Path, pipfile_lock: typing.Dict[str, typing.Any]) -> None:
+    """Store fingerprint and packages of Pipfile.lock installed in the environment."""
+    python_version = _get_python_version(env_path)
+
+    if not python_version:
+        return
+
+    state = {
+        "fingerprint": compute_fingerprint(pipfile_lock, python_version),
+        "python_version": python_version,
+        "packages": _get_locked_entries(pipfile_lock),
+    }
+    _write_json_atomic(env_path.joinpath(_STATE_FILE), state)
+
+
+def clear_environment_state(env_path: Path) -> None:
+    """Remove state of the environment, e.g. while packages are being installed."""
+    try:
+        env_path.joinpath(_STATE_FILE).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def get_environment_changes(
+    env_path: Path, pipfile_lock: typing.Dict[str, typing.Any]
+) -> typing.Optional[typing.Dict[str, typing.List[str]]]:
+    """Get packages to install and to remove so that the environment matches Pipfile.lock.
+
+    None is returned if the environment must be created again: it does not exist, it was not
+    installed completely or it uses a Python version different from the one creating environments.
+    """
+    try:
+        with open(env_path.joinpath(_STATE_FILE)) as state_file:
+            state = json.load(state_file)
+    except (OSError, ValueError):
+        return None
+
+    python_version = _get_python_version(env_path)
+
+    if python_version != state.get("python_version") or python_version != platform.python_version():
+        return None
+
+    if state.get("fingerprint") == compute_fingerprint(pipfile_lock, python_version):
+        return {"install": [], "remove": []}
+
+    installed = state.get("packages", {})
+    locked = _get_locked_entries(pipfile_lock)
+
+    return {
+        "install": sorted(name for name, entry in locked.items() if installed.get(name) != entry),
+        "remove": sorted(name for name in installed if name not in locked),
+    }
+
+
+# Shared by all the handlers and commands running in the same process.
+environments_pool = EnvironmentsPool()
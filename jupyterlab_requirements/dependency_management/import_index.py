@@ -0,0 +1,222 @@
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Offline index of import names provided by distributions available locally."""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+import typing
+import zipfile
+
+from pathlib import Path
+
+from .cache import CACHE_PATH
+from .cache import _write_json_atomic
+from .site_packages import get_distributions_import_names
+from .site_packages import get_site_packages_paths
+from .site_packages import parse_top_level_names
+
+_LOGGER = logging.getLogger("jupyterlab_requirements.import_index")
+
+_INDEX_VERSION = 1
+
+# Seconds sources are not checked again for changes after a refresh.
+_REFRESH_INTERVAL = 30.0
+
+_PIP_WHEELS_CACHE_PATH = Path(os.getenv("PIP_CACHE_DIR", Path.home().joinpath(".cache/pip"))).joinpath("wheels")
+
+# Directories where wheels are looked for, separated by os.pathsep (default pip wheels cache).
+_WHEELS_PATHS = [
+    Path(path)
+    for path in os.getenv("JUPYTERLAB_REQUIREMENTS_WHEELS_PATHS", _PIP_WHEELS_CACHE_PATH.as_posix()).split(os.pathsep)
+    if path
+]
+
+
+def _normalize(distribution_name: str) -> str:
+    """Normalize distribution name, as done by PEP 503."""
+    return re.sub(r"[-_.]+", "-", distribution_name).lower()
+
+
+def _get_wheel_import_names(wheel_path: str) -> typing.Dict[str, typing.List[str]]:
+    """Get top level import names of the distribution packaged in the wheel, without installing it."""
+    # Wheel file name is {name}-{version}(-{build})?-{python}-{abi}-{platform}.whl with escaped name.
+    distribution_name = os.path.basename(wheel_path).split("-", maxsplit=1)[0].replace("_", "-")
+
+    top_level = None
+    record = None
+
+    try:
+        with zipfile.ZipFile(wheel_path) as wheel:
+            for name in wheel.namelist():
+                directory, _, file_name = name.rpartition("/")
+                if directory.count("/") or not directory.endswith(".dist-info"):
+                    continue
+
+                if file_name == "top_level.txt":
+                    top_level = wheel.read(name).decode("utf-8", errors="replace")
+                elif file_name == "RECORD":
+                    record = wheel.read(name).decode("utf-8", errors="replace")
+    except (OSError, zipfile.BadZipFile) as e:
+        _LOGGER.debug("Wheel %r could not be read: %r", wheel_path, e)
+        return {}
+
+    import_names = parse_top_level_names(top_level=top_level, record=record)
+
+    return {distribution_name: import_names} if import_names else {}
+
+
+class ImportNamesIndex:
+    """Index of top level import names to distribution names, built from local kernels and wheels.
+
+    Distributions are read from site-packages of kernels created by this extension and from wheels caches.
+    The index is stored on disk and updated incrementally, only sources changed are read again.
+    """
+
+    def __init__(
+        self,
+        index_path: Path = CACHE_PATH.joinpath("import_names_index.json"),
+        kernels_path: Path = Path.home().joinpath(".local/share/thoth/kernels"),
+        wheels_paths: typing.Optional[typing.List[Path]] = None,
+    ) -> None:
+        """Init."""
+        self.index_path = index_path
+        self.kernels_path = kernels_path
+        self.wheels_paths = _WHEELS_PATHS if wheels_paths is None else wheels_paths
+        self._lock = threading.Lock()
+        # Held while sources are read, so that only one thread reads them and lookups are not blocked meanwhile.
+        self._refresh_lock = threading.Lock()
+        # Source (site-packages directory or wheel) -> [fingerprint, distribution name -> import names].
+        self._sources: typing.Optional[typing.Dict[str, typing.List[typing.Any]]] = None
+        self._index: typing.Dict[str, typing.List[str]] = {}
+        self._timestamp = 0.0
+
+    def _load(self) -> typing.Dict[str, typing.List[typing.Any]]:
+        """Load index stored on disk."""
+        try:
+            with open(self.index_path) as index_file:
+                content = json.load(index_file)
+
+            if content.get("version") == _INDEX_VERSION:
+                return dict(content["sources"])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            _LOGGER.warning("Import names index %r could not be read: %r", self.index_path.as_posix(), e)
+
+        return {}
+
+    def _iter_sources(self) -> typing.Iterator[typing.Tuple[str, typing.List[int]]]:
+        """Iterate over sources available with their fingerprint."""
+        if self.kernels_path.is_dir():
+            for env_path in sorted(self.kernels_path.iterdir()):
+                for site_packages_path in get_site_packages_paths(env_path):
+                    try:
+                        yield site_packages_path.as_posix(), [site_packages_path.stat().st_mtime_ns]
+                    except OSError:
+                        continue
+
+        for wheels_path in self.wheels_paths:
+            for directory, _, file_names in os.walk(wheels_path):
+                for file_name in file_names:
+                    if file_name.endswith(".whl"):
+                        wheel_path = os.path.join(directory, file_name)
+                        try:
+                            wheel_stat = os.stat(wheel_path)
+                        except OSError:
+                            continue
+
+                        yield wheel_path, [wheel_stat.st_mtime_ns, wheel_stat.st_size]
+
+    def _is_fresh(self) -> bool:
+        """Check if the index was built less than the refresh interval ago."""
+        with self._lock:
+            return self._sources is not None and time.monotonic() - self._timestamp < _REFRESH_INTERVAL
+
+    def refresh(self, force: bool = False) -> None:
+        """Read sources that changed since the index was built and store the index on disk.
+
+        Sources are read without holding the index lock, lookups get the previous index meanwhile. Lookups
+        finding the index being refreshed by another thread do not wait for it, unless there is no index yet.
+        """
+        if not force and self._is_fresh():
+            return
+
+        with self._lock:
+            sources = self._sources
+
+        if not self._refresh_lock.acquire(blocking=force or sources is None):
+            return
+
+        try:
+            if not force and self._is_fresh():
+                # Refreshed by another thread while waiting.
+                return
+
+            with self._lock:
+                sources = self._sources
+
+            if sources is None:
+                sources = self._load()
+
+            updated_sources: typing.Dict[str, typing.List[typing.Any]] = {}
+
+            for source, fingerprint in self._iter_sources():
+                if source in sources and sources[source][0] == fingerprint:
+                    updated_sources[source] = sources[source]
+                    continue
+
+                _LOGGER.debug("Indexing import names from %r", source)
+                if source.endswith(".whl"):
+                    updated_sources[source] = [fingerprint, _get_wheel_import_names(source)]
+                else:
+                    updated_sources[source] = [fingerprint, get_distributions_import_names(source)]
+
+            if updated_sources != sources:
+                try:
+                    _write_json_atomic(self.index_path, {"version": _INDEX_VERSION, "sources": updated_sources})
+                except Exception as e:
+                    _LOGGER.warning("Import names index could not be stored: %r", e)
+
+            # The same distribution can be found with different spelling, e.g. PyYAML and pyyaml.
+            index: typing.Dict[str, typing.Dict[str, str]] = {}
+            for _, distributions in updated_sources.values():
+                for distribution_name, import_names in distributions.items():
+                    for import_name in import_names:
+                        index.setdefault(import_name, {}).setdefault(_normalize(distribution_name), distribution_name)
+
+            with self._lock:
+                self._sources = updated_sources
+                self._index = {import_name: sorted(names.values()) for import_name, names in index.items()}
+                self._timestamp = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+    def get(self, import_name: str) -> typing.List[str]:
+        """Get names of distributions providing the top level import name."""
+        self.refresh()
+
+        with self._lock:
+            return list(self._index.get(import_name, []))
+
+
+# Shared by all the handlers and commands running in the same process.
+import_names_index = ImportNamesIndex()
@@ -0,0 +1,142 @@
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Incremental analysis of libraries used in notebook cells."""
+
+import ast
+import hashlib
+import logging
+import threading
+import typing
+
+from collections import OrderedDict
+
+import invectio
+
+_LOGGER = logging.getLogger("jupyterlab_requirements.imports_analysis")
+
+# Maximum number of cells analysis kept in memory.
+_MAX_CELLS = 10000
+
+# Event recorded for a cell: ("imports" | "imports_from", name, imported) or ("usage", name, attributes).
+_Event = typing.Tuple[str, str, typing.Any]
+
+
+class _CellVisitor(invectio.lib.InvectioLibraryUsageVisitor):  # type: ignore
+    """Visitor recording imports and names used in a cell, in order, so that they can be replayed later."""
+
+    def __init__(self) -> None:
+        """Init."""
+        super().__init__()
+        self.events: typing.List[_Event] = []
+        self._usages: typing.Set[typing.Tuple[str, typing.Tuple[str, ...]]] = set()
+
+    def _record_import(self, event_type: str, name: str, imported: typing.Any) -> None:
+        """Record import, names used afterwards can refer to it."""
+        self.events.append((event_type, name, imported))
+        self._usages.clear()
+
+    def visit_Import(self, import_node: ast.Import) -> None:  # noqa: N802
+        """Visit `import` statements."""
+        super().visit_Import(import_node)
+
+        for alias in import_node.names:
+            name = alias.asname if alias.asname is not None else alias.name
+            self._record_import("imports", name, self.imports[name])
+
+    def visit_ImportFrom(self, import_from_node: ast.ImportFrom) -> None:  # noqa: N802
+        """Visit `import from` statements."""
+        super().visit_ImportFrom(import_from_node)
+
+        if import_from_node.level != 0:
+            return
+
+        for alias in import_from_node.names:
+            name = alias.asname if alias.asname else alias.name
+            self._record_import("imports_from", name, dict(self.imports_from[name]))
+
+    def _maybe_mark_usage(self, item_id: str, attrs: list) -> None:  # type: ignore
+        """Record usage of a name, it is marked when all cells are replayed."""
+        usage = (item_id, tuple(attrs))
+
+        if usage not in self._usages:
+            self._usages.add(usage)
+            self.events.append(("usage", item_id, list(attrs)))
+
+
+class ImportsAnalyzer:
+    """Libraries usage report of notebooks, analysing again only cells that changed.
+
+    Imports and names used are recorded per cell and cached by cell source hash, the report
+    of the notebook is obtained replaying cells in order, as if the whole notebook was visited.
+    """
+
+    def __init__(self, max_cells: int = _MAX_CELLS) -> None:
+        """Init."""
+        self.max_cells = max_cells
+        self._cells: "OrderedDict[str, typing.List[_Event]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_cell_events(self, source: str) -> typing.List[_Event]:
+        """Get events recorded for a cell source, analysing it if not cached."""
+        key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+        with self._lock:
+            events = self._cells.get(key)
+
+            if events is not None:
+                self._cells.move_to_end(key)
+                self.hits += 1
+                return events
+
+            self.misses += 1
+
+        visitor = _CellVisitor()
+        try:
+            visitor.visit(ast.parse(source))
+        except SyntaxError as e:
+            _LOGGER.warning("Cell could not be parsed, it is not considered to gather libraries: %r", e)
+
+        with self._lock:
+            self._cells[key] = visitor.events
+
+            while len(self._cells) > self.max_cells:
+                self._cells.popitem(last=False)
+
+        return visitor.events
+
+    def get_module_report(self, cells: typing.Iterable[str]) -> typing.Dict[str, typing.List[str]]:
+        """Get libraries usage report (module -> symbols used) of the cells, as invectio reports for a module."""
+        visitor = invectio.lib.InvectioLibraryUsageVisitor()
+
+        for source in cells:
+            for event_type, name, value in self._get_cell_events(source):
+                if event_type == "imports":
+                    visitor.imports[name] = value
+                elif event_type == "imports_from":
+                    visitor.imports_from[name] = value
+                else:
+                    visitor._maybe_mark_usage(name, value)
+
+        report: typing.Dict[str, typing.List[str]] = visitor.get_module_report()
+        return report
+
+
+# Shared by all the handlers running in the same process.
+imports_analyzer = ImportsAnalyzer()
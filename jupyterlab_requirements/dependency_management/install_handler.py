@@ -38,8 +38,9 @@ class DependencyInstallHandler(DependencyManagementBaseHandler):
 
         self.redirect_to_task(task_index)
 
-    async def install_dependencies(self, input_data: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
-        """Install packages using selected package manager."""
+    @staticmethod
+    def install_dependencies(input_data: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+        """Install packages using selected package manager (blocking, run in the tasks executor)."""
         kernel_name: str = input_data["kernel_name"]
         resolution_engine: str = input_data["resolution_engine"]
 
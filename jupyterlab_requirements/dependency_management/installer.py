@@ -0,0 +1,269 @@
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Parallel download and installation of wheels locked in Pipfile.lock."""
+
+import os
+import hashlib
+import logging
+import platform
+import tempfile
+import subprocess
+import time
+import typing
+import urllib.parse
+import urllib.request
+
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+
+from .cache import CACHE_PATH
+from .environments import _get_python_version
+from .package_store import get_locked_packages
+from .site_packages import get_site_packages_paths
+
+_LOGGER = logging.getLogger("jupyterlab_requirements.installer")
+
+# Set to 0 to install all packages with micropipenv, one at a time.
+_PARALLEL_INSTALL_ENABLED = bool(int(os.getenv("JUPYTERLAB_REQUIREMENTS_PARALLEL_INSTALL", 1)))
+
+# Maximum number of artifacts downloaded at the same time.
+_DOWNLOAD_WORKERS = int(os.getenv("JUPYTERLAB_REQUIREMENTS_DOWNLOAD_WORKERS", 8))
+
+# Maximum number of pip processes installing wheels at the same time.
+_INSTALL_WORKERS = int(os.getenv("JUPYTERLAB_REQUIREMENTS_INSTALL_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Set to 0 to skip bytecode compilation after packages are installed, modules are then compiled on first import.
+_COMPILE_BYTECODE = bool(int(os.getenv("JUPYTERLAB_REQUIREMENTS_COMPILE_BYTECODE", 1)))
+
+# Number of processes compiling bytecode (default 0, number of CPUs).
+_COMPILE_WORKERS = int(os.getenv("JUPYTERLAB_REQUIREMENTS_COMPILE_WORKERS", 0))
+
+_DEFAULT_INDEX_URL = "https://pypi.org/simple"
+
+# Artifacts downloaded, stored by sha256 so that they are verified once and reused by all kernels.
+ARTIFACTS_PATH = CACHE_PATH.joinpath("artifacts")
+
+
+class _LinksParser(HTMLParser):
+    """Collect links of a PEP 503 simple repository project page."""
+
+    def __init__(self) -> None:
+        """Init."""
+        super().__init__()
+        self.links: typing.List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: typing.List[typing.Tuple[str, typing.Optional[str]]]) -> None:
+        """Collect href of anchors."""
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.links.append(href)
+
+
+def _get_index_urls(pipfile_lock: typing.Dict[str, typing.Any]) -> typing.Dict[str, str]:
+    """Get index URLs (source name -> URL) from Pipfile.lock, the first one is used for packages with no index."""
+    sources = pipfile_lock.get("_meta", {}).get("sources") or [{"name": "pypi", "url": _DEFAULT_INDEX_URL}]
+    return {source["name"]: source["url"].rstrip("/") for source in sources}
+
+
+def _find_wheel(
+    index_url: str, name: str, entry: typing.Dict[str, typing.Any]
+) -> typing.Optional[typing.Tuple[str, str, str]]:
+    """Find the wheel locked for the running interpreter on the index, return (URL, file name, sha256)."""
+    from packaging.tags import sys_tags
+    from packaging.utils import parse_wheel_filename
+
+    hashes = {h.split(":", maxsplit=1)[1] for h in entry["hashes"] if h.startswith("sha256:")}
+    project_url = f"{index_url}/{name}/"
+
+    with urllib.request.urlopen(project_url) as response:
+        parser = _LinksParser()
+        parser.feed(response.read().decode("utf-8", errors="replace"))
+
+    # Tags supported by the interpreter, the most specific first.
+    priorities = {tag: priority for priority, tag in enumerate(sys_tags())}
+    candidates = []
+
+    for link in parser.links:
+        url, _, fragment = urllib.parse.urljoin(project_url, link).partition("#")
+        file_name = urllib.parse.unquote(url.rsplit("/", maxsplit=1)[-1])
+        algorithm, _, digest = fragment.partition("=")
+
+        if not file_name.endswith(".whl") or algorithm != "sha256" or digest not in hashes:
+            continue
+
+        try:
+            tags = parse_wheel_filename(file_name)[3]
+        except ValueError:
+            continue
+
+        priority = min((priorities[tag] for tag in tags if tag in priorities), default=None)
+        if priority is not None:
+            candidates.append((priority, url, file_name, digest))
+
+    if not candidates:
+        return None
+
+    _, url, file_name, digest = min(candidates)
+    return url, file_name, digest
+
+
+def _download(url: str, file_name: str, digest: str, artifacts_path: Path) -> Path:
+    """Download artifact verifying its sha256, artifacts already downloaded are reused."""
+    artifact_path = artifacts_path.joinpath(digest, file_name)
+
+    if artifact_path.exists():
+        return artifact_path
+
+    artifact_path.parent.mkdir(parents=True, exist_ok=True)
+    file_descriptor, temp_path = tempfile.mkstemp(prefix=f".{file_name}.", dir=artifact_path.parent)
+
+    try:
+        sha256 = hashlib.sha256()
+
+        with os.fdopen(file_descriptor, "wb") as temp_file, urllib.request.urlopen(url) as response:
+            for chunk in iter(lambda: response.read(1024 * 1024), b""):
+                sha256.update(chunk)
+                temp_file.write(chunk)
+
+        if sha256.hexdigest() != digest:
+            raise ValueError(f"Hash of {file_name} downloaded does not match Pipfile.lock: {sha256.hexdigest()}")
+
+        os.replace(temp_path, artifact_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    return artifact_path
+
+
+def _fetch_wheel(
+    index_url: str, name: str, entry: typing.Dict[str, typing.Any], artifacts_path: Path
+) -> typing.Optional[Path]:
+    """Find and download the wheel locked for a package, None if it cannot be installed from a wheel."""
+    try:
+        wheel = _find_wheel(index_url, name, entry)
+        if not wheel:
+            _LOGGER.debug("No wheel locked for %r is available for this interpreter on %s", name, index_url)
+            return None
+
+        return _download(*wheel, artifacts_path=artifacts_path)
+    except Exception as e:
+        _LOGGER.warning("Wheel for %r could not be downloaded from %s: %r", name, index_url, e)
+        return None
+
+
+def install_locked_packages(
+    pipfile_lock: typing.Dict[str, typing.Any],
+    env_path: Path,
+    packages: typing.Optional[typing.Iterable[str]] = None,
+    artifacts_path: Path = ARTIFACTS_PATH,
+    compile_bytecode: bool = True,
+) -> typing.List[str]:
+    """Install wheels locked in Pipfile.lock in the virtualenv in parallel, return names of packages installed.
+
+    Wheels are downloaded concurrently and checked against hashes in Pipfile.lock, then installed without
+    dependencies by a few pip processes running at the same time: installing a wheel does not run code,
+    therefore wheels do not depend on each other being installed. Packages which are not available as
+    wheels (e.g. source distributions, VCS) are not installed and are left to micropipenv. If `compile_bytecode`
+    is False, pip does not compile bytecode (see `compile_environment`).
+    """
+    if _get_python_version(env_path) != platform.python_version():
+        _LOGGER.debug("Environment at %s does not use the running interpreter, wheels cannot be selected", env_path)
+        return []
+
+    index_urls = _get_index_urls(pipfile_lock)
+    default_index_url = next(iter(index_urls.values()))
+    locked = get_locked_packages(pipfile_lock)
+
+    if packages is not None:
+        selected = set(packages)
+        locked = {name: entry for name, entry in locked.items() if name in selected}
+
+    if not locked:
+        return []
+
+    with ThreadPoolExecutor(max_workers=_DOWNLOAD_WORKERS) as executor:
+        wheels = dict(
+            zip(
+                locked,
+                executor.map(
+                    lambda item: _fetch_wheel(
+                        index_urls.get(item[1].get("index"), default_index_url), item[0], item[1], artifacts_path
+                    ),
+                    locked.items(),
+                ),
+            )
+        )
+
+    wheels_paths = [(name, path) for name, path in wheels.items() if path]
+    if not wheels_paths:
+        return []
+
+    # Wheels are split in groups installed by concurrent pip processes.
+    workers = max(1, min(_INSTALL_WORKERS, len(wheels_paths)))
+    groups = [wheels_paths[i::workers] for i in range(workers)]
+    python = str(env_path.joinpath("bin", "python"))
+    pip_args = ["--no-deps", "--no-index", "--disable-pip-version-check"] + (
+        [] if compile_bytecode else ["--no-compile"]
+    )
+
+    def _install_group(group: typing.List[typing.Tuple[str, Path]]) -> typing.List[str]:
+        process = subprocess.run(
+            [python, "-m", "pip", "install", *pip_args] + [str(path) for _, path in group],
+            capture_output=True,
+        )
+
+        if process.returncode != 0:
+            _LOGGER.warning("Wheels could not be installed: %s", process.stderr.decode("utf-8", errors="replace"))
+            return []
+
+        return [name for name, _ in group]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        installed = [name for group in executor.map(_install_group, groups) for name in group]
+
+    _LOGGER.info("Installed %d wheels in %s with %d pip processes", len(installed), env_path, workers)
+
+    return sorted(installed)
+
+
+def compile_environment(env_path: Path, workers: int = _COMPILE_WORKERS) -> float:
+    """Compile bytecode of packages installed in the virtualenv with parallel processes, return seconds spent.
+
+    The virtualenv interpreter is used, so that bytecode matches the kernel Python version.
+    """
+    site_packages_paths = get_site_packages_paths(env_path)
+    if not site_packages_paths:
+        return 0.0
+
+    start = time.perf_counter()
+    process = subprocess.run(
+        [str(env_path.joinpath("bin", "python")), "-m", "compileall", "-q", "-j", str(workers)]
+        + [str(path) for path in site_packages_paths],
+        capture_output=True,
+    )
+    duration = time.perf_counter() - start
+
+    if process.returncode != 0:
+        # Some packages ship modules which do not compile (e.g. templates, Python 2 code), as pip ignores them.
+        _LOGGER.debug("Some modules could not be compiled: %s", process.stdout.decode("utf-8", errors="replace"))
+
+    _LOGGER.info("Bytecode compiled in %s in %.1f s", env_path, duration)
+
+    return duration
@@ -18,7 +18,6 @@
 
 import json
 import logging
-import subprocess
 
 from jupyter_server.base.handlers import APIHandler
 from tornado import web
@@ -26,6 +25,7 @@ from pathlib import Path
 
 from .lib import create_kernel
 from .lib import horus_delete_kernel
+from .kernelspecs import kernelspecs_index
 
 
 _LOGGER = logging.getLogger("jupyterlab_requirements.kernel_handler")
@@ -50,21 +50,8 @@ class JupyterKernelHandler(APIHandler):
     @web.authenticated
     def get(self):  # type: ignore
         """Get kernel list."""
-        try:
-            kernels_output = subprocess.run(
-                "jupyter kernelspec list --json",
-                shell=True,
-                capture_output=True,
-            )
-            kernelspecs_str = kernels_output.stdout.decode("utf-8")
-            _LOGGER.debug(kernelspecs_str)
-
-        except Exception as e:
-            _LOGGER.error(f"Could not get kernels available: {e}")
-
-        kernelspecs_json = json.loads(kernelspecs_str)
         kernels = []
-        for kernelspec in kernelspecs_json["kernelspecs"]:
+        for kernelspec in kernelspecs_index.find_kernel_specs():
             # Default kernel is filtered.
             if kernelspec != "python3":
                 kernels.append(kernelspec)
@@ -80,9 +67,9 @@ class JupyterKernelHandler(APIHandler):
 
         {"message": "", "error": False}
 
-        command_output = horus_delete_kernel(kernel_name=kernel_name)
+        is_deleted = horus_delete_kernel(kernel_name=kernel_name)
 
-        if command_output.returncode == 0:
+        if is_deleted:
             self.finish(
                 json.dumps({"message": f"{kernel_name} kernel successfully deleted", "error": False})
             )  # type: ignore
@@ -0,0 +1,138 @@
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Jupyter kernelspecs management in process, using jupyter_client."""
+
+import os
+import json
+import time
+import shutil
+import logging
+import tempfile
+import threading
+import typing
+
+from pathlib import Path
+
+from .site_packages import get_site_packages_paths
+from .site_packages import packages_cache
+
+if typing.TYPE_CHECKING:
+    from jupyter_client.kernelspec import KernelSpecManager
+
+_LOGGER = logging.getLogger("jupyterlab_requirements.kernelspecs")
+
+# Seconds kernelspecs listing is reused before looking again on disk.
+_KERNELSPECS_TTL = float(os.getenv("JUPYTERLAB_REQUIREMENTS_KERNELSPECS_TTL", 10))
+
+
+class KernelSpecsIndex:
+    """Short-lived index of kernelspecs available, kept in memory.
+
+    Kernelspecs changed by this extension invalidate the index immediately, changes done
+    outside (e.g. `jupyter kernelspec` from a terminal) are seen after `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = _KERNELSPECS_TTL) -> None:
+        """Init."""
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._manager: typing.Optional["KernelSpecManager"] = None
+        self._kernelspecs: typing.Optional[typing.Dict[str, str]] = None
+        self._timestamp = 0.0
+
+    @property
+    def manager(self) -> "KernelSpecManager":
+        """Get kernelspec manager, create it on first use."""
+        if self._manager is None:
+            from jupyter_client.kernelspec import KernelSpecManager
+
+            self._manager = KernelSpecManager()
+
+        return self._manager
+
+    def find_kernel_specs(self) -> typing.Dict[str, str]:
+        """Get kernelspecs available (name -> resource directory), as `jupyter kernelspec list`."""
+        with self._lock:
+            if self._kernelspecs is not None and time.monotonic() - self._timestamp < self.ttl:
+                return dict(self._kernelspecs)
+
+            self._kernelspecs = self.manager.find_kernel_specs()
+            self._timestamp = time.monotonic()
+
+            return dict(self._kernelspecs)
+
+    def install_kernel_spec(self, kernel_name: str, env_path: Path, display_name: typing.Optional[str] = None) -> str:
+        """Install kernelspec for the virtualenv, as `ipython kernel install --user` run in the virtualenv does.
+
+        kernel.json is written directly, without starting the virtualenv interpreter. Return the resource directory.
+        """
+        site_packages_paths = get_site_packages_paths(env_path)
+        installed = packages_cache.get_installed_packages(key=env_path.as_posix(), paths=site_packages_paths)
+        ipykernel_version = installed.get("ipykernel", "0")
+
+        kernel_spec: typing.Dict[str, typing.Any] = {
+            "argv": [str(env_path.joinpath("bin", "python")), "-m", "ipykernel_launcher", "-f", "{connection_file}"],
+            "display_name": display_name or f"Python ({kernel_name})",
+            "language": "python",
+            "metadata": {"debugger": True} if int(ipykernel_version.split(".")[0] or 0) >= 6 else {},
+        }
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Logos provided by ipykernel in the virtualenv.
+            for site_packages_path in site_packages_paths:
+                resources_path = site_packages_path.joinpath("ipykernel", "resources")
+                if resources_path.is_dir():
+                    for resource in resources_path.iterdir():
+                        shutil.copy(resource, temp_dir)
+                    break
+
+            with open(os.path.join(temp_dir, "kernel.json"), "w") as kernel_file:
+                json.dump(kernel_spec, kernel_file, indent=1)
+
+            try:
+                resource_dir: str = self.manager.install_kernel_spec(temp_dir, kernel_name=kernel_name, user=True)
+            finally:
+                self.invalidate()
+
+        _LOGGER.debug("Installed kernelspec %r at %r", kernel_name, resource_dir)
+
+        return resource_dir
+
+    def remove_kernel_spec(self, kernel_name: str) -> bool:
+        """Remove kernelspec, as `jupyter kernelspec remove -f`. Return False if it could not be removed."""
+        try:
+            resource_dir = self.manager.remove_kernel_spec(kernel_name)
+            _LOGGER.debug("Removed kernelspec %r at %r", kernel_name, resource_dir)
+        except KeyError:
+            _LOGGER.debug("Kernelspec %r does not exist", kernel_name)
+            return False
+        except Exception as e:
+            _LOGGER.error(f"Kernelspec {kernel_name} could not be removed: {e}")
+            return False
+        finally:
+            self.invalidate()
+
+        return True
+
+    def invalidate(self) -> None:
+        """Invalidate index, next listing looks on disk."""
+        with self._lock:
+            self._kernelspecs = None
+
+
+# Shared by all the handlers and commands running in the same process.
+kernelspecs_index = KernelSpecsIndex()
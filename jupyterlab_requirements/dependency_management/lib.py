@@ -24,43 +24,66 @@ import shutil
 import typing
 import tempfile
 import json
+import hashlib
 import sys
-import yaml  # type: ignore
-import invectio
-import distutils.sysconfig as sysconfig
+import time
 
-from subprocess import CompletedProcess
-from virtualenv import cli_run
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from rich.text import Text
-from rich import box
-from rich.console import Console
-from rich.table import Table
-
-from thoth.python import Project, Pipfile, PipfileLock
-from thoth.python import PipfileMeta
-from thoth.python import Source, PackageVersion
-from thoth.common import ThothAdviserIntegrationEnum
-
-from thamos.lib import advise_using_config, _get_origin
-from thamos.lib import get_package_from_imported_packages
-from thamos.lib import get_log
-from thamos.config import _Configuration
-from thamos.discover import discover_python_version
+from .cache import LockCache
+from .cache import import_names_cache
+from .environments import _get_locked_entries
+from .environments import clear_environment_state
+from .environments import create_environment
+from .environments import get_environment_changes
+from .environments import save_environment_state
+from .import_index import _normalize
+from .installer import _COMPILE_BYTECODE
+from .installer import _PARALLEL_INSTALL_ENABLED
+from .installer import compile_environment
+from .installer import install_locked_packages
+from .import_index import import_names_index
+from .kernelspecs import kernelspecs_index
+from .notebook import notebook_to_python
+from .package_store import _PACKAGE_STORE_ENABLED
+from .package_store import package_store
+from .progress import report_log
+from .progress import report_phase
+from .progress import run_logged
+from .notebook import read_notebook
+from .notebook import read_notebook_metadata
+from .notebook import write_notebook
+from .notebook import write_notebook_metadata
+from .site_packages import get_site_packages_paths
+from .site_packages import packages_cache
+from .stdlib import filter_stdlib_modules
+
+# Dependencies of commands are imported when needed, so that horus CLI starts fast.
+if typing.TYPE_CHECKING:
+    from thamos.config import _Configuration
+    from thoth.python import Pipfile
 
 _LOGGER = logging.getLogger("jupyterlab_requirements.lib")
 
+# Maximum number of import names looked up at the same time on Thoth user-API.
+_IMPORT_NAMES_WORKERS = int(os.getenv("JUPYTERLAB_REQUIREMENTS_IMPORT_NAMES_WORKERS", 8))
+
 
 _EMOJI = {
-    "WARNING": Text("\u26a0\ufe0f WARNING", style="yellow"),
-    "ERROR": Text("\u274c ERROR", style="bold red"),
-    "INFO": Text("\u2714\ufe0f INFO", "green"),
+    "WARNING": ("\u26a0\ufe0f WARNING", "yellow"),
+    "ERROR": ("\u274c ERROR", "bold red"),
+    "INFO": ("\u2714\ufe0f INFO", "green"),
 }
 
 
 def print_report(report: typing.List[typing.Dict[str, typing.Any]], title: str = "") -> None:
     """Print reasoning to user."""
+    from rich import box
+    from rich.console import Console
+    from rich.table import Table
+    from rich.text import Text
+
     console = Console()
     table = Table(
         show_header=True,
@@ -88,7 +111,7 @@ def print_report(report: typing.List[typing.Dict[str, typing.Any]], title: str =
             entry = item.get(column, "-")
 
             if not bool(int(os.getenv("JUPYTERLAB_REQUIREMENTS_NO_EMOJI", 0))) and isinstance(entry, str):
-                entry = _EMOJI.get(entry, entry)
+                entry = Text(*_EMOJI[entry]) if entry in _EMOJI else entry
 
             if isinstance(entry, list):
                 entry = ", ".join(entry)
@@ -103,8 +126,8 @@ def print_report(report: typing.List[typing.Dict[str, typing.Any]], title: str =
     console.print(table, justify="center")
 
 
-def get_notebook_content(notebook_path: str, py_format: bool = False) -> typing.Any:
-    """Get JSON of the notebook content."""
+def _check_notebook_path(notebook_path: str) -> Path:
+    """Check notebook path exists and it is a notebook."""
     actual_path = Path(notebook_path)
 
     if not actual_path.exists():
@@ -113,29 +136,34 @@ def get_notebook_content(notebook_path: str, py_format: bool = False) -> typing.
     if actual_path.suffix != ".ipynb":
         raise Exception("File submitted is not .ipynb")
 
-    if not py_format:
-        with open(notebook_path) as notebook_content:
-            notebook = json.load(notebook_content)
+    return actual_path
+
 
-        return notebook
+def get_notebook_content(notebook_path: str, py_format: bool = False) -> typing.Any:
+    """Get JSON of the notebook content, or the Python script of its code if `py_format` is set."""
+    _check_notebook_path(notebook_path)
+
+    if not py_format:
+        return read_notebook(notebook_path)
 
     else:
-        check_convert = subprocess.run(
-            f"jupyter nbconvert --to python {actual_path} --stdout", shell=True, capture_output=True
-        )
+        # Outputs are not needed to obtain the code.
+        return notebook_to_python(read_notebook(notebook_path, include_outputs=False))
 
-        if check_convert.returncode != 0:
-            raise Exception(f"jupyter nbconvert failed converting notebook to .py: {check_convert.stderr!r}")
 
-        notebook_content_py = check_convert.stdout.decode("utf-8")
+def get_notebook_metadata(notebook_path: str) -> typing.Dict[str, typing.Any]:
+    """Get notebook metadata, without loading cells content."""
+    _check_notebook_path(notebook_path)
 
-        return notebook_content_py
+    return read_notebook_metadata(notebook_path)
 
 
 def horus_check_metadata_content(
     notebook_metadata: typing.Dict[str, typing.Any], is_cli: bool = True
 ) -> typing.List[typing.Dict[str, typing.Any]]:
     """Check the metadata of notebook for dependencies."""
+    from thoth.python import Project
+
     result = []
 
     if notebook_metadata.get("language_info"):
@@ -356,14 +384,111 @@ def horus_check_metadata_content(
     return result
 
 
+def _load_pipfile_lock(env_path: Path) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """Load Pipfile.lock stored in the kernel directory, None if it is missing or invalid."""
+    try:
+        with open(env_path.joinpath("Pipfile.lock")) as pipfile_lock_file:
+            pipfile_lock: typing.Dict[str, typing.Any] = json.load(pipfile_lock_file)
+    except (OSError, ValueError) as e:
+        _LOGGER.debug("Pipfile.lock could not be loaded from %s: %r", env_path, e)
+        return None
+
+    return pipfile_lock
+
+
+def get_missing_packages(env_path: Path, packages: typing.List[str]) -> typing.List[str]:
+    """Get packages not installed in the virtualenv, reading its site-packages without starting its interpreter."""
+    installed = packages_cache.get_installed_packages(key=env_path.as_posix(), paths=get_site_packages_paths(env_path))
+    installed_names = {_normalize(name) for name in installed}
+
+    return [package for package in packages if _normalize(package) not in installed_names]
+
+
+def install_missing_tooling(env_path: Path, packages: typing.List[str]) -> typing.Dict[str, typing.Any]:
+    """Install packages needed to manage the kernel which are missing in the virtualenv, with a single pip run.
+
+    Packages are probed reading site-packages once, instead of starting the virtualenv interpreter for each
+    package. Timings and processes started are logged and returned, with an estimate of the processes the
+    previous probe (a shell and an interpreter for each package, pip for each one missing) would have started.
+    """
+    start = time.perf_counter()
+    missing = get_missing_packages(env_path, packages)
+    probe_time = time.perf_counter() - start
+
+    report: typing.Dict[str, typing.Any] = {
+        "missing": missing,
+        "probe_time": probe_time,
+        "install_time": 0.0,
+        "processes_started": 1 if missing else 0,
+        "estimated_processes_saved": len(packages) + len(missing) - (1 if missing else 0),
+    }
+
+    if missing:
+        _LOGGER.debug("Packages %r are not installed in %s", missing, env_path)
+
+        start = time.perf_counter()
+        subprocess.run([str(env_path.joinpath("bin", "python")), "-m", "pip", "install", *missing])
+        report["install_time"] = time.perf_counter() - start
+
+        packages_cache.invalidate(env_path.as_posix())
+
+    _LOGGER.info(
+        "Tooling %r probed in %.1f ms and installed in %.1f ms in %s, %d processes started (about %d saved)",
+        packages,
+        report["probe_time"] * 1000,
+        report["install_time"] * 1000,
+        env_path,
+        report["processes_started"],
+        report["estimated_processes_saved"],
+    )
+
+    return report
+
+
+def _filter_pipfile_lock(
+    pipfile_lock: typing.Dict[str, typing.Any], packages: typing.List[str]
+) -> typing.Dict[str, typing.Any]:
+    """Keep only the given packages (normalized names) in Pipfile.lock sections."""
+    filtered = dict(pipfile_lock)
+
+    for section in ("default", "develop"):
+        filtered[section] = {
+            name: entry for name, entry in pipfile_lock.get(section, {}).items() if _normalize(name) in packages
+        }
+
+    return filtered
+
+
+def _uninstall_packages(env_path: Path, packages: typing.List[str]) -> bool:
+    """Uninstall packages from the virtualenv with a single pip run, return False if pip failed."""
+    _LOGGER.info("Uninstalling packages not locked anymore from %s: %r", env_path, packages)
+
+    process = subprocess.run(
+        [str(env_path.joinpath("bin", "python")), "-m", "pip", "uninstall", "--yes", *packages], capture_output=True
+    )
+    packages_cache.invalidate(env_path.as_posix())
+
+    if process.returncode != 0:
+        _LOGGER.warning("Packages could not be uninstalled: %s", process.stderr.decode("utf-8", errors="replace"))
+        return False
+
+    return True
+
+
 def install_packages(
     kernel_name: str,
     resolution_engine: str,
     kernels_path: Path = Path.home().joinpath(".local/share/thoth/kernels"),
     is_cli: bool = False,
     is_magic_command: bool = False,
+    packages: typing.Optional[typing.List[str]] = None,
+    compile_bytecode: bool = True,
 ) -> None:
-    """Install dependencies in the virtualenv."""
+    """Install dependencies in the virtualenv, only the given packages from Pipfile.lock if provided.
+
+    Bytecode is compiled for all packages at the end in parallel, instead of by pip for each package,
+    unless `compile_bytecode` is False or disabled by configuration (modules are then compiled when imported first).
+    """
     _LOGGER.info(f"kernel_name selected: {kernel_name}")
 
     env_path = kernels_path.joinpath(kernel_name)
@@ -375,66 +500,88 @@ def install_packages(
 
     _LOGGER.info(f"Installing requirements using {package_manager} in virtualenv at {env_path}.")
 
-    # 1. Creating new environment
-    if is_cli or resolution_engine != "pipenv":
-        cli_run([str(env_path)])
-
-    # 2. Install micropipenv and jupyterlab-requirements if not installed already
-    packages = [package_manager, "jupyterlab-requirements"]
-
-    for package in packages:
-        check_install = subprocess.run(
-            f". {kernel_name}/bin/activate &&"
-            f"python3 -c \"import sys, pkgutil; sys.exit(0 if pkgutil.find_loader('{package}') else 1)\"",
+    # 1. Creating new environment (tooling is already installed if cloned from the base environment)
+    report_phase("environment", 5)
+    if (is_cli or resolution_engine != "pipenv") and packages is None:
+        create_environment(env_path)
+
+    # 2. Install micropipenv, jupyterlab-requirements and ipykernel (used by create_kernel) if not installed already
+    report_phase("tooling", 15)
+    install_missing_tooling(env_path, packages=[package_manager, "jupyterlab-requirements", "ipykernel"])
+
+    # 3. Link packages already installed for other kernels from the package store
+    pipfile_lock = _load_pipfile_lock(env_path)
+    clear_environment_state(env_path)
+
+    linked: typing.List[str] = []
+    if pipfile_lock and _PACKAGE_STORE_ENABLED:
+        report_phase("link", 25)
+        linked = package_store.link_packages(pipfile_lock, env_path)
+        report_log(f"Packages linked from the store: {', '.join(linked) or '-'}")
+
+    # 4. Download and install wheels in parallel
+    if pipfile_lock:
+        locked = packages if packages is not None else list(_get_locked_entries(pipfile_lock))
+        packages = [name for name in locked if name not in linked]
+
+        if _PARALLEL_INSTALL_ENABLED and packages:
+            report_phase("download", 35)
+            installed = install_locked_packages(pipfile_lock, env_path, packages=packages, compile_bytecode=False)
+            report_log(f"Wheels installed in parallel: {', '.join(installed) or '-'}")
+            packages = [name for name in packages if name not in installed]
+
+    # 5. Install remaining packages using micropipenv
+    report_phase("install", 60)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lock_path = env_path
+
+        if pipfile_lock and packages is not None:
+            # micropipenv installs all packages in Pipfile.lock, only the ones not installed yet are kept.
+            lock_path = Path(temp_dir)
+            with open(lock_path.joinpath("Pipfile.lock"), "w") as pipfile_lock_file:
+                json.dump(_filter_pipfile_lock(pipfile_lock, packages), pipfile_lock_file)
+
+        install = run_logged(
+            f". {kernel_name}/bin/activate " f"&& cd {lock_path} && micropipenv install --dev -- --no-compile",
             shell=True,
             cwd=kernels_path,
-            capture_output=True,
         )
 
-        if check_install.returncode != 0:
-            _LOGGER.debug(f"{package} is not installed in the host!: %r", check_install.stderr)
-            _ = subprocess.run(f". {kernel_name}/bin/activate && pip install {package}", shell=True, cwd=kernels_path)
-        else:
-            _LOGGER.debug(f"{package} is already present on the host!")
+    # 6. Compile bytecode of all packages in parallel, so that first imports in the kernel are fast
+    if compile_bytecode and _COMPILE_BYTECODE:
+        report_phase("compile", 85)
+        compile_environment(env_path)
 
-    # 3. Install packages using micropipenv
-    _ = subprocess.run(
-        f". {kernel_name}/bin/activate " f"&& cd {kernel_name} && micropipenv install --dev",
-        shell=True,
-        cwd=kernels_path,
-    )
+    if pipfile_lock and _PACKAGE_STORE_ENABLED:
+        report_phase("store", 95)
+        package_store.add_packages(pipfile_lock, env_path)
+
+    if pipfile_lock and install.returncode == 0:
+        save_environment_state(env_path, pipfile_lock)
+
+    packages_cache.invalidate(env_path.as_posix())
 
 
 def get_packages(
     kernel_name: str, kernels_path: Path = Path.home().joinpath(".local/share/thoth/kernels")
 ) -> typing.Dict[str, str]:
-    """Get packages in the virtualenv (pip list)."""
+    """Get packages in the virtualenv (same content as pip list), reading metadata from site-packages."""
     _LOGGER.info(f"kernel_name selected: {kernel_name}")
 
     packages = {}
 
-    if kernels_path.joinpath(kernel_name).exists():
-        process_output = subprocess.run(
-            f". {kernel_name}/bin/activate && pip list", shell=True, capture_output=True, cwd=kernels_path
-        )
-
-        processed_list = process_output.stdout.decode("utf-8").split("\n")[2:]
+    env_path = kernels_path.joinpath(kernel_name)
 
-        for processed_package in processed_list:
-            if processed_package:
-                package_version = [el for el in processed_package.split(" ") if el != ""]
-                packages[package_version[0]] = package_version[1]
+    if env_path.exists():
+        packages.update(
+            packages_cache.get_installed_packages(key=env_path.as_posix(), paths=get_site_packages_paths(env_path))
+        )
 
     # default kernel for Jupyter
     if kernel_name == "python3":
-        process_output = subprocess.run("pip list", shell=True, capture_output=True)
+        packages.update(packages_cache.get_installed_packages(key=sys.executable, paths=(p for p in sys.path if p)))
 
-        processed_list = process_output.stdout.decode("utf-8").split("\n")[2:]
-
-        for processed_package in processed_list:
-            if processed_package:
-                package_version = [el for el in processed_package.split(" ") if el != ""]
-                packages[package_version[0]] = package_version[1]
+    _LOGGER.debug("Installed packages cache: %r", packages_cache.stats())
 
     return packages
 
@@ -443,74 +590,31 @@ def create_kernel(kernel_name: str, kernels_path: Path = Path.home().joinpath(".
     """Create kernel using new virtualenv."""
     _LOGGER.info(f"Setting new jupyter kernel {kernel_name} from {kernels_path}/{kernel_name}.")
 
-    package = "ipykernel"
-
-    check_install = subprocess.run(
-        f". {kernel_name}/bin/activate &&"
-        f"python3 -c \"import sys, pkgutil; sys.exit(0 if pkgutil.find_loader('{package}') else 1)\"",
-        shell=True,
-        cwd=kernels_path,
-        capture_output=True,
-    )
-
-    if check_install.returncode != 0:
-        _LOGGER.debug(f"{package} is not installed in the host!: %r", check_install.stderr)
-        _ = subprocess.run(f". {kernel_name}/bin/activate && pip install {package}", shell=True, cwd=kernels_path)
-    else:
-        _LOGGER.debug(f"{package} is already present on the host!")
+    install_missing_tooling(kernels_path.joinpath(kernel_name), packages=["ipykernel"])
 
     _LOGGER.debug(f"Installing kernelspec called {kernel_name}.")
 
     try:
-        process_output = subprocess.run(
-            f". {kernel_name}/bin/activate && ipython kernel install --user"
-            f" --name={kernel_name} --display-name 'Python ({kernel_name})'",
-            shell=True,
-            cwd=kernels_path,
-            capture_output=True,
+        resource_dir = kernelspecs_index.install_kernel_spec(
+            kernel_name=kernel_name, env_path=kernels_path.joinpath(kernel_name)
         )
-
-        _LOGGER.info(process_output.stdout.decode("utf-8"))
+        _LOGGER.info(f"Installed kernelspec {kernel_name} in {resource_dir}")
 
     except Exception as e:
-        _LOGGER.error(f"Could not enter environment {e}")
+        _LOGGER.error(f"Could not install kernelspec {kernel_name}: {e}")
 
 
 def horus_list_kernels(kernels_path: Path = Path.home().joinpath(".local/share/thoth/kernels")) -> typing.List[str]:
     """List kernels from host."""
-    # List jupyter kernel
-    try:
-        command_output = subprocess.run(
-            "jupyter kernelspec list --json",
-            shell=True,
-            capture_output=True,
-        )
-        _LOGGER.debug(command_output.returncode)
-
-    except Exception as e:
-        _LOGGER.error(f"Kernel list could not be obtained: {e}")
-
-    # Parse json output from command
-    kernels = [k for k in json.loads(command_output.stdout.decode("utf-8"))["kernelspecs"]]
-
-    return kernels
+    return list(kernelspecs_index.find_kernel_specs())
 
 
 def horus_delete_kernel(
     kernel_name: str, kernels_path: Path = Path.home().joinpath(".local/share/thoth/kernels")
-) -> CompletedProcess:  # type: ignore
-    """Delete kernel from host."""
+) -> bool:
+    """Delete kernel from host, return True if jupyter kernel was removed."""
     # Delete jupyter kernel
-    try:
-        command_output = subprocess.run(
-            f"jupyter kernelspec remove -f {kernel_name}",
-            shell=True,
-            capture_output=True,
-        )
-        _LOGGER.debug(command_output.returncode)
-
-    except Exception as e:
-        _LOGGER.error(f"Selected kernel could not be deleted: {e}")
+    is_deleted = kernelspecs_index.remove_kernel_spec(kernel_name)
 
     # Delete folder from host
     env_path = kernels_path.joinpath(kernel_name)
@@ -521,7 +625,52 @@ def horus_delete_kernel(
         except Exception as e:
             _LOGGER.debug(f"Repo at {env_path.as_posix()} was not removed because of: {e}")
 
-    return command_output
+    packages_cache.invalidate(env_path.as_posix())
+
+    return is_deleted
+
+
+def horus_clean_store(kernels_path: Path = Path.home().joinpath(".local/share/thoth/kernels")) -> typing.List[str]:
+    """Remove packages from the package store which are not locked by any kernel, return their keys."""
+    return package_store.collect_garbage(kernels_path)
+
+
+def _get_packages_from_import_name(import_name: str) -> typing.List[typing.Dict[str, str]]:
+    """Get packages (name and index) providing the import name, using caches, local distributions or Thoth user-API."""
+    from thamos.lib import get_package_from_imported_packages
+
+    cached_packages = import_names_cache.get(import_name)
+
+    if cached_packages is not None:
+        return cached_packages
+
+    # Distributions available locally are used without reaching Thoth user-API.
+    distribution_names = import_names_index.get(import_name)
+
+    if distribution_names:
+        return [
+            {
+                "package_name": distribution_name,
+                "index_url": "https://pypi.org/simple",
+            }
+            for distribution_name in distribution_names
+        ]
+
+    unique_packages: typing.Dict[typing.Tuple[str, str], typing.Dict[str, str]] = {}
+
+    for package in get_package_from_imported_packages(import_name) or []:
+        unique_packages.setdefault(
+            (package["package_name"], package["index_url"]),
+            {
+                "package_name": package["package_name"],
+                "index_url": package["index_url"],
+            },
+        )
+
+    packages = list(unique_packages.values())
+    import_names_cache.set(import_name, packages)
+
+    return packages
 
 
 def verify_gathered_libraries(
@@ -529,41 +678,25 @@ def verify_gathered_libraries(
 ) -> typing.List[typing.Dict[str, str]]:
     """Verify gathered libraries from invectio."""
     # Use Thoth user-API endpoint to verify what is the packages using that import name
-    verified_libraries = []
+    verified_libraries: typing.List[typing.Dict[str, str]] = []
 
-    for import_name in gathered_libraries:
-        unique_packages: typing.List[typing.Dict[str, str]] = []
+    import_names = list(dict.fromkeys(gathered_libraries))
 
+    if not import_names:
+        return verified_libraries
+
+    with ThreadPoolExecutor(
+        max_workers=min(_IMPORT_NAMES_WORKERS, len(import_names)), thread_name_prefix="jupyterlab_requirements"
+    ) as executor:
+        futures = {
+            import_name: executor.submit(_get_packages_from_import_name, import_name) for import_name in import_names
+        }
+
+    for import_name, future in futures.items():
         try:
-            imported_packages = get_package_from_imported_packages(import_name)
-
-            if imported_packages:
-                for package in imported_packages:
-                    if package["package_name"] not in [p["package_name"] for p in unique_packages]:
-                        unique_packages.append(
-                            {
-                                "package_name": package["package_name"],
-                                "index_url": package["index_url"],
-                            }
-                        )
-                    else:
-                        existing_indexes = [
-                            p["index_url"] for p in unique_packages if p["package_name"] == package["package_name"]
-                        ]
-
-                        if package["index_url"] not in existing_indexes:
-                            unique_packages.append(
-                                {
-                                    "package_name": package["package_name"],
-                                    "index_url": package["index_url"],
-                                }
-                            )
-
-                for unique_package in unique_packages:
-                    verified_libraries.append(unique_package)
-                    _LOGGER.info(
-                        f"Package name {unique_package['package_name']} identifed for import name {import_name}"
-                    )
+            for unique_package in future.result():
+                verified_libraries.append(unique_package)
+                _LOGGER.info(f"Package name {unique_package['package_name']} identifed for import name {import_name}")
 
         except Exception as error:
             _LOGGER.warning(f"No packages identified for import name {import_name}: {error}")
@@ -580,6 +713,8 @@ def verify_gathered_libraries(
 
 def gather_libraries(notebook_path: str) -> typing.List[str]:
     """Gather libraries with invectio."""
+    import invectio
+
     gathered_libraries = []
     try:
         notebook_content_py = get_notebook_content(notebook_path=notebook_path, py_format=True)
@@ -594,11 +729,7 @@ def gather_libraries(notebook_path: str) -> typing.List[str]:
 
         report = visitor.get_module_report()
 
-        std_lib_path = Path(sysconfig.get_python_lib(standard_lib=True))
-        std_lib = {p.name.rstrip(".py") for p in std_lib_path.iterdir()}
-
-        libs = filter(lambda k: k not in std_lib | set(sys.builtin_module_names), report)
-        gathered_libraries = list(libs)
+        gathered_libraries = filter_stdlib_modules(report)
     except Exception as e:
         _LOGGER.error(f"Could not gather libraries: {e}")
 
@@ -607,6 +738,8 @@ def gather_libraries(notebook_path: str) -> typing.List[str]:
 
 def load_files(base_path: str) -> typing.Tuple[str, typing.Optional[str]]:
     """Load Pipfile/Pipfile.lock from path."""
+    from thoth.python import Project
+
     _LOGGER.info("Looking for Pipenv files located in %r directory", base_path)
     pipfile_path = Path(base_path).joinpath("Pipfile")
     pipfile_lock_path = Path(base_path).joinpath("Pipfile.lock")
@@ -642,20 +775,25 @@ def lock_dependencies_with_thoth(
     kernels_path: Path = Path.home().joinpath(".local/share/thoth/kernels"),
     labels: typing.Optional[typing.Dict[str, str]] = None,
 ) -> typing.Tuple[int, typing.Dict[str, typing.Any]]:
-    """Lock dependencies using Thoth resolution engine."""
-    initial_path = Path.cwd()
-    # Get origin before changing path
+    """Lock dependencies using Thoth resolution engine.
+
+    The process working directory is never changed, all files are written in the kernel directory
+    so that several locks can run at the same time in the server.
+    """
+    from thoth.python import Project
+    from thoth.common import ThothAdviserIntegrationEnum
+    from thamos.lib import advise_using_config, _get_origin
+
     origin: typing.Optional[str] = _get_origin()
     _LOGGER.info("Origin identified by thamos: %r", origin)
 
     env_path = kernels_path.joinpath(kernel_name)
 
     env_path.mkdir(parents=True, exist_ok=True)
-    os.chdir(env_path)
 
     _LOGGER.info("Resolution engine used: thoth")
 
-    _LOGGER.info("Current path: %r ", env_path.as_posix())
+    _LOGGER.info("Kernel path: %r ", env_path.as_posix())
     _LOGGER.info(f"Input Pipfile: \n{pipfile_string}")
 
     advise = {
@@ -679,6 +817,7 @@ def lock_dependencies_with_thoth(
         temp.write(notebook_content)
         _LOGGER.info("path to temporary file is: %r", temp.name)
 
+        report_phase("advise", 10)
         response = advise_using_config(
             pipfile=pipfile_string,
             pipfile_lock="",  # TODO: Provide Pipfile.lock retrieved?
@@ -754,47 +893,74 @@ def lock_dependencies_with_thoth(
         except Exception as e:
             _LOGGER.debug("Requirements files cannot be stored due to: %r", e)
 
-    os.chdir(initial_path)
-
     return returncode, advise
 
 
-def get_thoth_config(
-    kernel_name: str,
-    kernels_path: Path = Path.home().joinpath(".local/share/thoth/kernels"),
-) -> _Configuration:
-    """Get Thoth config."""
-    initial_path = Path.cwd()
-    env_path = kernels_path.joinpath(kernel_name)
-    env_path.mkdir(parents=True, exist_ok=True)
-
-    os.chdir(env_path)
+def load_thoth_config(config_path: Path) -> "_Configuration":
+    """Load Thoth config from the given .thoth.yaml path, creating the default one if it does not exist.
 
-    _LOGGER.info(f"kernel_name selected: {kernel_name} and path: {env_path}")
+    thamos looks for .thoth.yaml from the current working directory, the file is read from its path instead
+    so that no os.chdir is required and configs of several kernels can be loaded at the same time.
+    """
+    import yaml
+    from thamos.config import _Configuration
 
     config = _Configuration()  # type: ignore
 
-    if not config.config_file_exists():
-        _LOGGER.debug("Thoth config does not exist, creating it...")
+    if not config_path.exists():
+        _LOGGER.debug("Thoth config does not exist, creating it at %r...", config_path.as_posix())
         try:
-            config.create_default_config()
+            default_config = config.create_default_config(nowrite=True)
+            config_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(config_path, "w") as config_file:
+                yaml.safe_dump(default_config, config_file)
         except Exception as e:
             raise Exception("Thoth config file could not be created! %r", e)
 
-    config.load_config()
-
-    os.chdir(initial_path)
+    config.load_config_from_file(str(config_path))
 
     return config
 
 
+def _store_lock_files(
+    env_path: Path, requirements: typing.Dict[str, typing.Any], requirements_lock: typing.Dict[str, typing.Any]
+) -> None:
+    """Store Pipfile/Pipfile.lock in the kernel directory, as the resolution engines do."""
+    from thoth.python import Project
+
+    env_path.mkdir(parents=True, exist_ok=True)
+
+    project = Project.from_dict(requirements, requirements_lock)
+
+    _LOGGER.info("Writing to Pipfile/Pipfile.lock in %r", env_path.as_posix())
+    project.to_files(
+        pipfile_path=str(env_path.joinpath("Pipfile")), pipfile_lock_path=str(env_path.joinpath("Pipfile.lock"))
+    )
+
+
+def get_thoth_config(
+    kernel_name: str,
+    kernels_path: Path = Path.home().joinpath(".local/share/thoth/kernels"),
+) -> "_Configuration":
+    """Get Thoth config."""
+    from thamos.config import _Configuration
+
+    env_path = kernels_path.joinpath(kernel_name)
+    env_path.mkdir(parents=True, exist_ok=True)
+
+    _LOGGER.info(f"kernel_name selected: {kernel_name} and path: {env_path}")
+
+    return load_thoth_config(config_path=env_path.joinpath(_Configuration.CONFIG_NAME))
+
+
 def lock_dependencies_with_pipenv(
     kernel_name: str,
     pipfile_string: str,
     kernels_path: Path = Path.home().joinpath(".local/share/thoth/kernels"),
 ) -> typing.Tuple[int, typing.Dict[str, typing.Any]]:
     """Lock dependencies using Pipenv resolution engine."""
-    initial_path = Path.cwd()
+    from thoth.python import Pipfile, PipfileLock
+
     env_path = kernels_path.joinpath(kernel_name)
 
     # Delete and recreate folder
@@ -807,7 +973,8 @@ def lock_dependencies_with_pipenv(
     returncode = 0
 
     ## Create virtualenv
-    cli_run([str(env_path)])
+    report_phase("environment", 5)
+    create_environment(env_path)
 
     pipfile_path = env_path.joinpath("Pipfile")
 
@@ -832,13 +999,13 @@ def lock_dependencies_with_pipenv(
         _LOGGER.debug(f"pipenv is not installed in the host!: {check_install.stderr!r}")
 
         try:
-            subprocess.run("pip install pipenv", cwd=kernels_path, shell=True)
+            report_phase("tooling", 20)
+            run_logged("pip install pipenv", cwd=kernels_path, shell=True)
         except Exception as pipenv_install_error:
             _LOGGER.debug("error installing pipenv: %r", pipenv_install_error)
             result["error"] = True
             result["error_msg"] = pipenv_install_error
             returncode = 1
-            os.chdir(initial_path)
 
             return returncode, result
     else:
@@ -846,8 +1013,9 @@ def lock_dependencies_with_pipenv(
 
     pipfile_lock_path = env_path.joinpath("Pipfile.lock")
 
+    report_phase("lock", 30)
     try:
-        output = subprocess.run(
+        output = run_logged(
             f". {kernel_name}/bin/activate && cd {kernel_name} && pipenv lock",
             env=dict(os.environ, PIPENV_CACHE_DIR="/tmp"),
             cwd=kernels_path,
@@ -866,8 +1034,6 @@ def lock_dependencies_with_pipenv(
         result["error_msg"] = str(output.stderr)
         returncode = 1
 
-    os.chdir(env_path)
-
     if not result["error"]:
 
         if pipfile_lock_path.exists():
@@ -887,8 +1053,6 @@ def lock_dependencies_with_pipenv(
             result["error"] = True
             result["error_msg"] = "Error retrieving Pipfile.lock created from pipenv."
 
-    os.chdir(initial_path)
-
     return returncode, result
 
 
@@ -899,10 +1063,12 @@ def horus_requirements_command(
     add: typing.Optional[typing.List[str]] = None,
     remove: typing.Optional[typing.List[str]] = None,
     save_in_notebook: bool = True,
-) -> Pipfile:
+) -> "Pipfile":
     """Horus requirements command."""
-    notebook = get_notebook_content(notebook_path=path)
-    notebook_metadata = dict(notebook.get("metadata"))
+    from thoth.python import Pipfile
+    from thamos.discover import discover_python_version
+
+    notebook_metadata = dict(get_notebook_metadata(notebook_path=path))
 
     pipfile_string = notebook_metadata.get("requirements")
 
@@ -951,14 +1117,15 @@ def horus_requirements_command(
     if save_in_notebook:
         notebook_metadata["requirements"] = json.dumps(pipfile_.to_dict())
 
-        notebook["metadata"] = notebook_metadata
-        save_notebook_content(notebook_path=path, notebook=notebook)
+        save_notebook_metadata(notebook_path=path, notebook_metadata=notebook_metadata)
 
     return pipfile_
 
 
-def create_pipfile_from_packages(packages: typing.List[str], python_version: str) -> Pipfile:
+def create_pipfile_from_packages(packages: typing.List[str], python_version: str) -> "Pipfile":
     """Create Pipfile from list of packages."""
+    from thoth.python import Pipfile, PipfileMeta, Source, PackageVersion
+
     source = Source(url="https://pypi.org/simple", name="pypi", verify_ssl=True)
 
     pipfile_meta = PipfileMeta(sources={"pypi": source}, requires={"python_version": python_version})
@@ -976,12 +1143,16 @@ def create_pipfile_from_packages(packages: typing.List[str], python_version: str
 
 def save_notebook_content(notebook_path: str, notebook: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
     """Save notebook content."""
-    with open(notebook_path, "w") as notebook_content:
-        json.dump(notebook, notebook_content)
+    write_notebook(notebook_path=notebook_path, notebook=notebook)
 
     return notebook
 
 
+def save_notebook_metadata(notebook_path: str, notebook_metadata: typing.Dict[str, typing.Any]) -> None:
+    """Save notebook metadata, without rewriting cells content."""
+    write_notebook_metadata(notebook_path=notebook_path, metadata=notebook_metadata)
+
+
 def horus_show_command(
     path: str,
     pipfile: bool = False,
@@ -989,13 +1160,17 @@ def horus_show_command(
     thoth_config: bool = False,
 ) -> typing.Dict[str, typing.Any]:
     """Horus show command."""
+    import yaml  # type: ignore
+    from thoth.python import Pipfile, PipfileLock
+    from thamos.config import _Configuration
+
     show_all: bool = False
 
     if not pipfile and not pipfile_lock and not thoth_config:
         # If no parameter to be shown is set, show all is set.
         show_all = True
 
-    results = {}
+    results: typing.Dict[str, typing.Any] = {}
     results["kernel_name"] = ""
     results["dependency_resolution_engine"] = ""
     results["thoth_analysis_id"] = ""
@@ -1003,8 +1178,7 @@ def horus_show_command(
     results["pipfile_lock"] = ""
     results["thoth_config"] = ""
 
-    notebook = get_notebook_content(notebook_path=path)
-    notebook_metadata = notebook.get("metadata")
+    notebook_metadata = get_notebook_metadata(notebook_path=path)
 
     if notebook_metadata.get("language_info"):
         language = notebook_metadata["language_info"]["name"]
@@ -1013,7 +1187,7 @@ def horus_show_command(
             raise Exception("Only Python kernels are currently supported.")
 
     if notebook_metadata.get("kernelspec"):
-        kernelspec = notebook_metadata.get("kernelspec")
+        kernelspec = notebook_metadata["kernelspec"]
         kernel_name = kernelspec.get("name")
     else:
         kernel_name = "python3"
@@ -1074,6 +1248,8 @@ def update_runtime_environment_in_thoth_config(
     recommendation_type: typing.Optional[str] = None,
 ) -> str:
     """Update runtime environment in thoth config."""
+    from thamos.config import _Configuration
+
     thoth_config = _Configuration()  # type: ignore
     thoth_config.load_config_from_string(config)
 
@@ -1112,6 +1288,31 @@ def update_runtime_environment_in_thoth_config(
     return json.dumps(thoth_config.content)
 
 
+def compute_thoth_lock_key(
+    pipfile_hash: str,
+    thoth_config: str,
+    labels: typing.Optional[typing.Dict[str, str]] = None,
+    notebook_content: str = "",
+) -> str:
+    """Compute lock cache key of a Thoth resolution, from all the inputs sent to Thoth adviser."""
+    config = json.loads(thoth_config)
+
+    # Kernel name does not have any impact on the resolution, only the runtime environment used is sent.
+    runtime_environment = dict(config.pop("runtime_environments")[0])
+    runtime_environment.pop("name", None)
+
+    return LockCache.compute_key(
+        pipfile_hash=pipfile_hash,
+        runtime_environment=runtime_environment,
+        resolution_engine="thoth",
+        resolution_inputs={
+            "config": config,
+            "labels": labels or {},
+            "notebook_content": hashlib.sha256(notebook_content.encode("utf-8")).hexdigest(),
+        },
+    )
+
+
 def horus_lock_command(
     path: str,
     resolution_engine: str = "thoth",
@@ -1126,17 +1327,24 @@ def horus_lock_command(
     labels: typing.Optional[typing.Dict[str, str]] = None,
     save_in_notebook: bool = True,
     save_on_disk: bool = False,
+    use_cache: bool = True,
 ) -> typing.Tuple[typing.Dict[str, typing.Any], typing.Dict[str, typing.Any]]:
-    """Lock requirements in notebook metadata."""
+    """Lock requirements in notebook metadata.
+
+    Results are reused from the lock cache when the same Pipfile was already locked with the same resolution
+    inputs (runtime environment, Thoth config, labels, notebook content), unless `use_cache` is False or `force` is set.
+    """
+    from thoth.python import Pipfile
+    from thamos.config import _Configuration
+
     results = {}
     results["kernel_name"] = ""
     results["dependency_resolution_engine"] = resolution_engine
 
-    notebook = get_notebook_content(notebook_path=path)
-    notebook_metadata = notebook.get("metadata")
+    notebook_metadata = get_notebook_metadata(notebook_path=path)
 
     if notebook_metadata.get("kernelspec"):
-        kernelspec = notebook_metadata.get("kernelspec")
+        kernelspec = notebook_metadata["kernelspec"]
         notebook_kernel = kernelspec.get("name")
     else:
         kernel_name = "python3"
@@ -1161,6 +1369,8 @@ def horus_lock_command(
         )
 
     pipfile_ = Pipfile.from_string(requirements)
+    kernels_path = Path.home().joinpath(".local/share/thoth/kernels")
+    lock_cache = LockCache()
 
     error = False
     if resolution_engine == "thoth":
@@ -1173,12 +1383,6 @@ def horus_lock_command(
             thoth_config = _Configuration()  # type: ignore
             thoth_config.load_config_from_string(thoth_config_string)
 
-        try:
-            notebook_content_py = get_notebook_content(notebook_path=path, py_format=True)
-        except Exception as e:
-            _LOGGER.error(f"Could not get notebook content!: {e!r}")
-            notebook_content_py = ""
-
         # update runtime environment in thoth config
         thoth_config_updated = update_runtime_environment_in_thoth_config(
             kernel=kernel,
@@ -1189,16 +1393,44 @@ def horus_lock_command(
             recommendation_type=recommendation_type,
         )
 
-        _, lock_results = lock_dependencies_with_thoth(
-            kernel_name=kernel,
-            pipfile_string=requirements,
-            config=thoth_config_updated,
-            timeout=timeout,
-            force=force,
-            debug=debug,
-            notebook_content=notebook_content_py,
+        try:
+            notebook_content_py = get_notebook_content(notebook_path=path, py_format=True)
+        except Exception as e:
+            _LOGGER.error(f"Could not get notebook content!: {e!r}")
+            notebook_content_py = ""
+
+        cache_key = compute_thoth_lock_key(
+            pipfile_hash=pipfile_.hash()["sha256"],
+            thoth_config=thoth_config_updated,
             labels=labels,
+            notebook_content=notebook_content_py,
         )
+
+        cached_results = lock_cache.get(cache_key) if use_cache and not force else None
+
+        if cached_results:
+            _LOGGER.info("Using cached lock results for Pipfile hash %r", pipfile_.hash()["sha256"][:6])
+            lock_results = cached_results
+            _store_lock_files(
+                env_path=kernels_path.joinpath(kernel),
+                requirements=lock_results["requirements"],
+                requirements_lock=lock_results["requirements_lock"],
+            )
+        else:
+            _, lock_results = lock_dependencies_with_thoth(
+                kernel_name=kernel,
+                pipfile_string=requirements,
+                config=thoth_config_updated,
+                timeout=timeout,
+                force=force,
+                debug=debug,
+                notebook_content=notebook_content_py,
+                labels=labels,
+            )
+
+            if use_cache and not lock_results["error"]:
+                lock_cache.set(cache_key, lock_results)
+
         lock_results["thoth_config"] = thoth_config_updated
 
         if not lock_results["error"]:
@@ -1211,7 +1443,31 @@ def horus_lock_command(
             error = True
 
     if resolution_engine == "pipenv":
-        _, lock_results = lock_dependencies_with_pipenv(kernel_name=kernel, pipfile_string=pipfile_.to_string())
+        # Pipenv resolves for the interpreter and platform where it runs.
+        cache_key = LockCache.compute_key(
+            pipfile_hash=pipfile_.hash()["sha256"],
+            runtime_environment={
+                "platform": sys.platform,
+                "python_version": f"{sys.version_info.major}.{sys.version_info.minor}",
+            },
+            resolution_engine=resolution_engine,
+        )
+
+        cached_results = lock_cache.get(cache_key) if use_cache and not force else None
+
+        if cached_results:
+            _LOGGER.info("Using cached lock results for Pipfile hash %r", pipfile_.hash()["sha256"][:6])
+            lock_results = cached_results
+            _store_lock_files(
+                env_path=kernels_path.joinpath(kernel),
+                requirements=pipfile_.to_dict(),
+                requirements_lock=lock_results["requirements_lock"],
+            )
+        else:
+            _, lock_results = lock_dependencies_with_pipenv(kernel_name=kernel, pipfile_string=pipfile_.to_string())
+
+            if use_cache and not lock_results["error"]:
+                lock_cache.set(cache_key, lock_results)
 
         # Remove if Pipenv is used after Thoth was used.
         if notebook_metadata.get("thoth_analysis_id"):
@@ -1250,8 +1506,7 @@ def horus_lock_command(
         kernelspec["name"] = kernel
         notebook_metadata["kernelspec"] = kernelspec
 
-        notebook["metadata"] = notebook_metadata
-        save_notebook_content(notebook_path=path, notebook=notebook)
+        save_notebook_metadata(notebook_path=path, notebook_metadata=notebook_metadata)
 
     return results, lock_results
 
@@ -1263,15 +1518,18 @@ def horus_set_kernel_command(
     resolution_engine: typing.Optional[str] = None,
     is_magic_command: bool = False,
     force: bool = False,
+    compile_bytecode: bool = True,
 ) -> typing.Dict[str, typing.Any]:
     """Create kernel using dependencies in notebook metadata."""
+    from thoth.python import Pipfile, PipfileLock
+    from thamos.config import _Configuration
+
     results = {}
     results["kernel_name"] = ""
     results["dependency_resolution_engine"] = ""
 
     # 0. Check if all metadata for dependencies are present in the notebook
-    notebook = get_notebook_content(notebook_path=path)
-    notebook_metadata = notebook.get("metadata")
+    notebook_metadata = get_notebook_metadata(notebook_path=path)
 
     if notebook_metadata.get("language_info"):
         language = notebook_metadata["language_info"]["name"]
@@ -1279,7 +1537,7 @@ def horus_set_kernel_command(
         if language and language != "python":
             raise Exception("Only Python kernels are currently supported.")
 
-    kernelspec = notebook_metadata.get("kernelspec")
+    kernelspec = notebook_metadata.get("kernelspec") or {}
     notebook_kernel = kernelspec.get("name")
 
     if not kernel_name:
@@ -1287,6 +1545,9 @@ def horus_set_kernel_command(
     else:
         kernel = kernel_name
 
+    if not kernel:
+        raise KeyError("No kernel name identified in notebook metadata.")
+
     if kernel == "python3":
         kernel = "jupyterlab-requirements"
 
@@ -1307,7 +1568,14 @@ def horus_set_kernel_command(
 
     complete_path: Path = store_path.joinpath(kernel)
 
-    if not is_magic_command or force:
+    # Environments installed from a previous Pipfile.lock are updated with the packages changed only.
+    environment_changes = None
+    if not is_magic_command and not force and notebook_metadata.get("requirements_lock"):
+        environment_changes = get_environment_changes(
+            env_path=complete_path, pipfile_lock=json.loads(notebook_metadata["requirements_lock"])
+        )
+
+    if (not is_magic_command or force) and environment_changes is None:
         if complete_path.exists():
             horus_delete_kernel(kernel_name=kernel)
 
@@ -1318,6 +1586,10 @@ def horus_set_kernel_command(
     # requirements
     if not is_magic_command:
         pipfile_string = notebook_metadata.get("requirements")
+
+        if not pipfile_string:
+            raise KeyError("No requirements identified in notebook metadata.")
+
         pipfile_ = Pipfile.from_string(pipfile_string)
         pipfile_path = complete_path.joinpath("Pipfile")
         pipfile_.to_file(path=str(pipfile_path))
@@ -1325,6 +1597,10 @@ def horus_set_kernel_command(
     # requirements lock
     if not is_magic_command:
         pipfile_lock_string = notebook_metadata.get("requirements_lock")
+
+        if not pipfile_lock_string:
+            raise KeyError("No requirements lock identified in notebook metadata.")
+
         pipfile_lock_ = PipfileLock.from_string(pipfile_content=pipfile_lock_string, pipfile=pipfile_)
         pipfile_lock_path = complete_path.joinpath("Pipfile.lock")
         pipfile_lock_.to_file(path=str(pipfile_lock_path))
@@ -1332,28 +1608,67 @@ def horus_set_kernel_command(
     if dependency_resolution_engine == "thoth" and not is_magic_command:
         # thoth
         thoth_config_string = notebook_metadata.get("thoth_config")
+
+        if not thoth_config_string:
+            raise KeyError("No Thoth config identified in notebook metadata.")
+
         config = _Configuration()  # type: ignore
         config.load_config_from_string(thoth_config_string)
         config_path = complete_path.joinpath(".thoth.yaml")
         config.save_config(path=str(config_path))
 
     # 2. Create virtualenv and install dependencies
-    install_packages(
-        kernel_name=kernel,
-        resolution_engine=dependency_resolution_engine,
-        is_cli=True,
-        is_magic_command=is_magic_command,
-    )
+    if environment_changes is None:
+        results["environment"] = "created"
+
+        install_packages(
+            kernel_name=kernel,
+            resolution_engine=dependency_resolution_engine,
+            is_cli=True,
+            is_magic_command=is_magic_command,
+            compile_bytecode=compile_bytecode,
+        )
+
+    elif environment_changes["install"] or environment_changes["remove"]:
+        results["environment"] = "updated"
+        _LOGGER.info(f"Updating kernel {kernel} environment: {environment_changes}")
+
+        clear_environment_state(complete_path)
+        removed = True
+
+        if environment_changes["remove"]:
+            removed = _uninstall_packages(env_path=complete_path, packages=environment_changes["remove"])
+
+        if environment_changes["install"]:
+            install_packages(
+                kernel_name=kernel,
+                resolution_engine=dependency_resolution_engine,
+                is_cli=True,
+                packages=environment_changes["install"],
+                compile_bytecode=compile_bytecode,
+            )
+
+        if not removed:
+            # Environment does not match Pipfile.lock, next set-kernel creates it again.
+            clear_environment_state(complete_path)
+        elif not environment_changes["install"]:
+            pipfile_lock = _load_pipfile_lock(complete_path)
+            if pipfile_lock:
+                save_environment_state(complete_path, pipfile_lock)
+
+    else:
+        results["environment"] = "unchanged"
+        _LOGGER.info(f"Kernel {kernel} environment already matches Pipfile.lock.")
 
     # 3. Assign virtualenv to jupyter kernel
-    create_kernel(kernel_name=kernel)
+    if results["environment"] != "unchanged" or kernel not in kernelspecs_index.find_kernel_specs():
+        create_kernel(kernel_name=kernel)
 
     if save_in_notebook:
         # Update kernel name if different name selected.
         kernelspec["name"] = kernel
         notebook_metadata["kernelspec"] = kernelspec
-        notebook["metadata"] = notebook_metadata
-        save_notebook_content(notebook_path=path, notebook=notebook)
+        save_notebook_metadata(notebook_path=path, notebook_metadata=notebook_metadata)
 
     return results
 
@@ -1368,6 +1683,9 @@ def horus_extract_command(
     force: bool = False,
 ) -> typing.Dict[str, typing.Any]:
     """Horus extract command."""
+    from thoth.python import Pipfile, PipfileLock
+    from thamos.config import _Configuration
+
     results = {}
     results["kernel_name"] = ""
     results["resolution_engine"] = ""
@@ -1378,8 +1696,7 @@ def horus_extract_command(
         # If no parameter to be extracted is set, extract all is set.
         extract_all = True
 
-    notebook = get_notebook_content(notebook_path=notebook_path)
-    notebook_metadata = notebook.get("metadata")
+    notebook_metadata = get_notebook_metadata(notebook_path=notebook_path)
 
     if notebook_metadata.get("language_info"):
         language = notebook_metadata["language_info"]["name"]
@@ -1388,7 +1705,7 @@ def horus_extract_command(
             raise Exception("Only Python kernels are currently supported.")
 
     if notebook_metadata.get("kernelspec"):
-        kernelspec = notebook_metadata.get("kernelspec")
+        kernelspec = notebook_metadata["kernelspec"]
         kernel_name = kernelspec.get("name")
     else:
         kernel_name = "python3"
@@ -1457,22 +1774,24 @@ def horus_extract_command(
         config = _Configuration()  # type: ignore
         config.load_config_from_string(thoth_config_string)
 
-        yaml_path = Path(".thoth.yaml")
+        # Overlays hold only Pipfile and Pipfile.lock, .thoth.yaml stays at the root of the store path.
+        yaml_path = Path(store_files_path).joinpath(".thoth.yaml")
         if yaml_path.exists() and not force:
             raise FileExistsError(
                 f"Cannot store .thoth.yaml because it already exists at path: {yaml_path.as_posix()!r}. "
                 "Use --force to overwrite existing content or --show-only to visualize it."
             )
         else:
-            config.save_config()
+            config.save_config(path=str(yaml_path))
 
     return results
 
 
 def horus_log_command(notebook_path: str) -> str:
     """Get log analysis results from adviser ID."""
-    notebook = get_notebook_content(notebook_path=notebook_path)
-    notebook_metadata = notebook.get("metadata")
+    from thamos.lib import get_log
+
+    notebook_metadata = get_notebook_metadata(notebook_path=notebook_path)
 
     if "requirements_lock" not in notebook_metadata.keys():
         raise Exception(f"notebook at {notebook_path} does not has locked requirements.")
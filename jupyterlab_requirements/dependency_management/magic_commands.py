@@ -38,7 +38,7 @@ from .lib import print_report
 from .lib import horus_check_metadata_content
 from .lib import create_pipfile_from_packages
 from .lib import gather_libraries
-from .lib import get_notebook_content
+from .lib import get_notebook_metadata
 from .lib import get_packages
 from .lib import horus_delete_kernel
 from .lib import horus_extract_command
@@ -164,6 +164,10 @@ class HorusMagics(Magics):  # type: ignore[misc]
         # Use Pipenv
         lock_command.add_argument("--pipenv", help="Use pipenv resolution engine.", action="store_true")
 
+        lock_command.add_argument(
+            "--no-cache", help="Do not reuse lock results stored in the local cache.", action="store_true"
+        )
+
         # command: set-kernel
         set_command = subparsers.add_parser(
             "set-kernel", description="Set kernel from dependencies in notebook content."
@@ -174,6 +178,9 @@ class HorusMagics(Magics):  # type: ignore[misc]
             help="Specify kernel name to be used when creating it.",
         )
         set_command.add_argument("--force", help="Delete kernel if exists and recreate it.", action="store_true")
+        set_command.add_argument(
+            "--skip-compile", help="Do not compile bytecode of installed packages.", action="store_true"
+        )
 
         # command: check_kernel
         check_kernel_command = subparsers.add_parser(
@@ -286,8 +293,7 @@ class HorusMagics(Magics):  # type: ignore[misc]
         if args.command == "check":
             _LOGGER.info("Checking notebook content.")
 
-            notebook = get_notebook_content(notebook_path=nb_path)
-            notebook_metadata = notebook.get("metadata")
+            notebook_metadata = get_notebook_metadata(notebook_path=nb_path)
 
             results = horus_check_metadata_content(notebook_metadata=notebook_metadata, is_cli=False)
 
@@ -364,6 +370,7 @@ class HorusMagics(Magics):  # type: ignore[misc]
                 python_version=args.python_version,
                 save_in_notebook=False,
                 save_on_disk=True,
+                use_cache=not args.no_cache,
             )
 
             if lock_results["error"]:
@@ -410,6 +417,7 @@ class HorusMagics(Magics):  # type: ignore[misc]
                 is_magic_command=True,
                 save_in_notebook=False,
                 force=args.force,
+                compile_bytecode=not args.skip_compile,
             )
 
             return json.dumps(
@@ -451,9 +459,9 @@ class HorusMagics(Magics):  # type: ignore[misc]
             if args.kernel_name == "python3":
                 raise Exception(f"kernel {args.kernel_name} is the default Jupyter kernel, it cannot be deleted.")
 
-            command_output = horus_delete_kernel(kernel_name=args.kernel_name)
+            is_deleted = horus_delete_kernel(kernel_name=args.kernel_name)
 
-            if command_output.returncode == 0:
+            if is_deleted:
                 return f"{args.kernel_name} kernel successfully deleted"
             else:
                 raise Exception(f"{args.kernel_name} kernel could not be deleted.")
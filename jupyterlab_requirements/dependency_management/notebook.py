@@ -0,0 +1,277 @@
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Notebook file handling without external processes."""
+
+import os
+import re
+import json
+import mmap
+import stat
+import logging
+import tempfile
+import typing
+
+_LOGGER = logging.getLogger("jupyterlab_requirements.notebook")
+
+_WHITESPACE_RE = re.compile(rb"[ \t\n\r]*")
+_INDENT_RE = re.compile(rb"\{\n( +)\"")
+_STRING_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+# Strings are matched as a whole so that brackets inside them are not considered.
+_TOKEN_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]')
+_SCALAR_RE = re.compile(rb"[^,}\]\s]*")
+_CLOSING_BRACKETS = {b"{": b"}", b"[": b"]"}
+
+# Raw cells included as they are in the Python script, as nbconvert PythonExporter does.
+_PYTHON_RAW_MIMETYPES = ("", "text/x-python")
+
+
+def _get_cell_source(cell: typing.Dict[str, typing.Any]) -> str:
+    """Get cell source, which is stored as a string or as a list of lines."""
+    source = cell.get("source", "")
+
+    if isinstance(source, list):
+        return "".join(source)
+
+    return str(source)
+
+
+def _ipython2python(code: str) -> str:
+    """Transform IPython syntax (magics, shell escapes) to Python, as nbconvert ipython2python filter."""
+    try:
+        from IPython.core.inputtransformer2 import TransformerManager
+    except ImportError:
+        _LOGGER.warning("IPython is needed to transform magics, Python source is used as it is.")
+        return code
+
+    return str(TransformerManager().transform_cell(code))
+
+
+def notebook_to_python(notebook: typing.Dict[str, typing.Any]) -> str:
+    """Convert notebook content to a Python script, as `jupyter nbconvert --to python` does.
+
+    Code cells are transformed from IPython syntax, markdown cells are commented out.
+    """
+    script = ["#!/usr/bin/env python\n# coding: utf-8\n"]
+
+    for cell in notebook.get("cells", []):
+        cell_type = cell.get("cell_type")
+        source = _get_cell_source(cell)
+
+        if cell_type == "code":
+            execution_count = cell.get("execution_count") or " "
+            script.append(f"\n# In[{execution_count}]:\n\n\n{_ipython2python(source).rstrip()}\n\n")
+
+        elif cell_type == "markdown":
+            script.append("\n" + "\n".join(f"# {line}" for line in source.splitlines()) + "\n")
+
+        elif cell_type == "raw":
+            if cell.get("metadata", {}).get("raw_mimetype", "").lower() in _PYTHON_RAW_MIMETYPES:
+                script.append(f"\n{source}\n\n")
+
+    return "".join(script)
+
+
+def _skip_whitespace(buffer: typing.Any, position: int) -> int:
+    """Get position of the first non whitespace character from position."""
+    return _WHITESPACE_RE.match(buffer, position).end()  # type: ignore
+
+
+def _skip_value(buffer: typing.Any, position: int) -> int:
+    """Get end position of the JSON value starting at position, without decoding it."""
+    first = buffer[position : position + 1]
+
+    if first == b'"':
+        return _STRING_RE.match(buffer, position).end()  # type: ignore
+
+    if first not in _CLOSING_BRACKETS:
+        return _SCALAR_RE.match(buffer, position).end()  # type: ignore
+
+    depth = 0
+    for token in _TOKEN_RE.finditer(buffer, position):
+        bracket = token.group()
+        if bracket in (b"{", b"["):
+            depth += 1
+        elif bracket in (b"}", b"]"):
+            depth -= 1
+            if depth == 0:
+                return token.end()
+
+    raise ValueError(f"Unterminated JSON value at position {position}")
+
+
+def _get_indent(buffer: typing.Any) -> int:
+    """Get indentation used in the notebook file, 0 if the file is not indented."""
+    match = _INDENT_RE.match(buffer, _skip_whitespace(buffer, 0))
+    return len(match.group(1)) if match else 0
+
+
+def _iter_indented_values(
+    buffer: typing.Any, key: str, depth: int, indent: int, start: int = 0, end: typing.Optional[int] = None
+) -> typing.Iterator[typing.Tuple[int, int]]:
+    """Iterate over (value start, value end) of key at the given depth in an indented notebook file.
+
+    JSON strings cannot contain raw new lines, therefore in files written with indentation (as Jupyter does)
+    a new line followed by `depth * indent` spaces is structural and keys and closing brackets at that
+    depth can be found without scanning the content in between.
+    """
+    end = len(buffer) if end is None else end
+    prefix = b"\n" + b" " * (depth * indent)
+    marker = prefix + json.dumps(key).encode("utf-8") + b":"
+
+    position = buffer.find(marker, start, end)
+
+    while position != -1:
+        value_start = _skip_whitespace(buffer, position + len(marker))
+        first = buffer[value_start : value_start + 1]
+
+        if first in _CLOSING_BRACKETS and buffer[value_start + 1 : value_start + 2] != b"\n":
+            # Empty containers are written inline.
+            value_end = _skip_value(buffer, value_start)
+        elif first in _CLOSING_BRACKETS:
+            closing = prefix + _CLOSING_BRACKETS[first]
+            value_end = buffer.find(closing, value_start, end)
+            if value_end == -1:
+                raise ValueError(f"Unterminated JSON value at position {value_start}")
+            value_end += len(closing)
+        else:
+            value_end = _skip_value(buffer, value_start)
+
+        yield value_start, value_end
+
+        position = buffer.find(marker, value_end, end)
+
+
+def _load_notebook(notebook_path: str) -> typing.Dict[str, typing.Any]:
+    """Load the whole notebook content."""
+    with open(notebook_path) as notebook_file:
+        notebook: typing.Dict[str, typing.Any] = json.load(notebook_file)
+
+    return notebook
+
+
+def read_notebook_metadata(notebook_path: str) -> typing.Dict[str, typing.Any]:
+    """Read only the top level metadata of the notebook.
+
+    Notebooks written with indentation (as Jupyter does) are memory mapped and cells are skipped
+    without being decoded, so outputs (e.g. images) are never loaded in memory.
+    """
+    with open(notebook_path, "rb") as notebook_file:
+        with mmap.mmap(notebook_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            indent = _get_indent(buffer)
+
+            if indent:
+                for value_start, value_end in _iter_indented_values(buffer, "metadata", depth=1, indent=indent):
+                    metadata: typing.Dict[str, typing.Any] = json.loads(buffer[value_start:value_end])
+                    return metadata
+
+    metadata = _load_notebook(notebook_path).get("metadata", {})
+    return metadata
+
+
+def read_notebook(notebook_path: str, include_outputs: bool = True) -> typing.Dict[str, typing.Any]:
+    """Read notebook content, cells outputs are replaced by empty lists if `include_outputs` is False."""
+    if include_outputs:
+        return _load_notebook(notebook_path)
+
+    with open(notebook_path, "rb") as notebook_file:
+        with mmap.mmap(notebook_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            indent = _get_indent(buffer)
+
+            if indent:
+                chunks = []
+                position = 0
+
+                for cells_start, cells_end in _iter_indented_values(buffer, "cells", depth=1, indent=indent):
+                    for outputs_start, outputs_end in _iter_indented_values(
+                        buffer, "outputs", depth=3, indent=indent, start=cells_start, end=cells_end
+                    ):
+                        chunks.append(buffer[position:outputs_start])
+                        chunks.append(b"[]")
+                        position = outputs_end
+
+                chunks.append(buffer[position:])
+
+                notebook: typing.Dict[str, typing.Any] = json.loads(b"".join(chunks))
+                return notebook
+
+    notebook = _load_notebook(notebook_path)
+    for cell in notebook.get("cells", []):
+        if "outputs" in cell:
+            cell["outputs"] = []
+
+    return notebook
+
+
+def _dump_json(content: typing.Any, indent: int, depth: int = 0) -> bytes:
+    """Serialize content as Jupyter does (sorted keys, non ASCII characters kept), nested at depth."""
+    dumped = json.dumps(content, indent=indent, sort_keys=True, ensure_ascii=False)
+    return dumped.replace("\n", "\n" + " " * (depth * indent)).encode("utf-8")
+
+
+def _write_atomic(notebook_path: str, chunks: typing.Iterable[typing.Any]) -> None:
+    """Write chunks to a temporary file next to the notebook and replace the notebook with it.
+
+    Readers see the previous or the new notebook, never a partially written one.
+    """
+    directory, name = os.path.split(os.path.abspath(notebook_path))
+    file_descriptor, temp_path = tempfile.mkstemp(prefix=f".{name}.", dir=directory)
+    try:
+        with os.fdopen(file_descriptor, "wb") as temp_file:
+            for chunk in chunks:
+                temp_file.write(chunk)
+
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+
+        try:
+            os.chmod(temp_path, stat.S_IMODE(os.stat(notebook_path).st_mode))
+        except FileNotFoundError:
+            pass
+
+        os.replace(temp_path, notebook_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def write_notebook(notebook_path: str, notebook: typing.Dict[str, typing.Any]) -> None:
+    """Write the whole notebook content, replacing the file atomically."""
+    _write_atomic(notebook_path, [_dump_json(notebook, indent=1), b"\n"])
+
+
+def write_notebook_metadata(notebook_path: str, metadata: typing.Dict[str, typing.Any]) -> None:
+    """Replace the top level metadata of the notebook, keeping cells as they are in the file.
+
+    In notebooks written with indentation the new metadata is spliced in the original content, so
+    cells are copied without being decoded or serialized again. The file is replaced atomically.
+    """
+    with open(notebook_path, "rb") as notebook_file:
+        with mmap.mmap(notebook_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            indent = _get_indent(buffer)
+
+            if indent:
+                for value_start, value_end in _iter_indented_values(buffer, "metadata", depth=1, indent=indent):
+                    with memoryview(buffer) as view:
+                        _write_atomic(
+                            notebook_path,
+                            [view[:value_start], _dump_json(metadata, indent=indent, depth=1), view[value_end:]],
+                        )
+                    return
+
+    notebook = _load_notebook(notebook_path)
+    notebook["metadata"] = metadata
+    write_notebook(notebook_path, notebook)
@@ -0,0 +1,286 @@
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Content-addressed store of installed packages, shared by kernels environments."""
+
+import os
+import csv
+import sys
+import json
+import fcntl
+import shutil
+import hashlib
+import logging
+import sysconfig
+import tempfile
+import contextlib
+import typing
+
+from pathlib import Path
+
+from .cache import _write_json_atomic
+from .environments import _FileCloner
+from .import_index import _normalize
+from .site_packages import _get_distribution
+from .site_packages import get_site_packages_paths
+
+_LOGGER = logging.getLogger("jupyterlab_requirements.package_store")
+
+# Set to 0 to install all packages in each kernel, without sharing them through the store.
+_PACKAGE_STORE_ENABLED = bool(int(os.getenv("JUPYTERLAB_REQUIREMENTS_PACKAGE_STORE", 1)))
+
+STORE_PATH = Path(
+    os.getenv("JUPYTERLAB_REQUIREMENTS_PACKAGE_STORE_PATH", Path.home().joinpath(".local/share/thoth/store"))
+)
+
+# Installed files depend on the interpreter and the platform, not only on the artifacts hashes.
+_STORE_TAG = f"{sys.implementation.cache_tag}-{sysconfig.get_platform()}"
+
+# Environment path in stored scripts (e.g. shebangs), replaced by the kernel environment path when linked.
+_PREFIX_PLACEHOLDER = b"/@JUPYTERLAB_REQUIREMENTS_PREFIX@"
+
+_MANIFEST = "manifest.json"
+
+
+def get_locked_packages(pipfile_lock: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    """Get packages pinned with hashes in Pipfile.lock (normalized name -> entry), as installed with --dev."""
+    packages: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+
+    for section in ("default", "develop"):
+        for name, entry in pipfile_lock.get(section, {}).items():
+            if entry.get("hashes") and str(entry.get("version", "")).startswith("=="):
+                packages.setdefault(_normalize(name), entry)
+
+    return packages
+
+
+def _read_record(dist_info_path: str) -> typing.List[str]:
+    """Get paths of files installed by a distribution, relative to site-packages."""
+    with open(os.path.join(dist_info_path, "RECORD"), newline="") as record_file:
+        return [row[0] for row in csv.reader(record_file) if row]
+
+
+class PackageStore:
+    """Installed packages shared by kernels, each one stored once for the same locked artifacts.
+
+    An entry is keyed by the sha256 hashes of the package artifacts in Pipfile.lock, therefore kernels
+    with the same package locked link the same files (reflinks or hardlinks when the file system supports
+    them) instead of installing them again. Only packages installing files in site-packages and scripts
+    are stored. Entries not locked by any kernel are removed by `collect_garbage`.
+    """
+
+    def __init__(self, store_path: Path = STORE_PATH) -> None:
+        """Init."""
+        self.store_path = store_path
+        self.entries_path = store_path.joinpath(_STORE_TAG)
+
+    @staticmethod
+    def compute_key(name: str, entry: typing.Dict[str, typing.Any]) -> str:
+        """Compute store key of a package locked in Pipfile.lock."""
+        key_content = json.dumps(
+            {"name": _normalize(name), "version": entry["version"], "hashes": sorted(entry["hashes"])}, sort_keys=True
+        )
+
+        return hashlib.sha256(key_content.encode("utf-8")).hexdigest()
+
+    @contextlib.contextmanager
+    def _lock(self, exclusive: bool = False) -> typing.Iterator[None]:
+        """Lock the store, shared to add and link entries, exclusive to remove them."""
+        self.store_path.mkdir(parents=True, exist_ok=True)
+
+        with open(self.store_path.joinpath(".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    def _get_installed_dist_infos(self, site_packages_path: Path) -> typing.Dict[typing.Tuple[str, str], str]:
+        """Get .dist-info directories installed ((normalized name, version) -> path)."""
+        dist_infos = {}
+
+        for entry in os.scandir(site_packages_path):
+            if entry.name.endswith(".dist-info") and entry.is_dir():
+                distribution = _get_distribution(entry)
+                if distribution:
+                    dist_infos[(_normalize(distribution[0]), distribution[1])] = entry.path
+
+        return dist_infos
+
+    def _add_entry(self, key: str, name: str, env_path: Path, site_packages_path: Path, dist_info_path: str) -> bool:
+        """Store package installed in the environment, False if it installs files the store does not handle."""
+        files = []
+        scripts = []
+
+        recorded = _read_record(dist_info_path)
+        recorded_paths = set(recorded)
+
+        for path in recorded:
+            installed_path = os.path.normpath(os.path.join(site_packages_path, path))
+            relative_path = os.path.relpath(installed_path, env_path)
+
+            if not path.startswith(".."):
+                files.append(path)
+
+                # Bytecode is compiled after pip installs packages, therefore it is not listed in RECORD.
+                if path.endswith(".py"):
+                    directory, module = os.path.split(path[:-3])
+                    pyc_path = os.path.join(directory, "__pycache__", f"{module}.{sys.implementation.cache_tag}.pyc")
+                    if pyc_path not in recorded_paths and os.path.exists(os.path.join(site_packages_path, pyc_path)):
+                        files.append(pyc_path)
+            elif os.path.dirname(relative_path) == "bin":
+                scripts.append(os.path.basename(relative_path))
+            else:
+                _LOGGER.debug("Package %r is not stored, it installs %r", name, relative_path)
+                return False
+
+        cloner = _FileCloner()
+        env_prefix = os.fsencode(os.path.abspath(env_path))
+        temp_path = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=self.entries_path))
+
+        try:
+            for path in files:
+                destination = temp_path.joinpath("site-packages", path)
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                cloner.clone(os.path.join(site_packages_path, path), str(destination))
+
+            for script in scripts:
+                content = env_path.joinpath("bin", script).read_bytes()
+                destination = temp_path.joinpath("bin", script)
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                destination.write_bytes(content.replace(env_prefix, _PREFIX_PLACEHOLDER))
+                shutil.copymode(env_path.joinpath("bin", script), destination)
+
+            _write_json_atomic(temp_path.joinpath(_MANIFEST), {"name": name, "files": files, "scripts": scripts})
+
+            # Another kernel may have stored the same package in the meantime.
+            os.rename(temp_path, self.entries_path.joinpath(key))
+        except OSError as e:
+            _LOGGER.debug("Package %r could not be stored: %r", name, e)
+            shutil.rmtree(temp_path, ignore_errors=True)
+            return False
+
+        return True
+
+    def add_packages(self, pipfile_lock: typing.Dict[str, typing.Any], env_path: Path) -> typing.List[str]:
+        """Store packages locked and installed in the environment which are not stored yet, return their names."""
+        site_packages_paths = get_site_packages_paths(env_path)
+        if not site_packages_paths:
+            return []
+
+        added = []
+        self.entries_path.mkdir(parents=True, exist_ok=True)
+        dist_infos = self._get_installed_dist_infos(site_packages_paths[0])
+
+        with self._lock():
+            for name, entry in get_locked_packages(pipfile_lock).items():
+                key = self.compute_key(name, entry)
+                dist_info_path = dist_infos.get((name, entry["version"][2:]))
+
+                if not dist_info_path or self.entries_path.joinpath(key).exists():
+                    continue
+
+                if self._add_entry(key, name, env_path, site_packages_paths[0], dist_info_path):
+                    added.append(name)
+
+        _LOGGER.info("Packages added to the store from %s: %r", env_path, added)
+
+        return added
+
+    def link_packages(self, pipfile_lock: typing.Dict[str, typing.Any], env_path: Path) -> typing.List[str]:
+        """Link stored packages locked and not installed in the environment yet, return their names.
+
+        Packages linked are seen as already installed by pip, which installs only the remaining ones.
+        """
+        site_packages_paths = get_site_packages_paths(env_path)
+        if not site_packages_paths:
+            return []
+
+        linked = []
+        cloner = _FileCloner()
+        env_prefix = os.fsencode(os.path.abspath(env_path))
+        site_packages_path = site_packages_paths[0]
+        installed = {name for name, _ in self._get_installed_dist_infos(site_packages_path)}
+
+        with self._lock():
+            for name, entry in get_locked_packages(pipfile_lock).items():
+                entry_path = self.entries_path.joinpath(self.compute_key(name, entry))
+
+                if name in installed or not entry_path.joinpath(_MANIFEST).exists():
+                    continue
+
+                with open(entry_path.joinpath(_MANIFEST)) as manifest_file:
+                    manifest = json.load(manifest_file)
+
+                for path in manifest["files"]:
+                    destination = site_packages_path.joinpath(path)
+                    destination.parent.mkdir(parents=True, exist_ok=True)
+                    with contextlib.suppress(FileNotFoundError):
+                        destination.unlink()
+
+                    cloner.clone(str(entry_path.joinpath("site-packages", path)), str(destination))
+
+                for script in manifest["scripts"]:
+                    content = entry_path.joinpath("bin", script).read_bytes()
+                    destination = env_path.joinpath("bin", script)
+                    # Scripts can be hardlinks shared with the base environment.
+                    with contextlib.suppress(FileNotFoundError):
+                        destination.unlink()
+
+                    destination.write_bytes(content.replace(_PREFIX_PLACEHOLDER, env_prefix))
+                    shutil.copymode(entry_path.joinpath("bin", script), destination)
+
+                linked.append(name)
+
+        _LOGGER.info("Packages linked from the store to %s: %r (%r)", env_path, linked, cloner.counts)
+
+        return linked
+
+    def collect_garbage(self, kernels_path: Path) -> typing.List[str]:
+        """Remove entries not locked by any kernel in kernels_path, return keys removed.
+
+        Lock files are read holding the store lock, so that entries added by kernels locked in the meantime are kept.
+        """
+        removed: typing.List[str] = []
+
+        with self._lock(exclusive=True):
+            referenced: typing.Set[str] = set()
+
+            for pipfile_lock_path in kernels_path.glob("*/Pipfile.lock"):
+                try:
+                    with open(pipfile_lock_path) as pipfile_lock_file:
+                        pipfile_lock = json.load(pipfile_lock_file)
+                except (OSError, ValueError) as e:
+                    _LOGGER.warning("Lock file %s could not be read, store is not cleaned: %r", pipfile_lock_path, e)
+                    return []
+
+                referenced.update(
+                    self.compute_key(name, entry) for name, entry in get_locked_packages(pipfile_lock).items()
+                )
+
+            if not self.entries_path.exists():
+                return removed
+
+            for entry in os.scandir(self.entries_path):
+                # Temporary entries are left only by interrupted processes, as the lock is exclusive.
+                if entry.name not in referenced:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    removed.append(entry.name)
+
+        _LOGGER.info("Entries removed from the store: %d", len(removed))
+
+        return removed
+
+
+# Shared by all the handlers and commands running in the same process.
+package_store = PackageStore()
@@ -41,8 +41,9 @@ class PipenvHandler(DependencyManagementBaseHandler):
 
         self.redirect_to_task(task_index)
 
-    async def lock_using_pipenv(self, input_data: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
-        """Lock and install dependencies using pipenv."""
+    @staticmethod
+    def lock_using_pipenv(input_data: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+        """Lock and install dependencies using pipenv (blocking, run in the tasks executor)."""
         kernel_name: str = input_data["kernel_name"]
         requirements: typing.Dict[str, typing.Any] = json.loads(input_data["requirements"])
         pipfile_string = Pipfile.from_dict(requirements).to_string()
@@ -0,0 +1,135 @@
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Progress events of long running tasks (phases, output lines), recorded for the server to stream them."""
+
+import os
+import time
+import logging
+import threading
+import contextlib
+import contextvars
+import subprocess
+import typing
+
+_LOGGER = logging.getLogger("jupyterlab_requirements.progress")
+
+# Progress of the task running in the current context, None outside server tasks (e.g. horus CLI).
+_CURRENT_PROGRESS: "contextvars.ContextVar[typing.Optional[TaskProgress]]" = contextvars.ContextVar(
+    "jupyterlab_requirements_progress", default=None
+)
+
+
+class TaskProgress:
+    """Events of a task, appended by the task in any thread and read by the server.
+
+    Events have an `id` (their position), a `type` (`phase`, `log` or `done`) and a `time`. Phase events
+    have a `phase` name and a `percentage`, log events an output `line`, the done event an `error` flag.
+    Subscribers are called in the thread appending events, they must only schedule work (e.g. on the event loop).
+    """
+
+    def __init__(self) -> None:
+        """Init."""
+        self.events: typing.List[typing.Dict[str, typing.Any]] = []
+        self.finished = False
+        self._lock = threading.Lock()
+        self._subscribers: typing.List[typing.Callable[[], None]] = []
+
+    def add(self, event_type: str, **data: typing.Any) -> None:
+        """Append event and notify subscribers."""
+        with self._lock:
+            if self.finished:
+                return
+
+            self.events.append({"id": len(self.events), "type": event_type, "time": time.time(), **data})
+            self.finished = event_type == "done"
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            subscriber()
+
+    def get_events(self, start: int = 0) -> typing.List[typing.Dict[str, typing.Any]]:
+        """Get events from id `start`."""
+        with self._lock:
+            return self.events[start:]
+
+    def finish(self, error: bool = False) -> None:
+        """Append the last event of the task."""
+        self.add("done", error=error)
+
+    def subscribe(self, subscriber: typing.Callable[[], None]) -> None:
+        """Call subscriber when events are appended."""
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber: typing.Callable[[], None]) -> None:
+        """Stop calling subscriber."""
+        with self._lock:
+            self._subscribers.remove(subscriber)
+
+
+@contextlib.contextmanager
+def recording(progress: TaskProgress) -> typing.Iterator[TaskProgress]:
+    """Record progress reported in the context (also by functions called) in `progress`."""
+    token = _CURRENT_PROGRESS.set(progress)
+    try:
+        yield progress
+    finally:
+        _CURRENT_PROGRESS.reset(token)
+
+
+def run_recording(progress: TaskProgress, function: typing.Callable, *args: typing.Any) -> typing.Any:  # type: ignore
+    """Call function recording progress it reports, used to run tasks in threads."""
+    with recording(progress):
+        return function(*args)
+
+
+def report_phase(phase: str, percentage: typing.Optional[int] = None) -> None:
+    """Report the task entered a new phase, with an estimated percentage of the task done."""
+    progress = _CURRENT_PROGRESS.get()
+    if progress is not None:
+        progress.add("phase", phase=phase, percentage=percentage)
+
+
+def report_log(line: str) -> None:
+    """Report an output line of the task."""
+    progress = _CURRENT_PROGRESS.get()
+    if progress is not None:
+        progress.add("log", line=line)
+
+
+def run_logged(args: typing.Union[str, typing.List[str]], **kwargs: typing.Any) -> subprocess.CompletedProcess:
+    """Run process as subprocess.run, reporting its output (stdout and stderr) line by line as it is written.
+
+    Outside of tasks the process is run as is. In tasks, if `capture_output` is set, stdout and stderr
+    of the process returned both have the whole output, as they are read from the same pipe.
+    """
+    if _CURRENT_PROGRESS.get() is None:
+        return subprocess.run(args, **kwargs)
+
+    capture_output = kwargs.pop("capture_output", False)
+    # Python processes (pip, pipenv) would write their output in blocks to the pipe.
+    kwargs["env"] = dict(kwargs.get("env") or os.environ, PYTHONUNBUFFERED="1")
+    output = []
+
+    with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, **kwargs) as process:
+        for line in process.stdout:  # type: ignore
+            output.append(line)
+            report_log(line.decode("utf-8", errors="replace").rstrip())
+
+    captured = b"".join(output) if capture_output else None
+
+    return subprocess.CompletedProcess(args, process.returncode, stdout=captured, stderr=captured)
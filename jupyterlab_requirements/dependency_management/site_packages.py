@@ -0,0 +1,239 @@
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Inspect installed distributions directly from site-packages, without spawning interpreters."""
+
+import os
+import logging
+import threading
+import typing
+
+from pathlib import Path
+
+_LOGGER = logging.getLogger("jupyterlab_requirements.site_packages")
+
+
+def get_site_packages_paths(env_path: Path) -> typing.List[Path]:
+    """Get site-packages directories of the virtualenv at the given path."""
+    site_packages_paths: typing.List[Path] = []
+
+    for site_packages_path in sorted(env_path.glob("lib*/python*/site-packages")):
+        # lib64 is usually a symlink to lib in virtualenvs.
+        if site_packages_path.resolve() not in [p.resolve() for p in site_packages_paths]:
+            site_packages_paths.append(site_packages_path)
+
+    return site_packages_paths
+
+
+def _read_metadata_headers(metadata_path: str) -> typing.Dict[str, str]:
+    """Read Name and Version from core metadata, stopping before the (possibly long) description."""
+    headers: typing.Dict[str, str] = {}
+
+    with open(metadata_path, encoding="utf-8", errors="replace") as metadata_file:
+        for line in metadata_file:
+            if not line.strip():
+                break
+
+            key, separator, value = line.partition(":")
+            if separator and key in ("Name", "Version") and key not in headers:
+                headers[key] = value.strip()
+
+                if len(headers) == 2:
+                    break
+
+    return headers
+
+
+def _get_distribution(entry: os.DirEntry) -> typing.Optional[typing.Tuple[str, str]]:  # type: ignore
+    """Get (name, version) of the distribution described by a .dist-info/.egg-info entry."""
+    if entry.name.endswith(".dist-info"):
+        metadata_path = os.path.join(entry.path, "METADATA")
+    elif entry.name.endswith(".egg-info"):
+        # egg-info can be a directory or directly the PKG-INFO file.
+        metadata_path = os.path.join(entry.path, "PKG-INFO") if entry.is_dir() else entry.path
+    else:
+        return None
+
+    try:
+        headers = _read_metadata_headers(metadata_path)
+    except OSError as e:
+        _LOGGER.debug("Metadata could not be read from %r: %r", metadata_path, e)
+        headers = {}
+
+    if "Name" not in headers or "Version" not in headers:
+        # Fallback to the file name, which is {name}-{version}.dist-info
+        name_version = entry.name.rsplit(".", maxsplit=1)[0].split("-")
+        if len(name_version) < 2:
+            return None
+
+        return headers.get("Name", name_version[0]), headers.get("Version", name_version[1])
+
+    return headers["Name"], headers["Version"]
+
+
+def parse_top_level_names(top_level: typing.Optional[str], record: typing.Optional[str]) -> typing.List[str]:
+    """Get top level import names of a distribution from its top_level.txt or, if missing, its RECORD content."""
+    if top_level is not None:
+        names = [line.strip().split("/")[0] for line in top_level.splitlines()]
+    else:
+        names = []
+        for line in (record or "").splitlines():
+            top_level_path = line.split(",", maxsplit=1)[0].split("/")[0]
+
+            if top_level_path.endswith((".dist-info", ".data", ".egg-info", ".pth")) or top_level_path == "..":
+                continue
+
+            # Modules (e.g. six.py or _cffi_backend.cpython-38-x86_64-linux-gnu.so) or packages directories.
+            names.append(top_level_path.split(".", maxsplit=1)[0])
+
+    return sorted({name for name in names if name.isidentifier() and name != "__pycache__"})
+
+
+def _read_text(path: str) -> typing.Optional[str]:
+    """Read text file, None if it does not exist."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as text_file:
+            return text_file.read()
+    except OSError:
+        return None
+
+
+def get_distributions_import_names(path: typing.Union[str, Path]) -> typing.Dict[str, typing.List[str]]:
+    """Get top level import names (name -> import names) of distributions installed in the given path."""
+    distributions: typing.Dict[str, typing.List[str]] = {}
+
+    try:
+        entries = [entry for entry in os.scandir(path) if entry.name.endswith(".dist-info") and entry.is_dir()]
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        return distributions
+
+    for entry in entries:
+        distribution = _get_distribution(entry)
+        if not distribution:
+            continue
+
+        import_names = parse_top_level_names(
+            top_level=_read_text(os.path.join(entry.path, "top_level.txt")),
+            record=_read_text(os.path.join(entry.path, "RECORD")),
+        )
+
+        if import_names:
+            distributions.setdefault(distribution[0], import_names)
+
+    return distributions
+
+
+def get_installed_packages(paths: typing.Iterable[typing.Union[str, Path]]) -> typing.Dict[str, str]:
+    """Get installed packages (name -> version) reading distributions metadata in the given paths.
+
+    Paths are considered in order, the first distribution found for a name is reported, as the interpreter does.
+    """
+    packages: typing.Dict[str, str] = {}
+
+    for path in paths:
+        try:
+            entries = list(os.scandir(path))
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+        for entry in entries:
+            distribution = _get_distribution(entry)
+
+            if distribution:
+                name, version = distribution
+                packages.setdefault(name, version)
+
+    return packages
+
+
+class InstalledPackagesCache:
+    """Installed packages per environment, invalidated when site-packages content changes.
+
+    An entry is valid while site-packages directories keep the same mtime and the same set of
+    distributions metadata entries, so unchanged kernels are answered without reading metadata.
+    """
+
+    def __init__(self) -> None:
+        """Init."""
+        self._entries: typing.Dict[str, typing.Tuple[typing.Any, typing.Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _fingerprint(paths: typing.List[typing.Union[str, Path]]) -> typing.Tuple[typing.Any, ...]:
+        """Compute fingerprint of site-packages directories content."""
+        fingerprint = []
+
+        for path in paths:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                entries = frozenset(n for n in os.listdir(path) if n.endswith((".dist-info", ".egg-info")))
+            except OSError:
+                continue
+
+            fingerprint.append((str(path), mtime, entries))
+
+        return tuple(fingerprint)
+
+    def get_installed_packages(
+        self, key: str, paths: typing.Iterable[typing.Union[str, Path]]
+    ) -> typing.Dict[str, str]:
+        """Get installed packages for the environment identified by key, see `get_installed_packages`."""
+        paths_list = list(paths)
+        fingerprint = self._fingerprint(paths_list)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry and entry[0] == fingerprint:
+                self.hits += 1
+                _LOGGER.debug("Installed packages cache hit for %r", key)
+                return dict(entry[1])
+
+            self.misses += 1
+
+        _LOGGER.debug("Installed packages cache miss for %r", key)
+        packages = get_installed_packages(paths_list)
+
+        with self._lock:
+            self._entries[key] = (fingerprint, packages)
+
+        return dict(packages)
+
+    def invalidate(self, key: typing.Optional[str] = None) -> None:
+        """Invalidate entry for the given environment, or all entries."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        """Get cache counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+# Shared by all the handlers and commands running in the same process.
+packages_cache = InstalledPackagesCache()
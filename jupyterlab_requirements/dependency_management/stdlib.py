@@ -0,0 +1,68 @@
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Index of Python standard library modules."""
+
+import os
+import sys
+import logging
+import functools
+import sysconfig
+import typing
+
+_LOGGER = logging.getLogger("jupyterlab_requirements.stdlib")
+
+
+def _scan_stdlib_module_names() -> typing.Set[str]:
+    """Get top level modules of the standard library looking at its directories."""
+    module_names: typing.Set[str] = set()
+    stdlib_path = sysconfig.get_paths()["stdlib"]
+
+    for path in (stdlib_path, os.path.join(stdlib_path, "lib-dynload")):
+        try:
+            file_names = os.listdir(path)
+        except OSError:
+            continue
+
+        for file_name in file_names:
+            # Packages, modules (e.g. copy.py) and extension modules (e.g. _json.cpython-38-x86_64-linux-gnu.so).
+            module_name = file_name.split(".", maxsplit=1)[0]
+
+            if module_name.isidentifier():
+                module_names.add(module_name)
+
+    return module_names
+
+
+@functools.lru_cache(maxsize=None)
+def get_stdlib_module_names() -> typing.FrozenSet[str]:
+    """Get names of the standard library top level modules of the running interpreter, computed once per process."""
+    stdlib_module_names = getattr(sys, "stdlib_module_names", None)
+
+    if stdlib_module_names is None:
+        # sys.stdlib_module_names is available from Python 3.10.
+        _LOGGER.debug("Scanning standard library directories for module names")
+        stdlib_module_names = _scan_stdlib_module_names()
+
+    return frozenset(stdlib_module_names) | frozenset(sys.builtin_module_names)
+
+
+def filter_stdlib_modules(module_names: typing.Iterable[str]) -> typing.List[str]:
+    """Get module names that are not part of the standard library, keeping their order."""
+    stdlib_module_names = get_stdlib_module_names()
+
+    return [module_name for module_name in module_names if module_name not in stdlib_module_names]
@@ -17,12 +17,9 @@
 """Thoth API for jupyterlab requirements."""
 
 import json
-import os
 import logging
 from typing import Dict, Any
 
-from pathlib import Path
-
 from .base import DependencyManagementBaseHandler
 from .lib import lock_dependencies_with_thoth
 from .lib import update_runtime_environment_in_thoth_config
@@ -46,10 +43,9 @@ class ThothAdviseHandler(DependencyManagementBaseHandler):
 
         self.redirect_to_task(task_index)
 
-    async def lock_using_thoth(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Lock dependencies using Thoth service."""
-        initial_path = Path.cwd()
-
+    @staticmethod
+    def lock_using_thoth(input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Lock dependencies using Thoth service (blocking, run in the tasks executor)."""
         config: str = input_data["thoth_config"]
         kernel_name: str = input_data["kernel_name"]
         os_name: str = input_data["os_name"]
@@ -65,13 +61,6 @@ class ThothAdviseHandler(DependencyManagementBaseHandler):
 
         pipfile_string = Pipfile.from_dict(requirements).to_string()
 
-        home = Path.home()
-        store_path: Path = home.joinpath(".local/share/thoth/kernels")
-
-        env_path = Path(store_path).joinpath(kernel_name)
-        env_path.mkdir(parents=True, exist_ok=True)
-        os.chdir(env_path)
-
         # update runtime environment in thoth config
         thoth_config_updated = update_runtime_environment_in_thoth_config(
             kernel=kernel_name,
@@ -82,8 +71,6 @@ class ThothAdviseHandler(DependencyManagementBaseHandler):
             recommendation_type=recommendation_type,
         )
 
-        os.chdir(initial_path)
-
         _, advise = lock_dependencies_with_thoth(
             config=thoth_config_updated,
             kernel_name=kernel_name,
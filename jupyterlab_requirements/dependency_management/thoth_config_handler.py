@@ -17,7 +17,6 @@
 """Thoth Config API for jupyterlab requirements."""
 
 
-import os
 import json
 import logging
 
@@ -25,6 +24,7 @@ from typing import Dict, Any
 from pathlib import Path
 from jupyter_server.base.handlers import APIHandler
 from .lib import get_thoth_config
+from .lib import load_thoth_config
 from tornado import web
 
 from thamos.config import _Configuration
@@ -52,29 +52,19 @@ class ThothConfigHandler(APIHandler):
     @web.authenticated
     def put(self):  # type: ignore
         """Update Thoth config file."""
-        initial_path = Path.cwd()
         input_data = self.get_json_body()  # type: ignore
         new_runtime_environment: Dict[str, Any] = input_data["runtime_environment"]
         force: bool = input_data["force"]
         complete_path: str = input_data["complete_path"]
 
-        os.chdir(complete_path)
-
-        configuration = _Configuration()  # type: ignore
-
-        if not configuration.config_file_exists():
-            _LOGGER.info("Thoth config does not exist, creating it...")
-            try:
-                configuration.create_default_config()
-            except Exception as e:
-                raise Exception("Thoth config file could not be created! %r", e)
+        config_path = Path(complete_path).joinpath(_Configuration.CONFIG_NAME)
+        configuration = load_thoth_config(config_path=config_path)
 
         configuration.set_runtime_environment(
             runtime_environment=new_runtime_environment, force=force  # TODO: force should be user choice?
         )
-        configuration.save_config()
+        configuration.save_config(path=str(config_path))
 
         _LOGGER.info("Updated Thoth config: %r", configuration.content)
 
-        os.chdir(initial_path)
-        self.finish(json.dumps({"message": f"Successfully updated thoth config at {initial_path}!"}))  # type: ignore
+        self.finish(json.dumps({"message": f"Successfully updated thoth config at {complete_path}!"}))  # type: ignore
@@ -19,18 +19,15 @@
 
 import json
 import logging
-import ast
-import sys
 import textwrap
+import typing
 
-from pathlib import Path
 from jupyter_server.base.handlers import APIHandler
 from tornado import web
 
-import invectio
-import distutils
-
+from .imports_analysis import imports_analyzer
 from .lib import verify_gathered_libraries
+from .stdlib import filter_stdlib_modules
 
 _LOGGER = logging.getLogger("jupyterlab_requirements.thoth_invectio")
 
@@ -43,19 +40,15 @@ class ThothInvectioHandler(APIHandler):
         """Gather import libraries using invectio."""
         input_data = self.get_json_body()  # type: ignore
         notebook_content: str = input_data["notebook_content"]
+        # Code of each cell, when provided only cells changed since previous requests are analysed again.
+        notebook_cells: typing.Optional[typing.List[str]] = input_data.get("notebook_cells")
 
-        std_lib_path = Path(distutils.sysconfig.get_python_lib(standard_lib=True))
-        std_lib = {p.name.rstrip(".py") for p in std_lib_path.iterdir()}
-
-        tree = ast.parse(textwrap.dedent(f"""{notebook_content}""").replace(" \\", ""))
-
-        visitor = invectio.lib.InvectioLibraryUsageVisitor()
-        visitor.visit(tree)
+        if notebook_cells is None:
+            notebook_cells = [textwrap.dedent(f"""{notebook_content}""").replace(" \\", "")]
 
-        report = visitor.get_module_report()
+        report = imports_analyzer.get_module_report(notebook_cells)
 
-        libs = filter(lambda k: k not in std_lib | set(sys.builtin_module_names), report)
-        gathered_libraries = list(libs)
+        gathered_libraries = filter_stdlib_modules(report)
         _LOGGER.info("Thoth invectio library gathered: %r", gathered_libraries)
 
         # Use Thoth user-API endpoint to verify what is the packages using that import name
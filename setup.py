@@ -121,7 +121,7 @@ cmdclass["test"] = Test
 
 setup_args = dict(
     name=name,
-    entry_points={"console_scripts": ["horus=jupyterlab_requirements.cli:cli"]},
+    entry_points={"console_scripts": ["horus=jupyterlab_requirements.cli:main"]},
     version=version,
     url="https://github.com/thoth-station/jupyterlab-requirements",
     author="Francesco Murdaca",
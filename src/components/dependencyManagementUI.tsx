@@ -37,6 +37,8 @@ import {
   lock_requirements_with_pipenv
 } from '../thoth';
 
+import { ITaskEvent } from '../handler';
+
 import { INotification } from 'jupyterlab_toastify';
 
 import {
@@ -811,14 +813,39 @@ export class DependenciesManagementUI extends React.Component<IDependencyManagem
 
       var ui_state = this.state
 
+      // Installation progress is shown in a notification, as the component renders the installing state once.
+      const toastId = await INotification.inProgress("Installing requirements...")
+      let phase = "started"
+
+      const onProgress = (event: ITaskEvent) => {
+        if ( event.type === "phase" ) {
+          phase = `${event.phase} (${event.percentage}%)`
+        }
+
+        if ( event.type !== "done" ) {
+          INotification.update({
+            toastId: toastId,
+            message: `Installing requirements: ${phase}${event.line ? " - " + event.line : ""}`
+          })
+        }
+      }
+
       try {
           // Create new virtual environment and install dependencies using selected dependency manager (micropipenv by default)
           const install_message = await install_packages(
             this.state.kernel_name,
-            this.state.resolution_engine
+            this.state.resolution_engine,
+            onProgress
           );
           console.debug("Install message", install_message);
 
+          INotification.update({
+            toastId: toastId,
+            type: "success",
+            autoClose: 5000,
+            message: "Requirements installed!"
+          })
+
           _.set(ui_state, "status", "setting_kernel" )
           _.set(ui_state, "packages", {} )
           await this.setNewState(ui_state);
@@ -827,6 +854,12 @@ export class DependenciesManagementUI extends React.Component<IDependencyManagem
       } catch ( error ) {
 
         console.debug("Error installing requirements", error)
+        INotification.update({
+          toastId: toastId,
+          type: "error",
+          autoClose: 5000,
+          message: "Requirements could not be installed."
+        })
         _.set(ui_state, "status", "failed")
         _.set(ui_state, "error_msg", "Error install dependencies in the new virtual environment, please contact Thoth team.")
         await this.setNewState(ui_state);
@@ -22,7 +22,7 @@ import { PromiseDelegate } from '@lumino/coreutils';
 export const THOTH_JUPYTER_INTEGRATION_API_BASE_NAME = "jupyterlab_requirements";
 
 /**
- * Polling interval for accepted tasks [ms]
+ * Polling interval for accepted tasks [ms], used when events cannot be streamed
  */
 const POLLING_INTERVAL = 2000;
 
@@ -31,16 +31,36 @@ export interface ICancellablePromise<T> {
   cancel: () => void;
 }
 
+/**
+ * Progress event of a long running task (see GET /tasks/{taskId}/events)
+ */
+export interface ITaskEvent {
+  id: number;
+  type: 'phase' | 'log' | 'done';
+  time: number;
+  phase?: string;
+  percentage?: number;
+  line?: string;
+  error?: boolean;
+}
+
 /**
  * Call the API extension
  *
+ * Accepted tasks progress is streamed from the server and their result is requested when they finish,
+ * tasks are polled if events cannot be streamed.
+ *
  * @param {string} endPoint : API REST end point for the extension
  * @param requestInit Initial values for the request
+ * @param onProgress Called with progress events of the task (phase, output lines)
+ * @param streamEvents Stream progress of accepted tasks, otherwise they are polled
  * @returns {ICancellablePromise<Response>} : Cancellable response to the request
 */
 export const AsyncTaskHandler = function (
   endPoint: string = '',
-  requestInit: RequestInit = {}
+  requestInit: RequestInit = {},
+  onProgress?: (event: ITaskEvent) => void,
+  streamEvents: boolean = true
 ): ICancellablePromise<Response> {
   // Make request to Jupyter API
 
@@ -55,6 +75,7 @@ export const AsyncTaskHandler = function (
   );
 
   let answer: ICancellablePromise<Response>;
+  let events: EventSource | undefined;
   let cancelled = false;
 
   const promise = new PromiseDelegate<Response>();
@@ -83,22 +104,63 @@ export const AsyncTaskHandler = function (
       } else if ( response.status === 202 ) {
         const redirectUrl = response.headers.get('Location') || requestUrl;
 
-        setTimeout(
-          (endPoint: string) => {
-            if (cancelled) {
-              // If cancelled, tell the backend to delete the task.
-              console.debug(`Request cancelled ${endPoint}.`);
-            }
+        const requestResult = (delay: number, stream: boolean) => {
+          setTimeout(
+            (endPoint: string) => {
+              if (cancelled) {
+                // If cancelled, tell the backend to delete the task.
+                console.debug(`Request cancelled ${endPoint}.`);
+              }
+
+              answer = AsyncTaskHandler(endPoint, {}, onProgress, stream);
+              answer.promise
+                .then(response => promise.resolve(response))
+                .catch(reason => promise.reject(reason));
+            },
+            delay,
+            redirectUrl,
+            { method: requestUrl }
+          );
+        };
+
+        if ( !streamEvents || typeof EventSource === 'undefined' ) {
+          requestResult(POLLING_INTERVAL, false);
+          return;
+        }
+
+        // Stream task progress instead of polling, the result is requested once the task is done.
+        let eventsUrl = URLExt.join(settings.baseUrl, THOTH_JUPYTER_INTEGRATION_API_BASE_NAME, redirectUrl, 'events');
+        if ( settings.token ) {
+          eventsUrl += `?token=${encodeURIComponent(settings.token)}`;
+        }
 
-            answer = AsyncTaskHandler(endPoint, {});
-            answer.promise
-              .then(response => promise.resolve(response))
-              .catch(reason => promise.reject(reason));
-          },
-          POLLING_INTERVAL,
-          redirectUrl,
-          { method: requestUrl }
-        );
+        events = new EventSource(eventsUrl);
+        const taskEvents = events;
+
+        const handleEvent = (message: MessageEvent) => {
+          const event: ITaskEvent = JSON.parse(message.data);
+          if (onProgress) {
+            onProgress(event);
+          }
+
+          if ( event.type === 'done' ) {
+            taskEvents.close();
+            requestResult(0, false);
+          }
+        };
+
+        taskEvents.addEventListener('phase', handleEvent);
+        taskEvents.addEventListener('log', handleEvent);
+        taskEvents.addEventListener('done', handleEvent);
+        taskEvents.onerror = () => {
+          // Stream not available (e.g. proxy), fall back to polling.
+          if ( taskEvents.readyState !== EventSource.CLOSED ) {
+            taskEvents.close();
+            if ( !cancelled ) {
+              requestResult(POLLING_INTERVAL, false);
+            }
+          }
+        };
       } else {
         promise.resolve(response.json());
       }
@@ -111,6 +173,9 @@ export const AsyncTaskHandler = function (
       promise: promise.promise,
       cancel: (): void => {
         cancelled = true;
+        if (events) {
+          events.close();
+        }
         if (answer) {
           answer.cancel();
         }
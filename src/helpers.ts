@@ -28,7 +28,8 @@ import {
     set_resolution_engine,
     set_thoth_analysis_id,
     set_thoth_configuration,
-    take_notebook_content
+    take_notebook_content,
+    take_notebook_cells
 } from "./notebook";
 
 import { retrieve_config_file } from "./thoth"
@@ -231,9 +232,10 @@ export async function _handle_requirements(
 
         // Check if any package import is present (only when notebook without dependencies in metadata)
         const notebook_content = await take_notebook_content( panel )
+        const notebook_cells = await take_notebook_cells( panel )
 
         if (_.isEmpty( notebook_content ) == false ) {
-            var gathered_libraries: Array<string> = await gather_library_usage( notebook_content );
+            var gathered_libraries: Array<string> = await gather_library_usage( notebook_content, notebook_cells );
             console.debug("gathered_libraries", gathered_libraries)
 
         if ( _.size(gathered_libraries) > 0 ) {
@@ -9,16 +9,17 @@
  * @since  0.0.1
  */
 
-import { requestAPI, THOTH_JUPYTER_INTEGRATION_API_BASE_NAME, AsyncTaskHandler } from './handler';
+import { requestAPI, THOTH_JUPYTER_INTEGRATION_API_BASE_NAME, AsyncTaskHandler, ITaskEvent } from './handler';
 import * as utils from "./utils";
 import { INotification } from "jupyterlab_toastify";
 /**
- * Function: Install dependencies in the new kernel.
+ * Function: Install dependencies in the new kernel, reporting installation progress to onProgress.
  */
 
  export async function install_packages(
   kernel_name: string,
   resolution_engine: string,
+  onProgress?: (event: ITaskEvent) => void
 ): Promise<string|undefined> {
   try {
     // POST request
@@ -33,7 +34,8 @@ import { INotification } from "jupyterlab_toastify";
     var endpoint = "kernel/install"
     const { promise } = AsyncTaskHandler(
       endpoint,
-      request
+      request,
+      onProgress
     );
     const response = await promise;
     if (response) {
@@ -285,12 +287,15 @@ export async function store_dependencies (
 
 export async function gather_library_usage(
   notebook_content: string,
+  notebook_cells?: Array<string>,
   init: RequestInit = {},
 ): Promise<Array<string>> {
 
   // POST request
   const dataToSend = {
     notebook_content: utils.escape( notebook_content ),
+    // Cells are analysed separately so that only cells changed are analysed again.
+    notebook_cells: notebook_cells,
   };
 
   const endpoint: string = 'thoth/invectio'
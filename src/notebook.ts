@@ -329,12 +329,11 @@ export async function set_resolution_engine( notebook: NotebookPanel, dependency
 
 
  /**
- * Function: Take notebook content from cells.
+ * Function: Take code from notebook cells, magics and empty lines are removed.
  */
 
-export async function take_notebook_content( notebook: NotebookPanel ): Promise<string> {
+export async function take_notebook_cells( notebook: NotebookPanel ): Promise<Array<string>> {
 
-    const default_python_indent = 4
     let number_of_cells = notebook.model.cells.length
 
     var array = _.range(0, number_of_cells);
@@ -356,6 +355,20 @@ export async function take_notebook_content( notebook: NotebookPanel ): Promise<
         }
     });
 
+    return cells
+
+}
+
+/**
+ * Function: Take notebook content from cells.
+ */
+
+export async function take_notebook_content( notebook: NotebookPanel ): Promise<string> {
+
+    const default_python_indent = 4
+
+    const cells: Array<string> = await take_notebook_cells( notebook )
+
     let notebook_content: string = cells.join( "\n" )
 
     notebook_content = utils.indent( notebook_content, default_python_indent * 3 )
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for tasks run by the server."""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import subprocess
+import threading
+import typing
+
+from concurrent.futures import ProcessPoolExecutor
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.base import AsyncTasks
+
+_EXECUTOR_SCRIPT = (
+    "from jupyterlab_requirements.dependency_management.base import AsyncTasks; "
+    "tasks = AsyncTasks(); "
+    "print(tasks.executor_type, tasks.max_workers, type(tasks.executor).__name__)"
+)
+
+_running_lock = threading.Lock()
+_running = [0, 0]  # Tasks running now, most tasks running at the same time.
+
+
+def _get_executor(**environment: str) -> typing.List[str]:
+    """Get executor type, workers and pool of tasks created in a server started with the given environment."""
+    env = {k: v for k, v in os.environ.items() if not k.startswith("JUPYTERLAB_REQUIREMENTS_")}
+    env.update(environment)
+    process = subprocess.run([sys.executable, "-c", _EXECUTOR_SCRIPT], env=env, capture_output=True, check=True)
+    return process.stdout.decode().split()
+
+
+def _get_pid(task_inputs: typing.Dict[str, typing.Any]) -> int:
+    """Blocking task returning the process it runs in."""
+    return os.getpid()
+
+
+def _count_running(task_inputs: typing.Dict[str, typing.Any]) -> None:
+    """Blocking task counting tasks running at the same time."""
+    with _running_lock:
+        _running[0] += 1
+        _running[1] = max(_running)
+
+    time.sleep(0.1)
+
+    with _running_lock:
+        _running[0] -= 1
+
+
+def _fail(task_inputs: typing.Dict[str, typing.Any]) -> None:
+    """Blocking task failing."""
+    raise FileNotFoundError(f"No Pipfile.lock for kernel {task_inputs['kernel_name']!r}")
+
+
+async def _run_tasks(tasks: AsyncTasks, task: typing.Callable, count: int = 1):  # type: ignore
+    """Run blocking tasks, return their results."""
+    task_indexes = [tasks.create_task(task, {"kernel_name": "jl-test"}) for _ in range(count)]
+
+    while not all(tasks.tasks[task_index].done() for task_index in task_indexes):
+        await asyncio.sleep(0.01)
+
+    return [tasks.get_task(task_index) for task_index in task_indexes]
+
+
+class HorusAsyncTasksTestCase(HorusTestCase):
+    """A class for testing how the server runs blocking tasks."""
+
+    # Executor is selected by the environment of the server, there is always at least one worker.
+    assert _get_executor() == ["thread", "2", "ThreadPoolExecutor"]
+    process_executor = _get_executor(
+        JUPYTERLAB_REQUIREMENTS_EXECUTOR="process", JUPYTERLAB_REQUIREMENTS_MAX_WORKERS="0"
+    )
+    assert process_executor == ["process", "1", "ProcessPoolExecutor"]
+
+    try:
+        AsyncTasks(executor_type="greenlet")
+    except ValueError as e:
+        assert "'greenlet'" in str(e)
+    else:
+        assert False, "Unsupported executor type was accepted."
+
+    # Tasks run in a process pool are pickled, this module cannot be as it is still being imported.
+    process_tasks = AsyncTasks(executor_type="process")
+    assert asyncio.run(_run_tasks(process_tasks, json.dumps)) == ['{"kernel_name": "jl-test"}']
+    assert isinstance(process_tasks.executor, ProcessPoolExecutor)
+
+    assert asyncio.run(_run_tasks(AsyncTasks(executor_type="thread"), _get_pid)) == [os.getpid()]
+
+    # No more blocking tasks than workers run at the same time.
+    asyncio.run(_run_tasks(AsyncTasks(max_workers=2, executor_type="thread"), _count_running, count=4))
+    assert _running[1] == 2, f"{_running[1]} tasks were running at the same time with 2 workers."
+
+    # Errors are returned as the task result.
+    (result,) = asyncio.run(_run_tasks(AsyncTasks(executor_type="thread"), _fail))
+
+    assert result["type"] == "FileNotFoundError"
+    assert result["error"] == "No Pipfile.lock for kernel 'jl-test'"
+    assert result["task_inputs"] == {"kernel_name": "jl-test"}
+    assert result["traceback"]
+
+    (result,) = asyncio.run(_run_tasks(process_tasks, int))
+
+    assert result["type"] == "TypeError"
+    assert "dict" in result["error"]
+    assert result["traceback"]
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for batch mode."""
+
+import json
+import tempfile
+
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.cli import cli
+
+
+class HorusBatchCommandTestCase(HorusTestCase):
+    """A class for horus batch test cases."""
+
+    runner = CliRunner()
+
+    check_result = runner.invoke(cli, ["batch", "check", str(HorusTestCase.data_dir), "--workers", "2"])
+    report = json.loads(check_result.output)
+
+    assert check_result.exit_code == 1
+    assert report["total"] == len(list(HorusTestCase.data_dir.glob("*.ipynb")))
+    assert [n["path"] for n in report["notebooks"] if not n["error"]] == [str(HorusTestCase.locked_notebook_path)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        extract_result = runner.invoke(
+            cli,
+            [
+                "batch",
+                "extract",
+                str(HorusTestCase.locked_notebook_path),
+                "--store-files-path",
+                temp_dir,
+                "--output-format",
+                "ndjson",
+            ],
+        )
+        records = [json.loads(line) for line in extract_result.output.splitlines()]
+
+        assert extract_result.exit_code == 0
+        assert len(records) == 1
+
+        store_path = Path(records[0]["result"]["store_files_path"])
+
+        assert store_path.joinpath("Pipfile").exists()
+        assert store_path.joinpath("Pipfile.lock").exists()
+        assert store_path.joinpath(".thoth.yaml").exists()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        overlay_result = runner.invoke(
+            cli,
+            [
+                "batch",
+                "extract",
+                str(HorusTestCase.locked_notebook_path),
+                "--store-files-path",
+                temp_dir,
+                "--use-overlay",
+                "--output-format",
+                "ndjson",
+            ],
+        )
+        overlay_record = json.loads(overlay_result.output.splitlines()[0])
+
+        assert overlay_result.exit_code == 0
+
+        store_path = Path(overlay_record["result"]["store_files_path"])
+        overlay_path = store_path.joinpath("overlays", overlay_record["result"]["kernel_name"])
+
+        assert overlay_path.joinpath("Pipfile").exists()
+        assert overlay_path.joinpath("Pipfile.lock").exists()
+        assert not overlay_path.joinpath(".thoth.yaml").exists()
+        assert store_path.joinpath(".thoth.yaml").exists()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' benchmark of first imports with bytecode compiled after installation."""
+
+import shutil
+import subprocess
+import tempfile
+import time
+
+from pathlib import Path
+
+from virtualenv import cli_run
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.installer import compile_environment
+from jupyterlab_requirements.dependency_management.site_packages import get_site_packages_paths
+
+_MODULES = 200
+
+
+def _create_package(site_packages_path: Path) -> None:
+    """Create a package with many modules imported by the package, as large libraries do."""
+    package_path = site_packages_path.joinpath("horus_benchmark")
+    package_path.mkdir()
+
+    function = "def function_{index}(value):\n    return [value * i for i in range({index})]\n\n\n"
+    for module in range(_MODULES):
+        package_path.joinpath(f"module_{module}.py").write_text("".join(function.format(index=i) for i in range(50)))
+
+    package_path.joinpath("__init__.py").write_text(
+        "".join(f"from . import module_{module}\n" for module in range(_MODULES))
+    )
+
+
+def _remove_bytecode(site_packages_path: Path) -> None:
+    """Remove bytecode of the package."""
+    shutil.rmtree(site_packages_path.joinpath("horus_benchmark", "__pycache__"), ignore_errors=True)
+
+
+def _time_first_import(env_path: Path) -> float:
+    """Time first import of the package in a new kernel interpreter."""
+    start = time.perf_counter()
+    subprocess.run([str(env_path.joinpath("bin", "python")), "-c", "import horus_benchmark"], check=True)
+    return time.perf_counter() - start
+
+
+class HorusBytecodeBenchmarkTestCase(HorusTestCase):
+    """A class for comparing first import latency with and without bytecode compiled after installation."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        env_path = Path(temp_dir).joinpath("kernel")
+        cli_run([str(env_path), "--no-pip", "--no-setuptools"])
+
+        site_packages_path = get_site_packages_paths(env_path)[0]
+        _create_package(site_packages_path)
+
+        # Modules are compiled by the kernel interpreter on first import.
+        _remove_bytecode(site_packages_path)
+        import_time = _time_first_import(env_path)
+
+        _remove_bytecode(site_packages_path)
+        compile_time = compile_environment(env_path)
+        assert len(list(site_packages_path.joinpath("horus_benchmark", "__pycache__").glob("*.pyc"))) == _MODULES + 1
+
+        compiled_import_time = _time_first_import(env_path)
+
+    assert compiled_import_time < import_time, (
+        f"first import: {import_time * 1000:.1f} ms, after compilation: {compiled_import_time * 1000:.1f} ms "
+        f"(compilation: {compile_time * 1000:.1f} ms)"
+    )
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' benchmark of CLI import time."""
+
+import subprocess
+import sys
+
+from tests.base_test import HorusTestCase
+
+# Maximum time spent importing horus CLI [ms], before any subcommand runs.
+_IMPORT_TIME_BUDGET = 500
+
+# Modules needed only by the server extension or by some subcommands, imported when needed.
+_DEFERRED_MODULES = ("jupyter_server", "tornado", "thamos", "thoth", "invectio", "virtualenv", "rich", "yaml")
+
+
+def _get_import_times(module: str) -> dict:
+    """Get cumulative import time [us] of each module imported importing the given module."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, check=True
+    )
+
+    import_times = {}
+    for line in process.stderr.decode("utf-8").splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, _, cumulative, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        import_times[name] = int(cumulative)
+
+    return import_times
+
+
+class HorusImportTimeBenchmarkTestCase(HorusTestCase):
+    """A class for checking horus CLI starts without importing server and subcommands dependencies."""
+
+    import_times = _get_import_times("jupyterlab_requirements.cli")
+    cli_import_time = import_times["jupyterlab_requirements.cli"] / 1000
+
+    assert not [m for m in import_times if m.split(".")[0] in _DEFERRED_MODULES]
+    assert cli_import_time < _IMPORT_TIME_BUDGET, f"horus CLI import time: {cli_import_time:.1f} ms"
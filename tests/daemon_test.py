@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for the daemon."""
+
+import os
+import json
+import logging
+import tempfile
+import threading
+
+from pathlib import Path
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements import __version__
+from jupyterlab_requirements.daemon import HorusDaemon
+from jupyterlab_requirements.daemon import _send_request
+from jupyterlab_requirements.daemon import is_running
+from jupyterlab_requirements.daemon import run_in_daemon
+
+
+class HorusDaemonTestCase(HorusTestCase):
+    """A class for horus daemon test cases."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        socket_path = Path(temp_dir).joinpath("horus.sock")
+
+        assert run_in_daemon(["check", str(HorusTestCase.locked_notebook_path)], socket_path=socket_path) is None
+
+        daemon = HorusDaemon(socket_path=socket_path)
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            assert is_running(socket_path)
+
+            response = run_in_daemon(
+                ["check", str(HorusTestCase.locked_notebook_path), "--output-format", "json"], socket_path=socket_path
+            )
+
+            assert response is not None
+            assert response["exit_code"] == 0
+            assert all(item["type"] != "ERROR" for item in json.loads(response["stdout"]))
+
+            response = run_in_daemon(["check", "missing.ipynb"], socket_path=socket_path)
+
+            assert response is not None
+            assert response["exit_code"] == 1
+            # Log records are part of the command output, not of the daemon one.
+            assert "Command ['check', 'missing.ipynb'] failed" in response["stderr"]
+
+            # Commands failing through ctx.exit report their exit code.
+            response = run_in_daemon(["batch", "check", str(HorusTestCase.data_dir)], socket_path=socket_path)
+
+            assert response is not None
+            assert response["exit_code"] == 1
+
+            # Client environment is set while the command runs and restored afterwards.
+            check_args = ["check", str(HorusTestCase.locked_notebook_path)]
+            request = {"version": __version__, "args": check_args, "cwd": os.getcwd()}
+
+            response = _send_request(dict(request, environment={}), socket_path=socket_path)
+            assert "✔️" in response["stdout"]
+
+            response = _send_request(
+                dict(request, environment={"JUPYTERLAB_REQUIREMENTS_NO_EMOJI": "1"}), socket_path=socket_path
+            )
+            assert "✔️" not in response["stdout"]
+            assert "JUPYTERLAB_REQUIREMENTS_NO_EMOJI" not in os.environ
+
+            # Variables read on import cannot be changed, the client runs the command.
+            response = _send_request(
+                dict(request, environment={"JUPYTERLAB_REQUIREMENTS_POOL_SIZE": "4"}), socket_path=socket_path
+            )
+            assert "JUPYTERLAB_REQUIREMENTS_POOL_SIZE" in response["error"]
+
+            # Verbose mode does not leak into the following commands.
+            cli_log_level = logging.getLogger("thoth.jupyterlab_requirements.cli").level
+            response = run_in_daemon(["-v"] + check_args, socket_path=socket_path)
+
+            assert response is not None
+            assert response["exit_code"] == 0
+            assert logging.getLogger("thoth.jupyterlab_requirements.cli").level == cli_log_level
+
+            # Commands installing packages are not sent to the daemon.
+            set_kernel_args = ["set-kernel", str(HorusTestCase.locked_notebook_path)]
+            assert run_in_daemon(set_kernel_args, socket_path=socket_path) is None
+        finally:
+            daemon.shutdown()
+            daemon.server_close()
+
+        assert not is_running(socket_path)
+        assert not socket_path.exists()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for kernel environments reuse."""
+
+import platform
+import tempfile
+
+from pathlib import Path
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.environments import clear_environment_state
+from jupyterlab_requirements.dependency_management.environments import get_environment_changes
+from jupyterlab_requirements.dependency_management.environments import save_environment_state
+from jupyterlab_requirements.dependency_management.lib import _uninstall_packages
+
+
+class HorusEnvironmentStateTestCase(HorusTestCase):
+    """A class for horus kernel environments reuse test cases."""
+
+    pipfile_lock = {
+        "_meta": {"hash": {"sha256": "1234"}},
+        "default": {
+            "numpy": {"hashes": ["sha256:aaaa"], "version": "==1.21.0"},
+            "Pandas": {"hashes": ["sha256:bbbb"], "version": "==1.3.0"},
+        },
+        "develop": {"pytest": {"hashes": ["sha256:cccc"], "version": "==6.2.4"}},
+    }
+
+    updated_pipfile_lock = {
+        "_meta": {"hash": {"sha256": "5678"}},
+        "default": {
+            "numpy": {"hashes": ["sha256:dddd"], "version": "==1.21.1"},
+            "pandas": {"hashes": ["sha256:bbbb"], "version": "==1.3.0"},
+            "scipy": {"hashes": ["sha256:eeee"], "version": "==1.7.0"},
+        },
+        "develop": {},
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        env_path = Path(temp_dir)
+
+        # Environments never installed are created from scratch.
+        assert get_environment_changes(env_path, pipfile_lock) is None
+
+        env_path.joinpath("pyvenv.cfg").write_text(f"home = /usr/bin\nversion = {platform.python_version()}\n")
+        save_environment_state(env_path, pipfile_lock)
+
+        assert get_environment_changes(env_path, pipfile_lock) == {"install": [], "remove": []}
+        assert get_environment_changes(env_path, updated_pipfile_lock) == {
+            "install": ["numpy", "scipy"],
+            "remove": ["pytest"],
+        }
+
+        # Environments created with another Python version are created again.
+        env_path.joinpath("pyvenv.cfg").write_text("home = /usr/bin\nversion = 2.7.18\n")
+
+        assert get_environment_changes(env_path, pipfile_lock) is None
+
+        env_path.joinpath("pyvenv.cfg").write_text(f"home = /usr/bin\nversion = {platform.python_version()}\n")
+        clear_environment_state(env_path)
+
+        assert get_environment_changes(env_path, pipfile_lock) is None
+
+        # Failed removals are reported, so that the environment state is not saved.
+        python_path = env_path.joinpath("bin", "python")
+        python_path.parent.mkdir()
+        python_path.write_text("#!/bin/sh\nexit 1\n")
+        python_path.chmod(0o755)
+
+        assert _uninstall_packages(env_path, ["pytest"]) is False
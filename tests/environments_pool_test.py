@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for the pool of kernel environments."""
+
+import subprocess
+import tempfile
+import time
+
+from pathlib import Path
+
+from virtualenv import cli_run
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.environments import _BASE_MARKER
+from jupyterlab_requirements.dependency_management.environments import EnvironmentsPool
+
+
+class HorusEnvironmentsPoolTestCase(HorusTestCase):
+    """A class for horus pool of kernel environments test cases."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Base environment prepared already, without tooling installed.
+        base_path = Path(temp_dir).joinpath("base")
+        cli_run([str(base_path)])
+        base_path.joinpath(_BASE_MARKER).write_text("{}")
+
+        pool = EnvironmentsPool(
+            pool_path=Path(temp_dir).joinpath("pool"), size=2, refill_interval=0.01, base_path=base_path
+        )
+        pool.start()
+
+        timeout = time.monotonic() + 30
+        while len(pool.get_ready()) < 2 and time.monotonic() < timeout:
+            time.sleep(0.05)
+
+        assert len(pool.get_ready()) == 2
+
+        env_path = Path(temp_dir).joinpath("kernels", "my-kernel")
+        env_path.mkdir(parents=True)
+        env_path.joinpath("Pipfile").write_text("[packages]\n")
+
+        assert pool.claim(env_path)
+
+        pool.stop()
+
+        assert env_path.joinpath("Pipfile").read_text() == "[packages]\n"
+        assert str(env_path) in env_path.joinpath("bin", "activate").read_text()
+
+        prefix = subprocess.run(
+            [str(env_path.joinpath("bin", "python")), "-c", "import sys; print(sys.prefix)"],
+            check=True,
+            capture_output=True,
+        )
+
+        assert prefix.stdout.decode("utf-8").strip() == str(env_path)
+
+        # Each environment is claimed once.
+        other_path = Path(temp_dir).joinpath("kernels", "other-kernel")
+        for name in pool.get_ready():
+            assert pool.claim(other_path.with_name(f"other-{name}"))
+
+        assert not pool.claim(other_path)
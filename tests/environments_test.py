@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for kernel environments cloning."""
+
+import subprocess
+import tempfile
+
+from pathlib import Path
+
+from virtualenv import cli_run
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.environments import clone_environment
+
+
+class HorusEnvironmentsTestCase(HorusTestCase):
+    """A class for horus kernel environments test cases."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_path = Path(temp_dir).joinpath("base")
+        env_path = Path(temp_dir).joinpath("kernels", "my-kernel")
+
+        cli_run([str(base_path)])
+
+        # Files stored for the kernel before the environment is created are kept.
+        env_path.mkdir(parents=True)
+        env_path.joinpath("Pipfile").write_text("[packages]\n")
+
+        counts = clone_environment(base_path, env_path)
+
+        assert counts["rewritten"] > 0
+        assert counts["reflink"] + counts["hardlink"] + counts["copy"] > 0
+        assert env_path.joinpath("Pipfile").read_text() == "[packages]\n"
+
+        # Scripts refer to the new environment.
+        assert str(base_path) not in env_path.joinpath("bin", "activate").read_text()
+        assert env_path.joinpath("bin", "pip").read_text().splitlines()[0] == f"#!{env_path}/bin/python"
+
+        prefix = subprocess.run(
+            [str(env_path.joinpath("bin", "python")), "-c", "import sys, pip; print(sys.prefix, pip.__file__)"],
+            check=True,
+            capture_output=True,
+        )
+        env_prefix, pip_path = prefix.stdout.decode("utf-8").split()
+
+        assert env_prefix == str(env_path)
+        assert pip_path.startswith(str(env_path))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' tests of the offline import names index."""
+
+import tempfile
+import zipfile
+
+from pathlib import Path
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.import_index import ImportNamesIndex
+
+
+def _create_dist_info(site_packages_path: Path, name: str, version: str, files: dict) -> None:
+    """Create distribution metadata as installed by pip."""
+    dist_info_path = site_packages_path.joinpath(f"{name.replace('-', '_')}-{version}.dist-info")
+    dist_info_path.mkdir(parents=True)
+    dist_info_path.joinpath("METADATA").write_text(f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n\n")
+
+    for file_name, content in files.items():
+        dist_info_path.joinpath(file_name).write_text(content)
+
+
+class HorusImportNamesIndexTestCase(HorusTestCase):
+    """A class for checking import names are mapped to distributions available locally."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        kernels_path = Path(temp_dir).joinpath("kernels")
+        wheels_path = Path(temp_dir).joinpath("wheels")
+        site_packages_path = kernels_path.joinpath("my-kernel/lib/python3.8/site-packages")
+
+        _create_dist_info(site_packages_path, "scikit-learn", "1.0.1", {"top_level.txt": "sklearn\n"})
+        _create_dist_info(
+            site_packages_path,
+            "opencv-python",
+            "4.5.4.60",
+            {"RECORD": "cv2/__init__.py,sha256=abc,100\nopencv_python-4.5.4.60.dist-info/METADATA,,\n"},
+        )
+
+        wheels_path.mkdir()
+        with zipfile.ZipFile(wheels_path.joinpath("PyYAML-6.0-cp38-cp38-linux_x86_64.whl"), "w") as wheel:
+            wheel.writestr("yaml/__init__.py", "")
+            wheel.writestr("_yaml/__init__.py", "")
+            wheel.writestr("PyYAML-6.0.dist-info/top_level.txt", "_yaml\nyaml\n")
+
+        index_path = Path(temp_dir).joinpath("import_names_index.json")
+        index = ImportNamesIndex(index_path=index_path, kernels_path=kernels_path, wheels_paths=[wheels_path])
+
+        assert index.get("sklearn") == ["scikit-learn"]
+        assert index.get("cv2") == ["opencv-python"]
+        assert index.get("yaml") == ["PyYAML"]
+        assert index.get("numpy") == []
+        assert index_path.exists()
+
+        # Index stored on disk is reused by other processes.
+        assert ImportNamesIndex(index_path=index_path, kernels_path=kernels_path, wheels_paths=[]).get("cv2") == [
+            "opencv-python"
+        ]
+
+        # Sources changed are read again.
+        _create_dist_info(site_packages_path, "Pillow", "8.4.0", {"top_level.txt": "PIL\n"})
+        index.refresh(force=True)
+
+        assert index.get("PIL") == ["Pillow"]
+
+        # Lookups do not wait for a refresh running in another thread, the previous index is used meanwhile.
+        index._timestamp = 0.0
+        with index._refresh_lock:
+            assert index.get("PIL") == ["Pillow"]
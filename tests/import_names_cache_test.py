@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for the import names cache."""
+
+import json
+import time
+import tempfile
+import typing
+
+from pathlib import Path
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management import lib
+from jupyterlab_requirements.dependency_management.cache import ImportNamesCache
+
+_PACKAGES = {
+    "yaml": [{"package_name": "PyYAML", "index_url": "https://pypi.org/simple"}],
+    "sklearn": [{"package_name": "scikit-learn", "index_url": "https://pypi.org/simple"}],
+    "numpy": [{"package_name": "numpy", "index_url": "https://pypi.org/simple"}],
+}
+
+
+def _get_packages_from_import_name(import_name: str) -> typing.List[typing.Dict[str, str]]:
+    """Stub Thoth user-API, names first in the notebook are the slowest to answer."""
+    if import_name not in _PACKAGES:
+        raise ValueError(f"No package provides {import_name!r}")
+
+    time.sleep(0.05 * (len(_PACKAGES) - list(_PACKAGES).index(import_name)))
+    return _PACKAGES[import_name]
+
+
+class HorusImportNamesCacheTestCase(HorusTestCase):
+    """A class for import names cache test cases."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        import_names_cache = ImportNamesCache(cache_path=Path(temp_dir), ttl=60)
+
+        assert import_names_cache.get("yaml") is None
+
+        import_names_cache.set("yaml", _PACKAGES["yaml"])
+        assert import_names_cache.get("yaml") == _PACKAGES["yaml"]
+
+        # Entries are stored on disk for other processes.
+        assert ImportNamesCache(cache_path=Path(temp_dir), ttl=60).get("yaml") == _PACKAGES["yaml"]
+
+        # Expired entries are looked up again.
+        Path(temp_dir).joinpath("sklearn.json").write_text(
+            json.dumps({"timestamp": time.time() - 120, "packages": _PACKAGES["sklearn"]})
+        )
+        assert import_names_cache.get("sklearn") is None
+
+        # Cached packages are used without reaching Thoth user-API.
+        shared_cache, lib.import_names_cache = lib.import_names_cache, import_names_cache
+        try:
+            assert lib._get_packages_from_import_name("yaml") == _PACKAGES["yaml"]
+        finally:
+            lib.import_names_cache = shared_cache
+
+    # Import names are looked up concurrently, results keep the order of the notebook.
+    get_packages, lib._get_packages_from_import_name = (
+        lib._get_packages_from_import_name,
+        _get_packages_from_import_name,
+    )
+    try:
+        start = time.monotonic()
+        verified_libraries = lib.verify_gathered_libraries(["yaml", "sklearn", "unknown", "yaml", "numpy"])
+        elapsed = time.monotonic() - start
+    finally:
+        lib._get_packages_from_import_name = get_packages
+
+    assert elapsed < 0.3, f"Import names were looked up in {elapsed:.2f}s, 0.30s one after the other."
+
+    assert verified_libraries == [
+        *_PACKAGES["yaml"],
+        *_PACKAGES["sklearn"],
+        {"package_name": "unknown", "index_url": "https://pypi.org/simple"},
+        *_PACKAGES["numpy"],
+    ]
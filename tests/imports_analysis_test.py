@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' tests of incremental libraries usage analysis."""
+
+import ast
+
+import invectio
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.imports_analysis import ImportsAnalyzer
+
+_CELLS = [
+    "import numpy as np\nimport pandas\nfrom sklearn.linear_model import LinearRegression as LR",
+    "x = np.array([1, 2])\ndf = pandas.DataFrame()",
+    "model = LR()\nimport os.path\nos.path.join('a', 'b')\nprint(len(x))",
+    "from matplotlib import pyplot as plt\nplt.plot(x)\nnp.mean(x).sum()",
+    "def norm(a):\n    return np.linalg.norm(a)\n",
+]
+
+
+def _get_module_report(cells: list) -> dict:
+    """Get libraries usage report visiting the whole notebook, as done previously."""
+    visitor = invectio.lib.InvectioLibraryUsageVisitor()
+    visitor.visit(ast.parse("\n".join(cells)))
+
+    return visitor.get_module_report()
+
+
+class HorusImportsAnalysisTestCase(HorusTestCase):
+    """A class for checking incremental analysis gives the same report of the whole notebook analysis."""
+
+    analyzer = ImportsAnalyzer()
+
+    assert analyzer.get_module_report(_CELLS) == _get_module_report(_CELLS)
+    assert (analyzer.hits, analyzer.misses) == (0, len(_CELLS))
+
+    # Only the cell changed is analysed again.
+    changed_cells = _CELLS[:2] + ["import scipy\nscipy.stats.norm(x)"] + _CELLS[3:]
+
+    assert analyzer.get_module_report(changed_cells) == _get_module_report(changed_cells)
+    assert (analyzer.hits, analyzer.misses) == (len(_CELLS) - 1, len(_CELLS) + 1)
+
+    # Cells that cannot be parsed yet (e.g. while typing) do not prevent analysis of other cells.
+    assert analyzer.get_module_report(["import pandas as", "import scipy\nscipy.stats"]) == {"scipy": ["scipy.stats"]}
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for the installed packages cache."""
+
+import shutil
+import tempfile
+
+from pathlib import Path
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.site_packages import InstalledPackagesCache
+
+
+def _add_distribution(site_packages_path: Path, name: str, version: str) -> Path:
+    """Add distribution metadata to site-packages, as pip does."""
+    dist_info_path = site_packages_path.joinpath(f"{name}-{version}.dist-info")
+    dist_info_path.mkdir()
+    dist_info_path.joinpath("METADATA").write_text(f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n")
+    return dist_info_path
+
+
+class HorusInstalledPackagesCacheTestCase(HorusTestCase):
+    """A class for installed packages cache test cases."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        site_packages_path = Path(temp_dir)
+        cache = InstalledPackagesCache()
+
+        _add_distribution(site_packages_path, "micropipenv", "1.4.0")
+
+        assert cache.get_installed_packages(key="kernel", paths=[site_packages_path]) == {"micropipenv": "1.4.0"}
+        assert (cache.hits, cache.misses) == (0, 1)
+
+        # Unchanged site-packages is answered from the cache.
+        assert cache.get_installed_packages(key="kernel", paths=[site_packages_path]) == {"micropipenv": "1.4.0"}
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # Distributions installed or removed change the fingerprint.
+        dist_info_path = _add_distribution(site_packages_path, "ipykernel", "6.0.0")
+
+        packages = cache.get_installed_packages(key="kernel", paths=[site_packages_path])
+        assert packages == {"micropipenv": "1.4.0", "ipykernel": "6.0.0"}
+        assert (cache.hits, cache.misses) == (1, 2)
+
+        shutil.rmtree(dist_info_path)
+
+        assert cache.get_installed_packages(key="kernel", paths=[site_packages_path]) == {"micropipenv": "1.4.0"}
+        assert (cache.hits, cache.misses) == (1, 3)
+
+        # Invalidated entries are read again.
+        cache.invalidate("kernel")
+
+        assert cache.get_installed_packages(key="kernel", paths=[site_packages_path]) == {"micropipenv": "1.4.0"}
+        assert (cache.hits, cache.misses) == (1, 4)
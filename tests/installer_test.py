@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for the parallel installer, using a local index."""
+
+import base64
+import hashlib
+import subprocess
+import tempfile
+import threading
+import zipfile
+
+from functools import partial
+from http.server import SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+from virtualenv import cli_run
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.installer import install_locked_packages
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """Serve the local index without logging requests."""
+
+    def log_message(self, format: str, *args) -> None:  # type: ignore
+        """Do not log."""
+
+
+def _build_wheel(packages_path: Path, name: str, version: str) -> str:
+    """Build a pure Python wheel with a single module, return its sha256."""
+    files = {
+        f"{name}/__init__.py": f"VERSION = {version!r}\n",
+        f"{name}-{version}.dist-info/METADATA": f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n",
+        f"{name}-{version}.dist-info/WHEEL": "Wheel-Version: 1.0\nRoot-Is-Purelib: true\nTag: py3-none-any\n",
+    }
+
+    record = []
+    for path, content in files.items():
+        digest = base64.urlsafe_b64encode(hashlib.sha256(content.encode()).digest()).rstrip(b"=").decode()
+        record.append(f"{path},sha256={digest},{len(content)}")
+    files[f"{name}-{version}.dist-info/RECORD"] = "\n".join(record + [f"{name}-{version}.dist-info/RECORD,,"]) + "\n"
+
+    wheel_path = packages_path.joinpath(f"{name}-{version}-py3-none-any.whl")
+    with zipfile.ZipFile(wheel_path, "w") as wheel:
+        for path, content in files.items():
+            wheel.writestr(path, content)
+
+    return hashlib.sha256(wheel_path.read_bytes()).hexdigest()
+
+
+def _add_project(index_path: Path, name: str, links: str) -> None:
+    """Add project page to the PEP 503 simple index."""
+    index_path.joinpath("simple", name).mkdir(parents=True)
+    index_path.joinpath("simple", name, "index.html").write_text(f"<html><body>{links}</body></html>")
+
+
+class HorusInstallerTestCase(HorusTestCase):
+    """A class for horus parallel installer test cases."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index_path = Path(temp_dir).joinpath("index")
+        packages_path = index_path.joinpath("packages")
+        packages_path.mkdir(parents=True)
+
+        foo_hash = _build_wheel(packages_path, "foo", "1.0")
+        bar_hash = _build_wheel(packages_path, "bar", "2.0")
+
+        _add_project(index_path, "foo", f'<a href="../../packages/foo-1.0-py3-none-any.whl#sha256={foo_hash}">w</a>')
+        _add_project(index_path, "bar", f'<a href="../../packages/bar-2.0-py3-none-any.whl#sha256={bar_hash}">w</a>')
+        # Only a source distribution is available, the package is left to micropipenv.
+        _add_project(index_path, "baz", '<a href="../../packages/baz-1.0.tar.gz#sha256=0000">s</a>')
+        # Artifact on the index does not match the hash in Pipfile.lock.
+        _add_project(index_path, "qux", f'<a href="../../packages/bar-2.0-py3-none-any.whl#sha256={"1" * 64}">w</a>')
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_QuietHandler, directory=str(index_path)))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        pipfile_lock = {
+            "_meta": {"sources": [{"name": "local", "url": f"http://127.0.0.1:{server.server_port}/simple"}]},
+            "default": {
+                "foo": {"hashes": [f"sha256:{foo_hash}"], "version": "==1.0", "index": "local"},
+                "bar": {"hashes": [f"sha256:{bar_hash}"], "version": "==2.0"},
+                "baz": {"hashes": ["sha256:0000"], "version": "==1.0"},
+                "qux": {"hashes": [f"sha256:{'1' * 64}"], "version": "==2.0"},
+            },
+            "develop": {},
+        }
+
+        env_path = Path(temp_dir).joinpath("env")
+        artifacts_path = Path(temp_dir).joinpath("artifacts")
+        cli_run([str(env_path)])
+
+        try:
+            installed = install_locked_packages(pipfile_lock, env_path, artifacts_path=artifacts_path)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert installed == ["bar", "foo"]
+        assert not list(artifacts_path.glob(f"{'1' * 64}/*.whl"))
+
+        imported = subprocess.run(
+            [str(env_path.joinpath("bin", "python")), "-c", "import foo, bar; print(foo.VERSION, bar.VERSION)"],
+            capture_output=True,
+            check=True,
+        )
+
+        assert imported.stdout.decode("utf-8").split() == ["1.0", "2.0"]
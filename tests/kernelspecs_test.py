@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for kernelspecs installation."""
+
+import os
+import json
+import tempfile
+
+from pathlib import Path
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.kernelspecs import KernelSpecsIndex
+
+
+class HorusKernelSpecsTestCase(HorusTestCase):
+    """A class for horus kernelspecs installation test cases."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        jupyter_data_dir = os.environ.get("JUPYTER_DATA_DIR")
+        os.environ["JUPYTER_DATA_DIR"] = os.path.join(temp_dir, "jupyter")
+
+        try:
+            env_path = Path(temp_dir).joinpath("kernels", "my-kernel")
+            site_packages_path = env_path.joinpath("lib", "python3.8", "site-packages")
+            site_packages_path.joinpath("ipykernel", "resources").mkdir(parents=True)
+            site_packages_path.joinpath("ipykernel", "resources", "logo-32x32.png").write_bytes(b"png")
+            site_packages_path.joinpath("ipykernel-6.0.0.dist-info").mkdir()
+            site_packages_path.joinpath("ipykernel-6.0.0.dist-info", "METADATA").write_text(
+                "Metadata-Version: 2.1\nName: ipykernel\nVersion: 6.0.0\n"
+            )
+
+            kernelspecs_index = KernelSpecsIndex(ttl=60)
+            resource_dir = Path(kernelspecs_index.install_kernel_spec(kernel_name="my-kernel", env_path=env_path))
+
+            kernel_spec = json.loads(resource_dir.joinpath("kernel.json").read_text())
+
+            assert resource_dir.parent == Path(temp_dir, "jupyter", "kernels")
+            assert kernel_spec["argv"][:3] == [str(env_path.joinpath("bin", "python")), "-m", "ipykernel_launcher"]
+            assert kernel_spec["display_name"] == "Python (my-kernel)"
+            assert kernel_spec["metadata"] == {"debugger": True}
+            assert resource_dir.joinpath("logo-32x32.png").exists()
+            assert "my-kernel" in kernelspecs_index.find_kernel_specs()
+
+            assert kernelspecs_index.remove_kernel_spec("my-kernel")
+            assert "my-kernel" not in kernelspecs_index.find_kernel_specs()
+        finally:
+            if jupyter_data_dir is None:
+                del os.environ["JUPYTER_DATA_DIR"]
+            else:
+                os.environ["JUPYTER_DATA_DIR"] = jupyter_data_dir
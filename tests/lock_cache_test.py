@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for the lock cache."""
+
+import json
+import tempfile
+
+from pathlib import Path
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.cache import LockCache
+from jupyterlab_requirements.dependency_management.lib import compute_thoth_lock_key
+
+
+def _thoth_config(kernel_name: str, recommendation_type: str = "latest") -> str:
+    """Create Thoth config with a single runtime environment, as sent to Thoth adviser."""
+    runtime_environment = {
+        "name": kernel_name,
+        "operating_system": {"name": "ubi", "version": "8"},
+        "python_version": "3.8",
+        "recommendation_type": recommendation_type,
+    }
+
+    return json.dumps({"host": "khemenu.thoth-station.ninja", "runtime_environments": [runtime_environment]})
+
+
+class HorusLockCacheTestCase(HorusTestCase):
+    """A class for lock cache test cases."""
+
+    key = compute_thoth_lock_key("pipfile-hash", _thoth_config("kernel-a"), labels={"team": "a"})
+
+    # Kernel name is not a resolution input.
+    assert key == compute_thoth_lock_key("pipfile-hash", _thoth_config("kernel-b"), labels={"team": "a"})
+
+    other_keys = [
+        compute_thoth_lock_key("pipfile-hash", _thoth_config("kernel-a"), labels={"team": "b"}),
+        compute_thoth_lock_key("pipfile-hash", _thoth_config("kernel-a")),
+        compute_thoth_lock_key("pipfile-hash", _thoth_config("kernel-a", "security"), labels={"team": "a"}),
+        compute_thoth_lock_key("pipfile-hash", _thoth_config("kernel-a"), labels={"team": "a"}, notebook_content="x"),
+    ]
+    assert len({key, *other_keys}) == len(other_keys) + 1
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lock_cache = LockCache(cache_path=Path(temp_dir))
+        lock_cache.set(key, {"requirements_lock": {"_meta": {}}, "error": False})
+
+        assert lock_cache.get(key) == {"requirements_lock": {"_meta": {}}, "error": False}
+
+        # Request with different labels is locked again.
+        assert lock_cache.get(other_keys[0]) is None
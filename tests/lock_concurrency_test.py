@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for concurrent locks in the same process."""
+
+import json
+import shutil
+import tempfile
+import typing
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.lib import get_notebook_content
+from jupyterlab_requirements.dependency_management.lib import get_thoth_config
+from jupyterlab_requirements.dependency_management.lib import lock_dependencies_with_thoth
+from jupyterlab_requirements.dependency_management.lib import update_runtime_environment_in_thoth_config
+
+
+def _lock_kernel(
+    kernel_name: str, pipfile_string: str, kernels_path: Path
+) -> typing.Tuple[int, typing.Dict[str, typing.Any]]:
+    """Lock dependencies for one kernel, as a server task does."""
+    config = get_thoth_config(kernel_name=kernel_name, kernels_path=kernels_path)
+    config_updated = update_runtime_environment_in_thoth_config(
+        kernel=kernel_name,
+        config=json.dumps(config.content),
+        os_name="ubi",
+        os_version="8",
+        python_version="3.8",
+    )
+
+    return lock_dependencies_with_thoth(
+        kernel_name=kernel_name,
+        pipfile_string=pipfile_string,
+        config=config_updated,
+        timeout=180,
+        force=False,
+        debug=False,
+        notebook_content="",
+        kernels_path=kernels_path,
+    )
+
+
+class HorusConcurrentLockTestCase(HorusTestCase):
+    """A class for locking many kernels at once in the same process."""
+
+    number_of_kernels = 8
+    kernel_names = [f"test-jl-concurrent-{index}" for index in range(number_of_kernels)]
+
+    initial_path = Path.cwd()
+    kernels_path = Path(tempfile.mkdtemp(prefix="jl_kernels_"))
+
+    notebook = get_notebook_content(notebook_path=HorusTestCase.requirements_notebook_path)
+    pipfile_string = notebook["metadata"]["requirements"]
+
+    try:
+        with ThreadPoolExecutor(max_workers=number_of_kernels) as executor:
+            results = list(
+                executor.map(
+                    _lock_kernel,
+                    kernel_names,
+                    [pipfile_string] * number_of_kernels,
+                    [kernels_path] * number_of_kernels,
+                )
+            )
+
+        # Locks never change the process working directory.
+        assert Path.cwd() == initial_path
+
+        for kernel_name, (returncode, advise) in zip(kernel_names, results):
+            assert returncode == 0
+            assert advise["error"] is False
+
+            # Each lock writes only in its own kernel directory.
+            env_path = kernels_path.joinpath(kernel_name)
+            assert env_path.joinpath(".thoth.yaml").exists()
+            assert env_path.joinpath("Pipfile").exists()
+            assert env_path.joinpath("Pipfile.lock").exists()
+
+    finally:
+        shutil.rmtree(kernels_path, ignore_errors=True)
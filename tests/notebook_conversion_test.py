@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for notebook conversion to Python."""
+
+import ast
+import subprocess
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.lib import get_notebook_content
+
+
+class HorusNotebookConversionTestCase(HorusTestCase):
+    """A class for checking parity of notebook conversion with jupyter nbconvert."""
+
+    for notebook_path in sorted(HorusTestCase.data_dir.glob("*.ipynb")):
+        check_convert = subprocess.run(
+            f"jupyter nbconvert --to python {notebook_path} --stdout", shell=True, capture_output=True
+        )
+        assert check_convert.returncode == 0
+
+        nbconvert_content_py = check_convert.stdout.decode("utf-8")
+        notebook_content_py = get_notebook_content(notebook_path=str(notebook_path), py_format=True)
+
+        # Scripts must be the same code, blank lines and comments can differ.
+        assert ast.dump(ast.parse(notebook_content_py)) == ast.dump(ast.parse(nbconvert_content_py))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' benchmark of notebook metadata reading."""
+
+import base64
+import functools
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import typing
+
+from pathlib import Path
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.notebook import read_notebook
+from jupyterlab_requirements.dependency_management.notebook import read_notebook_metadata
+
+_NOTEBOOK_METADATA = {
+    "kernelspec": {"display_name": "Python 3", "language": "python", "name": "jupyterlab-requirements"},
+    "language_info": {"name": "python", "version": "3.8.12"},
+    "requirements": '{"packages": {"numpy": "*"}, "requires": {"python_version": "3.8"}, "source": []}',
+    "dependency_resolution_engine": "pipenv",
+}
+
+
+def _create_large_notebook(notebook_path: Path, cells_number: int = 200, image_size: int = 256 * 1024) -> None:
+    """Create notebook with many cells with images as outputs, written as Jupyter does."""
+    image = base64.b64encode(os.urandom(image_size)).decode("utf-8")
+    cells = [
+        {
+            "cell_type": "code",
+            "execution_count": index,
+            "metadata": {"tags": ["plot"]},
+            "outputs": [
+                {
+                    "data": {"image/png": image, "text/plain": ["<Figure size 432x288 with 1 Axes>"]},
+                    "metadata": {"needs_background": "light"},
+                    "output_type": "display_data",
+                }
+            ],
+            "source": ["import matplotlib.pyplot as plt\n", f"plt.plot([{index}, {index + 1}])"],
+        }
+        for index in range(cells_number)
+    ]
+    notebook = {"cells": cells, "metadata": _NOTEBOOK_METADATA, "nbformat": 4, "nbformat_minor": 4}
+
+    with open(notebook_path, "w") as notebook_file:
+        json.dump(notebook, notebook_file, indent=1, sort_keys=True)
+
+
+def _measure(function: typing.Callable[[], typing.Any]) -> typing.Tuple[typing.Any, float, int]:
+    """Measure time and peak memory of function."""
+    tracemalloc.start()
+    start = time.monotonic()
+    result = function()
+    elapsed = time.monotonic() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, elapsed, peak
+
+
+def _load_notebook(notebook_path: Path) -> typing.Dict[str, typing.Any]:
+    """Load notebook entirely, as done previously."""
+    with open(notebook_path) as notebook_file:
+        notebook: typing.Dict[str, typing.Any] = json.load(notebook_file)
+
+    return notebook
+
+
+class HorusNotebookReaderBenchmarkTestCase(HorusTestCase):
+    """A class for comparing metadata-only notebook reading with loading the whole notebook."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        notebook_path = Path(temp_dir).joinpath("large-notebook.ipynb")
+        _create_large_notebook(notebook_path)
+
+        notebook, load_time, load_peak = _measure(functools.partial(_load_notebook, notebook_path))
+        metadata, metadata_time, metadata_peak = _measure(functools.partial(read_notebook_metadata, str(notebook_path)))
+
+        measures = (
+            f"json.load: {load_time * 1000:.1f} ms, {load_peak / 1024 ** 2:.1f} MB, "
+            f"metadata only: {metadata_time * 1000:.1f} ms, {metadata_peak / 1024 ** 2:.1f} MB"
+        )
+
+        assert metadata == notebook["metadata"]
+        assert metadata_time < load_time, measures
+        assert metadata_peak < load_peak / 10, measures
+
+        notebook_without_outputs = read_notebook(str(notebook_path), include_outputs=False)
+
+        assert notebook_without_outputs["metadata"] == notebook["metadata"]
+        assert [c["source"] for c in notebook_without_outputs["cells"]] == [c["source"] for c in notebook["cells"]]
+        assert all(c["outputs"] == [] for c in notebook_without_outputs["cells"])
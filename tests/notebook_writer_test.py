@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' tests of notebook metadata writing."""
+
+import json
+import os
+import tempfile
+
+from pathlib import Path
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.notebook import write_notebook_metadata
+
+_NOTEBOOK_METADATA = {
+    "kernelspec": {"display_name": "Python 3 (é)", "language": "python", "name": "jupyterlab-requirements"},
+    "requirements": '{"packages": {"numpy": "*"}, "requires": {"python_version": "3.8"}}',
+}
+
+
+class HorusNotebookWriterTestCase(HorusTestCase):
+    """A class for checking metadata is updated in place keeping cells unchanged."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        notebook_path = Path(temp_dir).joinpath("notebook.ipynb")
+
+        for data_notebook_path in HorusTestCase.data_dir.glob("*.ipynb"):
+            notebook = json.loads(data_notebook_path.read_text())
+
+            # Indented as Jupyter writes notebooks and compact.
+            for indent in (1, 2, None):
+                notebook_path.write_text(json.dumps(notebook, indent=indent))
+                content = notebook_path.read_bytes()
+
+                write_notebook_metadata(str(notebook_path), _NOTEBOOK_METADATA)
+
+                updated_notebook = json.loads(notebook_path.read_text())
+
+                assert updated_notebook["metadata"] == _NOTEBOOK_METADATA
+                assert updated_notebook["cells"] == notebook["cells"]
+                assert updated_notebook["nbformat"] == notebook["nbformat"]
+
+                if indent:
+                    # Content before metadata (cells) is copied as it is.
+                    marker = b"\n" + b" " * indent + b'"metadata":'
+                    assert notebook_path.read_bytes().startswith(content[: content.find(marker)])
+
+        # Temporary files are not left behind.
+        assert os.listdir(temp_dir) == ["notebook.ipynb"]
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for the package store."""
+
+import json
+import tempfile
+
+from pathlib import Path
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.package_store import PackageStore
+
+
+def _install_fake_package(env_path: Path) -> None:
+    """Install a package as pip does, with a module and a console script."""
+    site_packages_path = env_path.joinpath("lib", "python3.8", "site-packages")
+    site_packages_path.joinpath("foo").mkdir(parents=True)
+    site_packages_path.joinpath("foo", "__init__.py").write_text("VALUE = 42\n")
+
+    dist_info_path = site_packages_path.joinpath("foo-1.0.dist-info")
+    dist_info_path.mkdir()
+    dist_info_path.joinpath("METADATA").write_text("Metadata-Version: 2.1\nName: foo\nVersion: 1.0\n\n")
+    dist_info_path.joinpath("RECORD").write_text(
+        "foo/__init__.py,sha256=abc,11\nfoo-1.0.dist-info/METADATA,,\nfoo-1.0.dist-info/RECORD,,\n../../../bin/foo,,\n"
+    )
+
+    env_path.joinpath("bin").mkdir()
+    env_path.joinpath("bin", "foo").write_text(f"#!{env_path}/bin/python\nimport foo\n")
+
+
+class HorusPackageStoreTestCase(HorusTestCase):
+    """A class for horus package store test cases."""
+
+    pipfile_lock = {
+        "default": {"foo": {"hashes": ["sha256:1234"], "version": "==1.0"}},
+        "develop": {"bar": {"git": "https://github.com/thoth-station/bar"}},
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = PackageStore(store_path=Path(temp_dir).joinpath("store"))
+        kernels_path = Path(temp_dir).joinpath("kernels")
+
+        installed_path = kernels_path.joinpath("installed")
+        _install_fake_package(installed_path)
+
+        assert store.add_packages(pipfile_lock, installed_path) == ["foo"]
+        assert store.add_packages(pipfile_lock, installed_path) == []
+
+        linked_path = kernels_path.joinpath("linked")
+        linked_path.joinpath("lib", "python3.8", "site-packages").mkdir(parents=True)
+        linked_path.joinpath("bin").mkdir()
+
+        assert store.link_packages(pipfile_lock, linked_path) == ["foo"]
+        assert store.link_packages(pipfile_lock, linked_path) == []
+
+        linked_module = linked_path.joinpath("lib", "python3.8", "site-packages", "foo", "__init__.py")
+        assert linked_module.read_text() == "VALUE = 42\n"
+        assert linked_path.joinpath("bin", "foo").read_text() == f"#!{linked_path}/bin/python\nimport foo\n"
+
+        # Entries are kept while a kernel locks them.
+        linked_path.joinpath("Pipfile.lock").write_text(json.dumps(pipfile_lock))
+
+        assert store.collect_garbage(kernels_path) == []
+
+        linked_path.joinpath("Pipfile.lock").unlink()
+
+        assert len(store.collect_garbage(kernels_path)) == 1
+        assert store.link_packages(pipfile_lock, installed_path) == []
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' benchmark of installed packages discovery."""
+
+import subprocess
+import sys
+import time
+import typing
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.lib import get_packages
+
+
+def _get_packages_with_pip_list() -> typing.Dict[str, str]:
+    """Get packages parsing pip list output, as done previously."""
+    process_output = subprocess.run(f"{sys.executable} -m pip list", shell=True, capture_output=True)
+
+    packages = {}
+    for processed_package in process_output.stdout.decode("utf-8").split("\n")[2:]:
+        if processed_package:
+            package_version = [el for el in processed_package.split(" ") if el != ""]
+            packages[package_version[0]] = package_version[1]
+
+    return packages
+
+
+class HorusPackagesBenchmarkTestCase(HorusTestCase):
+    """A class for comparing metadata scan of site-packages with pip list."""
+
+    start = time.monotonic()
+    pip_list_packages = _get_packages_with_pip_list()
+    pip_list_time = time.monotonic() - start
+
+    start = time.monotonic()
+    packages = get_packages(kernel_name="python3")
+    metadata_time = time.monotonic() - start
+
+    for package_name, package_version in pip_list_packages.items():
+        assert packages.get(package_name) == package_version
+
+    assert (
+        metadata_time < pip_list_time
+    ), f"pip list: {pip_list_time * 1000:.1f} ms, site-packages metadata: {metadata_time * 1000:.1f} ms"
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for progress events of long running tasks."""
+
+import asyncio
+import sys
+import typing
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.base import AsyncTasks
+from jupyterlab_requirements.dependency_management.progress import TaskProgress
+from jupyterlab_requirements.dependency_management.progress import report_phase
+from jupyterlab_requirements.dependency_management.progress import run_logged
+
+_SCRIPT = "import sys; print('collecting'); print('installed', file=sys.stderr); sys.exit(3)"
+
+
+def _install(task_inputs: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+    """Blocking task reporting its phase and output."""
+    report_phase("install", 50)
+    process = run_logged([sys.executable, "-c", _SCRIPT], capture_output=True)
+    return {"returncode": process.returncode, "output": process.stdout.decode(), "error": False}
+
+
+async def _run_task() -> typing.Tuple[typing.Any, typing.List[typing.Dict[str, typing.Any]], int, bool]:
+    """Run task in the tasks executor, return its result, events, number of notifications and if progress is kept."""
+    tasks = AsyncTasks(executor_type="thread")
+    task_index = tasks.create_task(_install, {})
+    progress = tasks.get_progress(task_index)
+
+    notifications = []
+    progress.subscribe(lambda: notifications.append(None))
+
+    result = None
+    while result is None:
+        await asyncio.sleep(0.01)
+        result = tasks.get_task(task_index)
+
+    return result, progress.get_events(), len(notifications), task_index in tasks.progress
+
+
+class HorusProgressTestCase(HorusTestCase):
+    """A class for testing progress recorded for tasks and streamed by the server."""
+
+    # Outside of tasks, processes are run as subprocess.run does.
+    process = run_logged([sys.executable, "-c", _SCRIPT], capture_output=True)
+    assert process.returncode == 3
+    assert process.stdout == b"collecting\n"
+    assert process.stderr == b"installed\n"
+
+    result, events, notifications, progress_kept = asyncio.run(_run_task())
+    assert result == {"returncode": 3, "output": "collecting\ninstalled\n", "error": False}
+
+    assert [event["id"] for event in events] == list(range(len(events)))
+    assert [(event["type"], event.get("phase"), event.get("line")) for event in events] == [
+        ("phase", "started", None),
+        ("phase", "install", None),
+        ("log", None, "collecting"),
+        ("log", None, "installed"),
+        ("done", None, None),
+    ]
+    assert events[-1]["error"] is False
+    assert notifications == len(events)
+
+    # Progress is dropped once the result is taken.
+    assert not progress_kept
+
+    # Clients reconnecting get only events following the last one received, nothing is added once done.
+    progress = TaskProgress()
+    progress.add("phase", phase="lock", percentage=30)
+    progress.add("log", line="Locking...")
+    progress.finish(error=True)
+    progress.add("log", line="ignored")
+
+    assert [event["type"] for event in progress.get_events(1)] == ["log", "done"]
+    assert progress.finished and progress.events[-1]["error"] is True
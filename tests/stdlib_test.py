@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' tests of standard library modules index."""
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.stdlib import _scan_stdlib_module_names
+from jupyterlab_requirements.dependency_management.stdlib import filter_stdlib_modules
+from jupyterlab_requirements.dependency_management.stdlib import get_stdlib_module_names
+
+
+class HorusStdlibTestCase(HorusTestCase):
+    """A class for checking standard library modules are filtered from gathered libraries."""
+
+    assert filter_stdlib_modules(["numpy", "os", "copy", "json", "sys", "pandas"]) == ["numpy", "pandas"]
+
+    # Computed once per process.
+    assert get_stdlib_module_names() is get_stdlib_module_names()
+
+    # Fallback used before Python 3.10 finds the same modules.
+    scanned_module_names = _scan_stdlib_module_names()
+    assert {"os", "copy", "json", "asyncio", "collections"} <= scanned_module_names
+    assert not scanned_module_names & {"numpy", "pandas", "site-packages"}
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for Thoth config of kernels."""
+
+import os
+import tempfile
+
+from pathlib import Path
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.lib import get_thoth_config
+from jupyterlab_requirements.dependency_management.lib import load_thoth_config
+
+
+class HorusThothConfigTestCase(HorusTestCase):
+    """A class for loading Thoth config of kernels from a working directory without .thoth.yaml."""
+
+    initial_path = Path.cwd()
+
+    with tempfile.TemporaryDirectory() as cwd, tempfile.TemporaryDirectory() as kernels_path:
+        os.chdir(cwd)
+
+        try:
+            config_path = Path(kernels_path).joinpath("test-kernel", ".thoth.yaml")
+            config_path.parent.mkdir()
+            config_path.write_text("host: kernel.thoth-station.ninja\ntls_verify: false\nruntime_environments: []\n")
+
+            config = load_thoth_config(config_path=config_path)
+            assert config.content["host"] == "kernel.thoth-station.ninja"
+
+            # Default config is created in the kernel directory, not in the working directory.
+            config = get_thoth_config(kernel_name="new-kernel", kernels_path=Path(kernels_path))
+            assert config.content["runtime_environments"]
+            assert Path(kernels_path).joinpath("new-kernel", ".thoth.yaml").exists()
+            assert not Path(cwd).joinpath(".thoth.yaml").exists()
+
+            assert Path.cwd() == Path(cwd).resolve()
+        finally:
+            os.chdir(initial_path)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# jupyterlab-requirements
+# Copyright(C) 2021 Francesco Murdaca
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A class for implementing horus' test cases for kernel tooling probe."""
+
+import tempfile
+
+from pathlib import Path
+
+from tests.base_test import HorusTestCase
+
+from jupyterlab_requirements.dependency_management.lib import get_missing_packages
+from jupyterlab_requirements.dependency_management.lib import install_missing_tooling
+
+
+class HorusToolingProbeTestCase(HorusTestCase):
+    """A class for horus kernel tooling probe test cases."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        env_path = Path(temp_dir)
+        site_packages_path = env_path.joinpath("lib", "python3.8", "site-packages")
+
+        for name, version in (("micropipenv", "1.4.0"), ("jupyterlab_requirements", "0.16.2")):
+            dist_info_path = site_packages_path.joinpath(f"{name}-{version}.dist-info")
+            dist_info_path.mkdir(parents=True)
+            dist_info_path.joinpath("METADATA").write_text(f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n")
+
+        tooling = ["micropipenv", "jupyterlab-requirements", "ipykernel"]
+
+        assert get_missing_packages(env_path, tooling) == ["ipykernel"]
+
+        dist_info_path = site_packages_path.joinpath("ipykernel-6.0.0.dist-info")
+        dist_info_path.mkdir()
+        dist_info_path.joinpath("METADATA").write_text("Metadata-Version: 2.1\nName: ipykernel\nVersion: 6.0.0\n")
+
+        assert get_missing_packages(env_path, tooling) == []
+
+        report = install_missing_tooling(env_path, tooling)
+
+        assert report["missing"] == []
+        assert report["processes_started"] == 0
+        assert report["estimated_processes_saved"] == len(tooling)